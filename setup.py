@@ -27,7 +27,8 @@ REQUIRED = [
 
 # What packages are optional?
 EXTRAS = {
-    'tests': ['pytest']
+    'tests': ['pytest'],
+    'push': ['websocket-client']
 }
 
 # The rest you shouldn't have to touch too much :)
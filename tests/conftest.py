@@ -23,6 +23,14 @@ def client():
     yield return_client
 
 
+def batch_response(tasks=(), projects=(), tags=(), folders=()):
+    """
+    Returns a sync response holding just the passed objects - for patching `http_get`.
+    """
+    return {'inboxId': 'inbox', 'projectGroups': list(folders), 'projectProfiles': list(projects),
+            'tags': list(tags), 'syncTaskBean': {'update': list(tasks)}}
+
+
 @pytest.fixture(scope='session')
 def fake_client():
     user = str(uuid.uuid4())
@@ -2,7 +2,9 @@
 Module for testing api.py
 """
 
+import datetime
 import pytest
+import threading
 import uuid
 
 from ticktick.managers.projects import ProjectManager
@@ -13,7 +15,7 @@ from ticktick.managers.pomo import PomoManager
 from ticktick.managers.settings import SettingsManager
 from ticktick.managers.tags import TagsManager
 from ticktick.oauth2 import OAuth2
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 RESPONSE_ONE_URL = 'https://someurl.com/test.json'
 RESPONSE_TWO_URL = 'https://someotherurl.com/anothertest.json'
@@ -69,6 +71,14 @@ class TestInitMethod:
         assert isinstance(client.tag, TagsManager)
         assert isinstance(client.task, TaskManager)
 
+    def test_managers_built_once(self, fake_client):
+        """
+        Tests the managers are cached on the instance after the first access
+        """
+        manager = fake_client.project
+        assert 'project' in vars(fake_client)
+        assert fake_client.project is manager
+
 
 class TestPrepareSession:
 
@@ -182,6 +192,37 @@ class TestSync:
         fake_client.inbox_id = ''
         fake_client.reset_local_state()
 
+    def test_concurrent_gets_shared(self, fake_client):
+        """
+        Tests identical get requests made at the same time are sent once
+        """
+        release = threading.Event()
+        sent = []
+
+        def get(url, **kwargs):
+            sent.append((url, kwargs.get('params')))
+            if kwargs.get('params') == {'includeWeb': True}:
+                release.wait(5)
+            return Mock(status_code=200, json=lambda: {'url': url})
+
+        results = []
+        url = fake_client.BASE_URL + 'user/preferences/settings'
+        with patch.object(fake_client._session, 'get', side_effect=get):
+            threads = [threading.Thread(target=lambda: results.append(
+                fake_client.http_get(url, params={'includeWeb': True}, cookies=fake_client.cookies)))
+                for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            while not sent:
+                pass
+            assert fake_client.http_get(url, params={'includeWeb': False}) == {'url': url}
+            release.set()
+            for thread in threads:
+                thread.join(5)
+        assert sent.count((url, {'includeWeb': True})) == 1
+        assert len(results) == 4
+        assert all(result is results[0] for result in results)
+
 
 class TestParseMethods:
 
@@ -249,6 +290,21 @@ class TestGetByFields:
         name = str(uuid.uuid4())
         assert not fake_client.get_by_fields(name=name)
 
+    def test_get_by_fields_projected(self, fake_client):
+        """
+        Tests projecting the found objects down to the passed fields
+        """
+        project_id = str(uuid.uuid4())
+        first = {'id': str(uuid.uuid4()), 'projectId': project_id, 'title': 'one', 'content': 'big'}
+        second = {'id': str(uuid.uuid4()), 'projectId': project_id, 'title': 'two', 'content': 'big'}
+        fake_client.state['tasks'].extend([first, second])
+        found = fake_client.get_by_fields(projectId=project_id, search='tasks', fields=['id', 'title'])
+        assert found == [(first['id'], 'one'), (second['id'], 'two')]
+        assert fake_client.get_by_id(first['id'], search='tasks', fields='title') == ('one',)
+        assert fake_client.get_by_id(str(uuid.uuid4()), fields='title') == ()
+        fake_client.delete_from_local_state(id=first['id'], search='tasks')
+        fake_client.delete_from_local_state(id=second['id'], search='tasks')
+
     def test_get_by_fields_search_key_wrong(self, fake_client):
         """
         Tests raises an exception when search key doesn't exist
@@ -257,6 +313,115 @@ class TestGetByFields:
             fake_client.get_by_fields(search=str(uuid.uuid4()), name='')
 
 
+class TestIterByFields:
+
+    def test_iter_by_fields_lazy(self, fake_client):
+        """
+        Tests the scan stops once the caller has enough results
+        """
+        project_id = str(uuid.uuid4())
+        tasks = [{'id': str(i), 'projectId': project_id, 'priority': i} for i in range(5)]
+        fake_client.state['tasks'].extend(tasks)
+        seen = []
+
+        def predicate(task):
+            seen.append(task['id'])
+            return task['priority'] >= 1
+
+        found = fake_client.iter_by_fields(search='tasks', projectId=project_id, predicate=predicate, limit=2)
+        assert not seen
+        assert list(found) == tasks[1:3]
+        assert seen == ['0', '1', '2']
+        del fake_client.state['tasks'][-5:]
+
+    def test_iter_by_fields_missing_field(self, fake_client):
+        """
+        Tests objects missing a field do not match
+        """
+        fake_client.state['projects'].append({'id': 'no name'})
+        assert list(fake_client.iter_by_fields(name=None)) == []
+        fake_client.delete_from_local_state(id='no name', search='projects')
+
+    def test_iter_by_fields_errors(self, fake_client):
+        """
+        Tests exceptions are raised right away
+        """
+        with pytest.raises(ValueError):
+            fake_client.iter_by_fields(search='tasks')
+        with pytest.raises(KeyError):
+            fake_client.iter_by_fields(search=str(uuid.uuid4()), name='')
+
+    def test_get_by_fields_first(self, fake_client):
+        """
+        Tests first always returns a single object
+        """
+        name = str(uuid.uuid4())
+        fake_client.state['tags'].extend([{'name': name, 'etag': '1'}, {'name': name, 'etag': '2'}])
+        assert fake_client.get_by_fields(name=name, search='tags', first=True)['etag'] == '1'
+        assert fake_client.get_by_fields(name=str(uuid.uuid4()), search='tags', first=True) == {}
+        del fake_client.state['tags'][-2:]
+
+    def test_iter_state(self, fake_client):
+        """
+        Tests iterating over just the lists in state
+        """
+        fake_client.state['user_settings'] = {'timeZone': 'US/Pacific'}
+        assert list(fake_client.iter_state()) == [obj for key in ('projects', 'project_folders', 'tags', 'tasks')
+                                                  for obj in fake_client.state[key]]
+        fake_client.state['user_settings'] = {}
+
+
+class TestQuery:
+
+    def test_query(self, fake_client):
+        """
+        Tests filtering, ordering, limits and projection together
+        """
+        project_id = str(uuid.uuid4())
+        tasks = [{'id': str(i), 'projectId': project_id, 'priority': i % 3, 'tags': ['work'] if i % 2 else []}
+                 for i in range(6)]
+        fake_client.state['tasks'].extend(tasks)
+        found = fake_client.query('tasks', projectId=project_id, tags__contains='work', order_by='-priority')
+        assert [task['id'] for task in found] == ['5', '1', '3']
+        found = fake_client.query('tasks', projectId=project_id, priority__gte=1, limit=2, fields='id')
+        assert found == [('1',), ('2',)]
+        del fake_client.state['tasks'][-6:]
+        assert fake_client.query('tasks', projectId=project_id) == []
+
+    def test_query_date_equal(self, fake_client):
+        """
+        Tests equality filters on dates compare against the parsed date strings
+        """
+        task = {'id': str(uuid.uuid4()), 'dueDate': '2022-03-04T05:00:00.000+0000'}
+        fake_client.state['tasks'].append(task)
+        due = datetime.datetime(2022, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        assert fake_client.query('tasks', dueDate=due) == [task]
+        assert fake_client.query('tasks', dueDate__in=[due]) == [task]
+        fake_client.state['tasks'].remove(task)
+
+    def test_query_after_in_place_change(self, fake_client):
+        """
+        Tests objects changed in place are found by their new values once the index is invalidated
+        """
+        task = {'id': str(uuid.uuid4()), 'priority': 0}
+        fake_client.state['tasks'].append(task)
+        assert fake_client.query('tasks', priority=0) == [task]
+        task['priority'] = 5
+        assert fake_client.query('tasks', priority=0) == []
+        fake_client.invalidate_index('tasks')
+        assert fake_client.query('tasks', priority=5) == [task]
+        fake_client.state['tasks'].remove(task)
+
+    def test_query_search_key_wrong(self, fake_client):
+        """
+        Tests the search key must be a list in state
+        """
+        with pytest.raises(KeyError):
+            fake_client.query('profile', id='')
+        with pytest.raises(KeyError):
+            fake_client.query(str(uuid.uuid4()))
+
+
 class TestGetByID:
 
     def test_get_by_id_fail(self, fake_client):
@@ -361,3 +526,28 @@ class TestDeleteFromLocalState:
         name = str(uuid.uuid4())
         deleted = fake_client.delete_from_local_state(name=name)
         assert not deleted  # Assert that nothing was deleted
+
+    def test_delete_many_from_local_state(self, fake_client):
+        """
+        Tests deleting many objects in one pass returns them in input order
+        """
+        tasks = [{'id': str(uuid.uuid4()), 'etag': str(uuid.uuid4())} for _ in range(4)]
+        fake_client.state['tasks'].extend(tasks)
+        state_list = fake_client.state['tasks']
+        assert fake_client.get_by_id(tasks[2]['id'], search='tasks') is tasks[2]
+
+        deleted = fake_client.delete_many_from_local_state('tasks', ids=[tasks[2]['id'], str(uuid.uuid4()),
+                                                                         tasks[0]['id']])
+        assert deleted == [tasks[2], tasks[0]]
+        assert fake_client.state['tasks'] is state_list
+        assert not fake_client.get_by_id(tasks[2]['id'], search='tasks')
+        assert fake_client.delete_many_from_local_state('tasks', etags=[tasks[1]['etag'], tasks[3]['etag']]) == \
+            [tasks[1], tasks[3]]
+
+    def test_delete_many_from_local_state_errors(self, fake_client):
+        with pytest.raises(ValueError):
+            fake_client.delete_many_from_local_state('tasks')
+        with pytest.raises(ValueError):
+            fake_client.delete_many_from_local_state('tasks', ids=[], etags=[])
+        with pytest.raises(KeyError):
+            fake_client.delete_many_from_local_state('profile', ids=[])
@@ -0,0 +1,92 @@
+"""
+Unit tests for autosync.py
+"""
+
+import pytest
+import threading
+
+from unittest.mock import patch
+
+from ticktick.autosync import AdaptiveInterval
+from tests.conftest import batch_response
+
+
+class TestAdaptiveInterval:
+
+    def test_update(self):
+        interval = AdaptiveInterval(minimum=5, maximum=40, initial=10)
+        assert interval.update(True) == 5
+        assert interval.update(True) == 5
+        assert [interval.update(False) for _ in range(4)] == [10, 20, 40, 40]
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            AdaptiveInterval(minimum=0)
+        with pytest.raises(ValueError):
+            AdaptiveInterval(minimum=10, maximum=5)
+
+
+class TestBackgroundSyncer:
+
+    def test_swap_sync(self, fake_client):
+        """
+        Tests the synced state and lookup tables are swapped in together
+        """
+        inbox_id = fake_client.inbox_id
+        old_state = fake_client.state
+        old_state['user_settings'] = {'timeZone': 'US/Pacific'}
+        with patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([{'id': '1', 'etag': 'a'}])):
+            fake_client.sync(swap=True)
+        assert fake_client.state is not old_state
+        assert fake_client.state['user_settings'] == {'timeZone': 'US/Pacific'}
+        assert fake_client.get_by_id('1', search='tasks') == {'id': '1', 'etag': 'a'}
+        assert old_state['tasks'] == []
+        fake_client.reset_local_state()
+        fake_client.inbox_id = inbox_id
+
+    def test_auto_sync(self, fake_client):
+        """
+        Tests the background thread syncs until stopped, and reports errors without stopping
+        """
+        inbox_id = fake_client.inbox_id
+        synced = threading.Event()
+        errors = []
+        responses = [RuntimeError('Could Not Complete Request'), batch_response([{'id': '1', 'etag': 'a'}])]
+
+        def http_get(url, **kwargs):
+            response = responses.pop(0) if responses else batch_response([{'id': '1', 'etag': 'a'}])
+            if isinstance(response, Exception):
+                raise response
+            synced.set()
+            return response
+
+        with patch('ticktick.api.TickTickClient.http_get', side_effect=http_get):
+            syncer = fake_client.start_auto_sync(minimum=0.01, maximum=0.02, on_error=errors.append)
+            with pytest.raises(RuntimeError):
+                fake_client.start_auto_sync()
+            assert synced.wait(5)
+            fake_client.stop_auto_sync(timeout=5)
+        assert not syncer.running
+        assert len(errors) == 1
+        assert fake_client.get_by_id('1', search='tasks') == {'id': '1', 'etag': 'a'}
+        assert fake_client.swap_on_sync
+        fake_client.swap_on_sync = False
+        fake_client.reset_local_state()
+        fake_client.inbox_id = inbox_id
+
+    def test_every_sync_swaps(self, fake_client):
+        """
+        Tests syncs made without swap - like after a write - swap too while swap_on_sync is set
+        """
+        inbox_id = fake_client.inbox_id
+        fake_client.swap_on_sync = True
+        fake_client.merge_on_sync = True
+        old_state = fake_client.state
+        with patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([{'id': '1', 'etag': 'a'}])):
+            fake_client.sync()
+        assert fake_client.state is not old_state
+        assert old_state['tasks'] == []
+        fake_client.swap_on_sync = False
+        fake_client.merge_on_sync = False
+        fake_client.reset_local_state()
+        fake_client.inbox_id = inbox_id
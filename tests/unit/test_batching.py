@@ -0,0 +1,139 @@
+"""
+Unit tests for batching.py
+"""
+
+import pytest
+
+from unittest.mock import patch
+
+from ticktick.helpers.object_id import check_object_id, generate_object_id
+from ticktick.tracking import ChangeTracker
+from tests.conftest import batch_response
+
+
+@pytest.fixture
+def synced(fake_client):
+    inbox_id = fake_client.inbox_id
+    fake_client.inbox_id = 'inbox1'
+    fake_client.state['tasks'].append({'id': '1', 'projectId': 'p', 'title': 'Old', 'etag': 'a'})
+    fake_client.state['tags'].append({'name': 'work', 'label': 'Work', 'color': '#000000', 'etag': 't'})
+    yield fake_client
+    fake_client.reset_local_state()
+    fake_client.inbox_id = inbox_id
+
+
+class TestAutoBatch:
+
+    def test_writes_combined(self, synced):
+        """
+        Tests writes in a batch are sent as one request per endpoint with one sync, and resolve in order
+        """
+        sent = {}
+
+        def http_post(url, **kwargs):
+            endpoint = url[len(synced.BASE_URL):]
+            sent[endpoint] = kwargs['json']
+            objs = kwargs['json'].get('add', []) + kwargs['json'].get('update', [])
+            return {'id2etag': {obj.get('id', obj.get('name')): 'new' for obj in objs}, 'id2error': {}}
+
+        def http_get(url, **kwargs):
+            # The server keeps the ids it was sent
+            return batch_response(
+                tasks=[dict(obj, etag='new') for obj in sent['batch/task']['update'] + sent['batch/task']['add']],
+                projects=[dict(obj, etag='new') for obj in sent['batch/project']['add']],
+                tags=[dict(obj, etag='new') for obj in sent['batch/tag']['update']])
+
+        with patch('ticktick.api.TickTickClient.http_post', side_effect=http_post), \
+                patch('ticktick.api.TickTickClient.http_get', side_effect=http_get) as get:
+            with synced.batch():
+                task = synced.get_by_id('1', search='tasks')
+                task['title'] = 'Changed'
+                updated = synced.task.update(task)
+                first = synced.task.create({'title': 'Same'})
+                second = synced.task.create({'title': 'Same'})
+                project = synced.project.create('Work')
+                color = synced.tag.color('work', '#FFFFFF')
+                assert not sent
+            assert get.call_count == 1
+
+        assert list(sent) == ['batch/project', 'batch/tag', 'batch/task']
+        assert sent['batch/task']['update'] == [task]
+        added = sent['batch/task']['add']
+        assert [obj['projectId'] for obj in added] == ['inbox1', 'inbox1']
+        assert all(check_object_id(obj['id']) for obj in added)
+        assert updated.result()['etag'] == 'new'
+        assert first.result()['id'] == added[0]['id']
+        assert second.result()['id'] == added[1]['id']
+        assert project.result()['name'] == 'Work'
+        assert color.result()['color'] == '#FFFFFF'
+
+    def test_new_ids_referenced(self, synced):
+        """
+        Tests tasks can reference a project and parent created in the same batch
+        """
+        project_id = generate_object_id()
+        parent_id = generate_object_id()
+        response = {'id2etag': {}, 'id2error': {}}
+        with patch('ticktick.api.TickTickClient.http_post', return_value=response) as post, \
+                patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([])):
+            with synced.batch():
+                synced.project.create([dict(synced.project.builder('Trip'), id=project_id)])
+                synced.task.create({'id': parent_id, 'title': 'Pack', 'projectId': project_id})
+                synced.task.create({'title': 'Socks', 'projectId': project_id, 'parentId': parent_id})
+        assert post.call_count == 2
+        project_payload, task_payload = [call[1]['json'] for call in post.call_args_list]
+        assert project_payload['add'][0]['id'] == project_id
+        assert [obj['projectId'] for obj in task_payload['add']] == [project_id, project_id]
+        assert task_payload['add'][1]['parentId'] == parent_id
+
+    def test_tracked_update_sends_whole_task(self, synced):
+        """
+        Tests a batched update sends the whole task even when the changed fields are known
+        """
+        synced.tracker = ChangeTracker()
+        synced.tracker.snapshot(synced.state)
+        task = dict(synced.get_by_id('1', search='tasks'), title='Changed')
+        try:
+            with patch('ticktick.api.TickTickClient.http_post', return_value={'id2etag': {}, 'id2error': {}}) as post, \
+                    patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([task])):
+                with synced.batch():
+                    synced.task.update(task)
+        finally:
+            synced.tracker = None
+        assert post.call_args[1]['json']['update'] == [task]
+
+    def test_errors_per_object(self, synced):
+        """
+        Tests an object error fails only its own future
+        """
+        tasks = [{'id': '1', 'projectId': 'p'}, {'id': '2', 'projectId': 'p'}]
+        response = {'id2etag': {}, 'id2error': {'2': 'NOT_EXISTED'}}
+        with patch('ticktick.api.TickTickClient.http_post', return_value=response) as post, \
+                patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([])):
+            with synced.batch():
+                deleted = synced.task.delete(tasks)
+        assert post.call_count == 1
+        assert post.call_args[1]['json'] == {'delete': [{'projectId': 'p', 'taskId': '1'},
+                                                        {'projectId': 'p', 'taskId': '2'}]}
+        assert deleted[0].result() is tasks[0]
+        with pytest.raises(RuntimeError):
+            deleted[1].result()
+
+    def test_window(self, synced):
+        """
+        Tests a window batch flushes without the block exiting
+        """
+        response = {'id2etag': {'1': 'b'}, 'id2error': {}}
+        task = {'id': '1', 'projectId': 'p', 'title': 'Changed', 'etag': 'a'}
+        with patch('ticktick.api.TickTickClient.http_post', return_value=response) as post, \
+                patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([dict(task, etag='b')])):
+            with synced.batch(window=0.01):
+                assert synced.task.update(task).result(timeout=5)['etag'] == 'b'
+                assert post.call_count == 1
+        assert post.call_count == 1
+
+    def test_single_open_batch(self, synced):
+        with synced.batch():
+            with pytest.raises(RuntimeError):
+                synced.batch().__enter__()
+        assert synced._batch is None
@@ -0,0 +1,180 @@
+"""
+Unit tests for concurrency.py
+"""
+
+import pytest
+import threading
+
+from unittest.mock import patch
+
+from ticktick.helpers.concurrency import BatchRequestError, SingleFlight, _Call, run_concurrently
+
+
+def watch_waiters(waiting: threading.Semaphore):
+    """
+    Patches the calls of SingleFlight to release `waiting` every time a caller starts waiting on one
+    """
+    class WaiterEvent(threading.Event):
+        def wait(self, timeout=None):
+            waiting.release()
+            return super().wait(timeout)
+
+    class WatchedCall(_Call):
+        def __init__(self, owner):
+            super().__init__(owner)
+            self.done = WaiterEvent()
+
+    return patch('ticktick.helpers.concurrency._Call', WatchedCall)
+
+
+def wait_for(waiting: threading.Semaphore, count: int) -> None:
+    for _ in range(count):
+        assert waiting.acquire(timeout=5)
+
+
+class TestRunConcurrently:
+
+    def test_results_in_order(self):
+        """
+        Tests the calls overlap and the results keep the input order
+        """
+        barrier = threading.Barrier(3, timeout=5)
+
+        def func(item):
+            barrier.wait()  # Only passes if three calls run at the same time
+            return item * 2
+
+        assert run_concurrently(func, [1, 2, 3], max_workers=3) == [2, 4, 6]
+
+    def test_errors_aggregated(self):
+        """
+        Tests every call finishes and every error is reported
+        """
+        def func(item):
+            if item % 2:
+                raise RuntimeError(f'Odd {item}')
+            return item
+
+        with pytest.raises(BatchRequestError) as error:
+            run_concurrently(func, range(5), max_workers=2)
+        assert sorted(error.value.errors) == [1, 3]
+        assert error.value.results == [0, None, 2, None, 4]
+        assert isinstance(error.value, RuntimeError)
+
+    def test_single_item_inline(self):
+        assert run_concurrently(lambda item: threading.current_thread(), ['one']) == [threading.current_thread()]
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_shared(self):
+        """
+        Tests calls with the same key arriving during a call share its result
+        """
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        waiting = threading.Semaphore(0)
+        calls = []
+
+        def func():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'shared': True}
+
+        with watch_waiters(waiting):
+            leader = threading.Thread(target=lambda: calls.append(flights.do('key', func)))
+            leader.start()
+            assert started.wait(5)
+            followers = [threading.Thread(target=lambda: calls.append(flights.do('key', func))) for _ in range(3)]
+            for thread in followers:
+                thread.start()
+            wait_for(waiting, 3)
+            assert flights.do('other', lambda: 'other') == 'other'
+            release.set()
+            for thread in [leader] + followers:
+                thread.join(5)
+        assert calls.count(1) == 1
+        results = [result for result in calls if result != 1]
+        assert len(results) == 4
+        assert all(result is results[0] for result in results)
+
+    def test_errors_shared(self):
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def func():
+            started.set()
+            release.wait(5)
+            raise RuntimeError('Could Not Complete Request')
+
+        def call():
+            try:
+                flights.do('key', func)
+            except RuntimeError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=call)]
+        threads[0].start()
+        started.wait(5)
+        threads.append(threading.Thread(target=call))
+        threads[1].start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        assert len(errors) == 2
+        # The key is free again afterwards
+        assert flights.do('key', lambda: 'done') == 'done'
+
+    def test_nested_call_runs(self):
+        """
+        Tests a call made from inside the running call of its key runs instead of waiting on itself
+        """
+        flights = SingleFlight()
+        results = []
+
+        def call():
+            results.append(flights.do('key', lambda: flights.do('key', lambda: 'inner', fresh=True) + ' outer'))
+            results.append(flights.do('key', lambda: flights.do('key', lambda: 'inner')))
+
+        thread = threading.Thread(target=call, daemon=True)
+        thread.start()
+        thread.join(5)
+        assert results == ['inner outer', 'inner']
+
+    def test_fresh_waits_for_next_call(self):
+        """
+        Tests fresh callers share a call that starts after the running one finished
+        """
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        runs = []
+        results = []
+
+        def func():
+            runs.append(len(runs))
+            if len(runs) == 1:
+                started.set()
+                release.wait(5)
+            return len(runs)
+
+        waiting = threading.Semaphore(0)
+        with watch_waiters(waiting):
+            leader = threading.Thread(target=lambda: results.append(flights.do('key', func)))
+            leader.start()
+            assert started.wait(5)
+            fresh = [threading.Thread(target=lambda: results.append(flights.do('key', func, fresh=True)))
+                     for _ in range(3)]
+            for thread in fresh:
+                thread.start()
+            # One fresh caller waits for the running call to finish, the others for the call it will make
+            wait_for(waiting, 3)
+            release.set()
+            for thread in [leader] + fresh:
+                thread.join(5)
+        assert len(runs) == 2
+        assert sorted(results) == [1, 2, 2, 2]
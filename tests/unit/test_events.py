@@ -0,0 +1,200 @@
+"""
+Unit tests for events.py
+"""
+
+import threading
+
+from unittest.mock import patch
+
+from ticktick.events import ChangeEvent, EventFeed, merge
+from ticktick.tracking import ChangeTracker
+from tests.conftest import batch_response
+
+
+def state(tasks=(), tags=()):
+    return {'tasks': list(tasks), 'tags': list(tags), 'projects': [], 'project_folders': []}
+
+
+class TestEventFeed:
+
+    def test_baseline_then_changes(self):
+        """
+        Tests the first state is a baseline, and later changes are found by etag
+        """
+        kept = {'id': '1', 'etag': 'a'}
+        changed = {'id': '2', 'etag': 'a'}
+        removed = {'id': '3', 'etag': 'a'}
+        tag = {'name': 'work', 'etag': 'a'}
+        feed = EventFeed(state([kept, changed, removed], [tag]))
+        assert feed.record(state([kept, changed, removed], [tag])) == []
+
+        updated = {'id': '2', 'etag': 'b'}
+        created = {'id': '4', 'etag': 'a'}
+        events = feed.record(state([kept, updated, created], [tag]))
+        assert events == [ChangeEvent('updated', 'tasks', '2', updated),
+                          ChangeEvent('created', 'tasks', '4', created),
+                          ChangeEvent('deleted', 'tasks', '3', removed)]
+
+    def test_subscribe_and_iterate(self):
+        """
+        Tests subscribers get events as they are found, and iterating drains the queue
+        """
+        feed = EventFeed(maxlen=2)
+        received = []
+        callback = feed.subscribe(received.append)
+        feed.record(state([{'id': str(i), 'etag': 'a'} for i in range(3)]))
+        assert [event.key for event in received] == ['0', '1', '2']
+        assert [event.key for event in feed] == ['1', '2']
+        assert list(feed) == []
+
+        feed.unsubscribe(callback)
+        feed.record(state())
+        assert len(received) == 3
+        assert len(feed) == 2
+
+    def test_failing_subscriber(self, caplog):
+        """
+        Tests a subscriber raising is logged without stopping the other events and subscribers
+        """
+        feed = EventFeed()
+        received = []
+
+        @feed.subscribe
+        def failing(event):
+            raise RuntimeError('Subscriber Failed')
+
+        feed.subscribe(received.append)
+        feed.record(state([{'id': '1', 'etag': 'a'}, {'id': '2', 'etag': 'a'}]))
+        assert [event.key for event in received] == ['1', '2']
+        assert len([record for record in caplog.records if record.exc_info]) == 2
+
+
+class TestClientEvents:
+
+    def test_events_from_sync(self, fake_client):
+        """
+        Tests sync publishes the changes once the feed is used
+        """
+        inbox_id = fake_client.inbox_id
+        with patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([{'id': '1', 'etag': 'a'}])):
+            fake_client.sync()
+        feed = fake_client.events
+        assert fake_client.events is feed
+
+        with patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([{'id': '1', 'etag': 'b'}])):
+            fake_client.sync()
+        assert [(event.kind, event.key) for event in feed] == [('updated', '1')]
+
+        fake_client._events = None
+        fake_client.reset_local_state()
+        fake_client.inbox_id = inbox_id
+
+    def test_subscriber_syncs(self, fake_client):
+        """
+        Tests a subscriber can sync - like through a manager write - from inside the sync publishing to it
+        """
+        inbox_id = fake_client.inbox_id
+        feed = fake_client.events
+        synced = []
+        feed.subscribe(lambda event: synced.append(fake_client.sync()))
+        with patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([{'id': '1', 'etag': 'a'}])):
+            thread = threading.Thread(target=fake_client.sync, daemon=True)
+            thread.start()
+            thread.join(5)
+        assert not thread.is_alive()
+        assert len(synced) == 1
+
+        fake_client._events = None
+        fake_client.reset_local_state()
+        fake_client.inbox_id = inbox_id
+
+    def test_failing_subscriber_sync(self, fake_client):
+        """
+        Tests a failing subscriber does not fail the sync, which snapshots the synced state before publishing
+        """
+        inbox_id = fake_client.inbox_id
+        fake_client.tracker = ChangeTracker()
+        snapshots = []
+
+        def failing(event):
+            snapshots.append(fake_client.tracker.changes('tasks', event.obj))
+            raise RuntimeError('Subscriber Failed')
+
+        fake_client.events.subscribe(failing)
+        response = batch_response([{'id': '1', 'etag': 'a'}])
+        with patch('ticktick.api.TickTickClient.http_get', return_value=response):
+            assert fake_client.sync() is response
+        assert snapshots == [{}]
+
+        fake_client.tracker = None
+        fake_client._events = None
+        fake_client.reset_local_state()
+        fake_client.inbox_id = inbox_id
+
+
+class TestMerge:
+
+    def test_merge_in_place(self):
+        """
+        Tests changed objects keep their identity, unchanged lists are untouched, and missing objects are removed
+        """
+        kept = {'id': '1', 'etag': 'a'}
+        changed = {'id': '2', 'etag': 'a', 'title': 'old'}
+        removed = {'id': '3', 'etag': 'a'}
+        tag = {'name': 'work', 'etag': 'a'}
+        current = state([kept, changed, removed], [tag])
+        tasks, tags = current['tasks'], current['tags']
+
+        created = {'id': '4', 'etag': 'a'}
+        events = merge(current, {'tasks': [{'id': '1', 'etag': 'a'}, {'id': '2', 'etag': 'b', 'title': 'new'}, created],
+                                 'tags': [{'name': 'work', 'etag': 'a'}]})
+        assert events == [ChangeEvent('updated', 'tasks', '2', changed),
+                          ChangeEvent('created', 'tasks', '4', created),
+                          ChangeEvent('deleted', 'tasks', '3', removed)]
+        assert current['tasks'] is tasks and current['tags'] is tags
+        assert tasks == [kept, changed, created]
+        assert tasks[0] is kept and tasks[1] is changed and changed['title'] == 'new'
+        assert tags[0] is tag
+
+    def test_merge_restores_unsent_changes(self):
+        """
+        Tests a local change the server never got is replaced by the synced object, even with the same etag
+        """
+        tag = {'name': 'work', 'etag': 'a', 'color': '#000000'}
+        current = state([], [tag])
+        tag['color'] = '#FFFFFF'  # Changed before a request that failed
+        events = merge(current, {'tags': [{'name': 'work', 'etag': 'a', 'color': '#000000'}]})
+        assert events == [ChangeEvent('updated', 'tags', 'work', tag)]
+        assert current['tags'][0] is tag and tag['color'] == '#000000'
+
+    def test_client_merge_on_sync(self, fake_client):
+        """
+        Tests the client merges syncs into the held objects and feeds the merged events
+        """
+        inbox_id = fake_client.inbox_id
+        fake_client.merge_on_sync = True
+        with patch('ticktick.api.TickTickClient.http_get',
+                   return_value=batch_response([{'id': '1', 'etag': 'a', 'projectId': 'x'}])):
+            fake_client.sync()
+        held = fake_client.get_by_id('1', search='tasks')
+        feed = fake_client.events
+        assert fake_client.query('tasks', projectId='x') == [held]
+
+        with patch('ticktick.api.TickTickClient.http_get',
+                   return_value=batch_response([{'id': '1', 'etag': 'b', 'projectId': 'y'}])):
+            fake_client.sync()
+        assert fake_client.get_by_id('1', search='tasks') is held and held['projectId'] == 'y'
+        assert fake_client.query('tasks', projectId='y') == [held]
+        assert [(event.kind, event.obj) for event in feed] == [('updated', held)]
+
+        # Swapped syncs never change the held objects
+        with patch('ticktick.api.TickTickClient.http_get',
+                   return_value=batch_response([{'id': '1', 'etag': 'c', 'projectId': 'z'}])):
+            fake_client.sync(swap=True)
+        assert held['projectId'] == 'y'
+        assert fake_client.get_by_id('1', search='tasks')['projectId'] == 'z'
+
+        fake_client.merge_on_sync = False
+        fake_client._events = None
+        fake_client.reset_local_state()
+        fake_client.inbox_id = inbox_id
@@ -0,0 +1,47 @@
+"""
+Import time benchmark for ticktick.api
+
+Run `python -X importtime -c "import ticktick.api"` to see the full breakdown.
+"""
+
+import subprocess
+import sys
+
+HEAVY_MODULES = ('requests', 'pytz', 'webbrowser', 'urllib3')
+
+
+def import_times(statement: str) -> dict:
+    """
+    Runs the statement in a fresh interpreter with `-X importtime` and returns a dictionary of
+    top level module name to cumulative import time in microseconds.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime:
+
+    def test_heavy_modules_deferred(self):
+        """
+        Tests importing the client does not import the http, time zone, or browser libraries
+        """
+        times = import_times('import ticktick.api')
+        assert 'ticktick.api' in times
+        for module in HEAVY_MODULES:
+            assert module not in times
+
+    def test_managers_deferred(self):
+        """
+        Tests the manager modules are not imported with the client
+        """
+        times = import_times('import ticktick.api')
+        for module in ('ticktick.managers.tasks', 'ticktick.managers.projects', 'ticktick.managers.tags'):
+            assert module not in times
@@ -0,0 +1,68 @@
+"""
+Unit tests for index.py
+"""
+
+import datetime
+import random
+
+from ticktick.index import StateIndex
+
+
+class TestStateIndex:
+
+    def test_lookup(self):
+        """
+        Tests equality and list membership lookups keep state order
+        """
+        tasks = [{'id': '1', 'projectId': 'a', 'tags': ['work']},
+                 {'id': '2', 'projectId': 'b', 'tags': ['home', 'work']},
+                 {'id': '3', 'projectId': 'a'}]
+        index = StateIndex({'tasks': tasks})
+        assert index.lookup('tasks', 'projectId', 'a') == [tasks[0], tasks[2]]
+        assert index.lookup_contains('tasks', 'tags', 'work') == [tasks[0], tasks[1]]
+        assert index.first('tasks', 'id', '2') is tasks[1]
+        assert index.first('tasks', 'id', '4') == {}
+        assert index.table('tasks', 'tags').lists_only
+        assert not index.table('tasks', 'projectId').lists_only
+
+    def test_stale_tables(self):
+        """
+        Tests tables are rebuilt when the list is replaced or changes length, and changed objects are not returned
+        """
+        state = {'tags': [{'name': 'work'}]}
+        index = StateIndex(state)
+        assert index.lookup('tags', 'name', 'work') == [{'name': 'work'}]
+
+        state['tags'].append({'name': 'home'})
+        assert index.lookup('tags', 'name', 'home') == [{'name': 'home'}]
+
+        state['tags'] = [{'name': 'school'}]
+        assert index.lookup('tags', 'name', 'home') == []
+        assert index.lookup('tags', 'name', 'school') == [{'name': 'school'}]
+
+        state['tags'][0]['name'] = 'college'
+        assert index.lookup('tags', 'name', 'school') == []
+
+        state['tags'][0] = {'name': 'work'}
+        assert index.lookup('tags', 'name', 'work') == [{'name': 'work'}]
+
+    def test_between(self):
+        """
+        Tests ranges find the same objects as checking every object, with long intervals among them
+        """
+        rng = random.Random(7)
+        base = datetime.datetime(2021, 1, 1)
+        tasks = []
+        for number in range(300):
+            start = base + datetime.timedelta(hours=rng.randrange(24 * 365))
+            end = start + datetime.timedelta(hours=rng.choice([0, 1, 30, 24 * 400]))
+            tasks.append({'id': str(number), 'startDate': start.strftime('%Y-%m-%dT%H:%M:%S.000+0000'),
+                          'dueDate': end.strftime('%Y-%m-%dT%H:%M:%S.000+0000'), 'start': start, 'end': end})
+        tasks.append({'id': 'undated'})
+        index = StateIndex({'tasks': tasks})
+        for _ in range(50):
+            start = base + datetime.timedelta(hours=rng.randrange(-24 * 30, 24 * 400))
+            end = start + datetime.timedelta(hours=rng.randrange(48))
+            expected = sorted((task for task in tasks if 'start' in task and task['start'] <= end
+                               and task['end'] >= start), key=lambda task: task['start'])
+            assert index.between('tasks', start, end) == expected
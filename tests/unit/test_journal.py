@@ -0,0 +1,198 @@
+"""
+Unit tests for journal.py
+"""
+
+import json
+import threading
+import pytest
+
+from unittest.mock import patch
+
+from ticktick.helpers.concurrency import BatchRequestError
+from ticktick.helpers.object_id import check_object_id
+from ticktick.journal import OperationJournal
+from tests.conftest import batch_response
+
+
+@pytest.fixture
+def client(fake_client):
+    inbox_id = fake_client.inbox_id
+    yield fake_client
+    fake_client.reset_local_state()
+    fake_client.inbox_id = inbox_id
+
+
+class TestCoalescing:
+
+    def test_updates_merged(self, client):
+        journal = OperationJournal(client)
+        journal.update('tasks', {'id': '1', 'projectId': 'p', 'title': 'New'})
+        journal.update('tasks', {'id': '1', 'projectId': 'p', 'priority': 5})
+        journal.update('tasks', {'id': '2', 'projectId': 'p', 'title': 'Other'})
+        assert journal.pending == [('tasks', 'update', {'id': '1', 'projectId': 'p', 'title': 'New', 'priority': 5}),
+                                   ('tasks', 'update', {'id': '2', 'projectId': 'p', 'title': 'Other'})]
+
+    def test_create_then_update_and_delete(self, client):
+        journal = OperationJournal(client)
+        journal.create('tasks', {'id': '1', 'projectId': 'p', 'title': 'New'})
+        journal.update('tasks', {'id': '1', 'title': 'Newer'})
+        assert journal.pending == [('tasks', 'add', {'id': '1', 'projectId': 'p', 'title': 'Newer'})]
+        journal.delete('tasks', {'id': '1', 'projectId': 'p'})
+        assert len(journal) == 0
+
+    def test_update_then_delete(self, client):
+        journal = OperationJournal(client)
+        journal.update('projects', {'id': 'p', 'name': 'Work'})
+        journal.delete('projects', {'id': 'p'})
+        assert journal.pending == [('projects', 'delete', {'id': 'p'})]
+        with pytest.raises(ValueError):
+            journal.update('projects', {'id': 'p', 'name': 'Again'})
+
+    def test_create_assigns_id(self, client):
+        journal = OperationJournal(client)
+        task = {'title': 'New'}
+        task_id = journal.create('tasks', task)
+        assert check_object_id(task_id)
+        assert 'id' not in task
+        journal.update('tasks', {'id': task_id, 'priority': 5})
+        assert journal.pending == [('tasks', 'add', {'title': 'New', 'id': task_id, 'priority': 5})]
+        assert journal.create('tags', {'name': 'work'}) == 'work'
+
+    def test_invalid(self, client):
+        journal = OperationJournal(client)
+        with pytest.raises(ValueError):
+            journal.record('project_folders', 'add', {'name': 'Folder'})
+        with pytest.raises(ValueError):
+            journal.delete('tags', {'name': 'work'})
+        assert len(journal) == 0
+
+
+class TestReplay:
+
+    def test_replay(self, client):
+        """
+        Tests the coalesced operations are sent in one batch request with one sync
+        """
+        journal = OperationJournal(client)
+        journal.update('tasks', {'id': '1', 'projectId': 'p', 'title': 'New'})
+        journal.update('tasks', {'id': '1', 'projectId': 'p', 'priority': 5})
+        journal.delete('tasks', {'id': '2', 'projectId': 'p'})
+        synced = {'id': '1', 'projectId': 'p', 'title': 'New', 'priority': 5, 'etag': 'b'}
+        with patch('ticktick.api.TickTickClient.http_post',
+                   return_value={'id2etag': {'1': 'b'}, 'id2error': {}}) as post, \
+                patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([synced])) as get:
+            results = journal.replay()
+        assert post.call_count == 1
+        assert get.call_count == 1
+        assert post.call_args[1]['json'] == {
+            'update': [{'id': '1', 'projectId': 'p', 'title': 'New', 'priority': 5}],
+            'delete': [{'projectId': 'p', 'taskId': '2'}]
+        }
+        assert results == [synced, {'id': '2', 'projectId': 'p'}]
+        assert len(journal) == 0
+        assert journal.replay() == []
+
+    def test_updates_applied_to_state(self, client):
+        """
+        Tests partial updates are sent as the synced object with the recorded fields applied
+        """
+        client.state['tasks'].append({'id': '1', 'projectId': 'p', 'title': 'Old', 'content': 'Notes', 'etag': 'a'})
+        journal = OperationJournal(client)
+        journal.update('tasks', {'id': '1', 'projectId': 'p', 'title': 'New'})
+        journal.update('tasks', {'id': '1', 'projectId': 'p', 'priority': 5})
+        with patch('ticktick.api.TickTickClient.http_post',
+                   return_value={'id2etag': {'1': 'b'}, 'id2error': {}}) as post, \
+                patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([])):
+            journal.replay()
+        assert post.call_args[1]['json'] == {
+            'update': [{'id': '1', 'projectId': 'p', 'title': 'New', 'content': 'Notes', 'etag': 'a', 'priority': 5}]
+        }
+
+    def test_failures_stay_pending(self, client):
+        journal = OperationJournal(client)
+        journal.update('tasks', {'id': '1', 'projectId': 'p', 'title': 'New'})
+        journal.update('tasks', {'id': '2', 'projectId': 'p', 'title': 'Other'})
+        with patch('ticktick.api.TickTickClient.http_post',
+                   return_value={'id2etag': {'1': 'b'}, 'id2error': {'2': 'NOT_EXISTED'}}), \
+                patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([])):
+            with pytest.raises(BatchRequestError) as error:
+                journal.replay()
+        assert list(error.value.errors) == [1]
+        assert journal.pending == [('tasks', 'update', {'id': '2', 'projectId': 'p', 'title': 'Other'})]
+
+
+class TestPersistence:
+
+    def test_resume(self, client, tmp_path):
+        """
+        Tests a new journal picks up the operations persisted by one that did not replay
+        """
+        path = str(tmp_path / 'journal.jsonl')
+        journal = OperationJournal(client, path)
+        journal.update('tasks', {'id': '1', 'projectId': 'p', 'title': 'New'})
+        journal.update('tasks', {'id': '1', 'projectId': 'p', 'priority': 5})
+        with open(path) as f:
+            assert len(f.readlines()) == 2
+
+        resumed = OperationJournal(client, path)
+        assert resumed.pending == journal.pending
+
+        with patch('ticktick.api.TickTickClient.http_post',
+                   return_value={'id2etag': {'1': 'b'}, 'id2error': {}}), \
+                patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([])):
+            resumed.replay()
+        with open(path) as f:
+            assert f.read() == ''
+
+    def test_rewrite_keeps_failures(self, client, tmp_path):
+        path = str(tmp_path / 'journal.jsonl')
+        journal = OperationJournal(client, path)
+        journal.update('tasks', {'id': '1', 'projectId': 'p', 'title': 'New'})
+        journal.update('tasks', {'id': '1', 'projectId': 'p', 'priority': 5})
+        with patch('ticktick.api.TickTickClient.http_post', side_effect=RuntimeError('Could Not Complete Request')), \
+                patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([])):
+            with pytest.raises(BatchRequestError):
+                journal.replay()
+        with open(path) as f:
+            assert [json.loads(line) for line in f] == [
+                {'search': 'tasks', 'action': 'update', 'obj': {'id': '1', 'projectId': 'p', 'title': 'New',
+                                                                 'priority': 5}}]
+
+    def test_checkpoint_per_request(self, client, tmp_path):
+        """
+        Tests the operations of requests that went through are not sent again after a replay dies part way
+        """
+        path = str(tmp_path / 'journal.jsonl')
+        journal = OperationJournal(client, path)
+        for task_id in ('1', '2', '3'):
+            journal.update('tasks', {'id': task_id, 'projectId': 'p', 'title': 'New'})
+        applied = {'id2etag': {}, 'id2error': {}}
+        with patch.object(client, 'MAX_BATCH_SIZE', 2), \
+                patch('ticktick.api.TickTickClient.http_post', side_effect=[applied, KeyboardInterrupt]), \
+                patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([])):
+            with pytest.raises(KeyboardInterrupt):
+                journal.replay()
+        assert OperationJournal(client, path).pending == [('tasks', 'update',
+                                                           {'id': '3', 'projectId': 'p', 'title': 'New'})]
+
+    def test_record_while_replaying(self, client):
+        """
+        Tests operations can be recorded while a replay is sending, and stay pending
+        """
+        journal = OperationJournal(client)
+        journal.create('tasks', {'id': '1', 'projectId': 'p', 'title': 'New'})
+
+        def post(*args, **kwargs):
+            recorder = threading.Thread(target=lambda: (journal.update('tasks', {'id': '1', 'priority': 5}),
+                                                        journal.update('tasks', {'id': '2', 'projectId': 'p'})))
+            recorder.start()
+            recorder.join(5)
+            assert not recorder.is_alive()
+            return {'id2etag': {}, 'id2error': {}}
+
+        with patch('ticktick.api.TickTickClient.http_post', side_effect=post), \
+                patch('ticktick.api.TickTickClient.http_get', return_value=batch_response([])):
+            journal.replay()
+        # The create went through, so what was recorded onto it is an update now
+        assert journal.pending == [('tasks', 'update', {'id': '1', 'projectId': 'p', 'title': 'New', 'priority': 5}),
+                                   ('tasks', 'update', {'id': '2', 'projectId': 'p'})]
@@ -0,0 +1,25 @@
+import time
+
+from ticktick.helpers.object_id import check_object_id, generate_object_id
+
+
+def test_generate_object_id():
+    """Tests the id is 24 hex digits starting with the current time"""
+    object_id = generate_object_id()
+    assert len(object_id) == 24
+    assert abs(int(object_id[:8], 16) - time.time()) < 5
+
+
+def test_generate_object_id_unique_and_ordered():
+    """Tests ids made in a row are unique, and share the process value"""
+    ids = [generate_object_id() for _ in range(1000)]
+    assert len(set(ids)) == 1000
+    assert len({object_id[8:18] for object_id in ids}) == 1
+    assert all(check_object_id(object_id) for object_id in ids)
+
+
+def test_check_object_id():
+    assert check_object_id('60caa2278f08fe3101187002')
+    assert not check_object_id('60caa2278f08fe310118700')
+    assert not check_object_id('inbox115781412')
+    assert not check_object_id(None)
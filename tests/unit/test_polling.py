@@ -0,0 +1,210 @@
+"""
+Unit tests for polling.py
+"""
+
+import pytest
+import threading
+import requests
+
+from ticktick.pool import ClientPool
+from ticktick.polling import PollingScheduler, TokenBucket
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    """
+    Stand-in for a logged in TickTickClient whose syncs return the queued task lists
+    """
+
+    def __init__(self, *syncs):
+        self._session = requests.session()
+        self.state = {'tasks': []}
+        self.syncs = list(syncs)
+
+    def sync(self, swap=False):
+        tasks = self.syncs.pop(0) if self.syncs else self.state['tasks']
+        if isinstance(tasks, Exception):
+            raise tasks
+        self.state = {'tasks': tasks}
+
+
+@pytest.fixture
+def pool():
+    client_pool = ClientPool(max_workers=2)
+    yield client_pool
+    client_pool.close()
+
+
+def run(scheduler):
+    return [future.result() for future in scheduler.poll()]
+
+
+class TestTokenBucket:
+
+    def test_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, capacity=2, clock=clock)
+        assert [bucket.take() for _ in range(3)] == [True, True, False]
+        assert bucket.wait_time() == 0.5
+        clock.now = 0.5
+        assert bucket.take()
+        assert not bucket.take()
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            TokenBucket(0)
+
+
+class TestPollingScheduler:
+
+    def test_busy_and_idle_accounts(self, pool):
+        """
+        Tests busy accounts are polled more often and idle accounts back off
+        """
+        clock = FakeClock()
+        busy = [[{'id': str(n), 'etag': str(n)}] for n in range(5)]
+        pool.register('busy', FakeClient(*busy))
+        pool.register('idle', FakeClient())
+        changes = []
+        scheduler = PollingScheduler(pool, minimum=10, maximum=80, max_rate=100, clock=clock,
+                                     on_change=lambda key, events: changes.append(key))
+        scheduler.add('busy')
+        scheduler.add('idle')
+
+        assert pool['busy'].swap_on_sync
+        assert len(run(scheduler)) == 2
+        assert scheduler.stats('busy')['interval'] == 10
+        assert scheduler.stats('idle')['interval'] == 20
+        assert scheduler.stats('busy')['rate'] > 0
+        assert scheduler.stats('idle')['rate'] == 0
+
+        clock.now = 10
+        assert len(run(scheduler)) == 1
+        assert scheduler.next_wakeup() == 10
+        for _ in range(3):
+            clock.now += 20
+            run(scheduler)
+        assert scheduler.stats('busy')['polls'] > scheduler.stats('idle')['polls']
+        assert scheduler.stats('idle')['interval'] == 80
+        assert set(changes) == {'busy'}
+
+    def test_change_rate(self, pool):
+        """
+        Tests an idle account that starts changing a lot is polled again sooner than its halved interval
+        """
+        clock = FakeClock()
+        burst = [{'id': str(n), 'etag': str(n)} for n in range(10)]
+        pool.register('account', FakeClient([], [], [], burst))
+        scheduler = PollingScheduler(pool, minimum=10, maximum=80, max_rate=100, clock=clock)
+        scheduler.add('account')
+
+        for now in (0, 20, 60):
+            clock.now = now
+            run(scheduler)
+        assert scheduler.stats('account')['interval'] == 80
+
+        clock.now = 140
+        run(scheduler)
+        assert scheduler.stats('account')['interval'] == 40
+        assert scheduler.stats('account')['rate'] == 3
+        assert scheduler.next_wakeup() == 10
+
+    def test_rate_cap(self, pool):
+        """
+        Tests due accounts wait for the global rate cap
+        """
+        clock = FakeClock()
+        for key in 'abc':
+            pool.register(key, FakeClient())
+        scheduler = PollingScheduler(pool, minimum=10, maximum=80, max_rate=1, clock=clock)
+        for key in 'abc':
+            scheduler.add(key)
+
+        assert len(run(scheduler)) == 1
+        assert scheduler.next_wakeup() == 1
+        clock.now = 1
+        assert len(run(scheduler)) == 1
+        clock.now = 2
+        assert len(run(scheduler)) == 1
+        assert sum(scheduler.stats(key)['polls'] for key in 'abc') == 3
+
+    def test_errors_back_off(self, pool):
+        """
+        Tests failed syncs are reported and back off
+        """
+        clock = FakeClock()
+        pool.register('one', FakeClient(RuntimeError('Could Not Complete Request')))
+        errors = []
+        scheduler = PollingScheduler(pool, minimum=10, maximum=80, clock=clock,
+                                     on_error=lambda key, error: errors.append(key))
+        scheduler.add('one')
+        assert run(scheduler) == [[]]
+        assert errors == ['one']
+        assert scheduler.stats('one')['failures'] == 1
+        assert scheduler.stats('one')['interval'] == 20
+
+        clock.now = 20
+        run(scheduler)
+        assert scheduler.stats('one')['failures'] == 0
+
+    def test_add_and_remove(self, pool):
+        clock = FakeClock()
+        pool.register('one', FakeClient())
+        scheduler = PollingScheduler(pool, clock=clock)
+        with pytest.raises(KeyError):
+            scheduler.add('missing')
+        scheduler.add('one', delay=5)
+        with pytest.raises(KeyError):
+            scheduler.add('one')
+        assert run(scheduler) == []
+        scheduler.remove('one')
+        clock.now = 5
+        assert run(scheduler) == []
+
+    def test_removed_from_pool(self, pool):
+        """
+        Tests an account removed from the pool while scheduled stops being polled, without stopping the others
+        """
+        clock = FakeClock()
+        pool.register('one', FakeClient())
+        pool.register('two', FakeClient())
+        errors = []
+        scheduler = PollingScheduler(pool, clock=clock, on_error=lambda key, error: errors.append((key, error)))
+        scheduler.add('one')
+        scheduler.add('two')
+        pool.remove('one')
+        assert len(run(scheduler)) == 1
+        assert [key for key, _ in errors] == ['one']
+        assert isinstance(errors[0][1], KeyError)
+        with pytest.raises(KeyError):
+            scheduler.stats('one')
+        assert scheduler.stats('two')['polls'] == 1
+
+    def test_cancelled_sync(self, pool):
+        """
+        Tests an account whose queued sync is cancelled by the pool is scheduled again
+        """
+        clock = FakeClock()
+        pool.register('one', FakeClient())
+        errors = []
+        scheduler = PollingScheduler(pool, clock=clock, on_error=lambda key, error: errors.append(key))
+        scheduler.add('one')
+        started = threading.Event()
+        release = threading.Event()
+        blocker = pool.submit('one', lambda client: started.set() or release.wait(5))
+        assert started.wait(5)
+        futures = scheduler.poll()
+        pool.remove('one')
+        release.set()
+        assert blocker.result()
+        assert futures[0].cancelled()
+        assert scheduler.poll() == []
+        assert errors == ['one']
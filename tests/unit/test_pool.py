@@ -0,0 +1,111 @@
+"""
+Unit tests for pool.py
+"""
+
+import pytest
+import requests
+import threading
+
+from ticktick.pool import ClientPool
+
+
+class FakeClient:
+    """
+    Stand-in for a logged in TickTickClient
+    """
+
+    def __init__(self):
+        self._session = requests.session()
+
+
+@pytest.fixture
+def pool():
+    client_pool = ClientPool(max_workers=1)
+    yield client_pool
+    client_pool.close()
+
+
+class TestRegister:
+
+    def test_sessions_share_adapter(self, pool):
+        """
+        Tests that every account session is mounted on the same adapter
+        """
+        one = pool.register('one', FakeClient())
+        two = pool.register('two', FakeClient())
+        adapter = one._session.get_adapter('https://api.ticktick.com')
+        assert adapter is two._session.get_adapter('https://api.ticktick.com')
+        assert adapter is pool.session().get_adapter('https://api.ticktick.com')
+        assert one._session.cookies is not two._session.cookies
+
+    def test_register_duplicate_key(self, pool):
+        """
+        Tests a key cannot be registered twice
+        """
+        pool.register('one', FakeClient())
+        with pytest.raises(KeyError):
+            pool.register('one', FakeClient())
+
+    def test_remove(self, pool):
+        """
+        Tests removing an account from the pool
+        """
+        client = pool.register('one', FakeClient())
+        assert 'one' in pool
+        assert pool.remove('one') is client
+        assert 'one' not in pool
+        assert len(pool) == 0
+
+
+class TestScheduling:
+
+    def test_submit_result(self, pool):
+        """
+        Tests the future holds the result of the call
+        """
+        client = pool.register('one', FakeClient())
+        future = pool.submit('one', lambda c, value: (c, value), 5)
+        assert future.result(timeout=5) == (client, 5)
+
+    def test_round_robin(self, pool):
+        """
+        Tests a second account is served before the first account's backlog
+        """
+        pool.register('busy', FakeClient())
+        pool.register('quiet', FakeClient())
+        gate = threading.Event()
+        order = []
+
+        pool.submit('busy', lambda c: gate.wait(5))
+        futures = [pool.submit('busy', lambda c, i=i: order.append(('busy', i))) for i in range(3)]
+        futures.append(pool.submit('quiet', lambda c: order.append(('quiet', 0))))
+        gate.set()
+        for future in futures:
+            future.result(timeout=5)
+
+        assert order == [('quiet', 0), ('busy', 0), ('busy', 1), ('busy', 2)]
+
+    def test_map_raises_error(self, pool):
+        """
+        Tests map waits for every call and raises the error
+        """
+        pool.register('one', FakeClient())
+        pool.register('two', FakeClient())
+
+        def func(client):
+            if client is pool['two']:
+                raise RuntimeError('Failed')
+            return 1
+
+        with pytest.raises(RuntimeError):
+            pool.map(func)
+        assert pool.map(lambda c: 1, keys=['one']) == {'one': 1}
+
+    def test_submit_after_close(self, pool):
+        """
+        Tests submitting to a closed pool raises an exception
+        """
+        pool.register('one', FakeClient())
+        pool.close()
+        with pytest.raises(RuntimeError):
+            pool.submit('one', lambda c: None)
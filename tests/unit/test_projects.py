@@ -0,0 +1,92 @@
+"""
+Module for testing projects.py
+"""
+
+import pytest
+import uuid
+
+from unittest.mock import patch
+
+
+class TestDelete:
+
+    def test_delete_removes_project_tasks(self, fake_client):
+        """
+        Tests the tasks of the deleted projects are removed from the local state, and other tasks are kept
+        """
+        deleted = [{'id': str(uuid.uuid4())} for _ in range(2)]
+        kept = {'id': str(uuid.uuid4())}
+        fake_client.state['projects'].extend(deleted + [kept])
+        tasks = [{'id': str(uuid.uuid4()), 'projectId': project['id']} for project in deleted + [kept] * 2]
+        fake_client.state['tasks'].extend(tasks)
+
+        with patch('ticktick.api.TickTickClient.http_post'):
+            assert fake_client.project.delete([project['id'] for project in deleted]) == deleted
+
+        assert fake_client.task.get_from_project(kept['id']) == tasks[2:]
+        assert all(task not in fake_client.state['tasks'] for task in tasks[:2])
+        for task in tasks[2:]:
+            fake_client.delete_from_local_state(id=task['id'], search='tasks')
+        fake_client.delete_from_local_state(id=kept['id'], search='projects')
+
+    def test_delete_project_not_exist(self, fake_client):
+        with pytest.raises(ValueError):
+            fake_client.project.delete(str(uuid.uuid4()))
+
+
+class TestGetFromFolder:
+
+    def test_get_from_folder(self, fake_client):
+        """
+        Tests getting the projects in a folder
+        """
+        folder = {'id': str(uuid.uuid4())}
+        fake_client.state['project_folders'].append(folder)
+        projects = [{'id': str(uuid.uuid4()), 'groupId': folder['id']}, {'id': str(uuid.uuid4()), 'groupId': None}]
+        fake_client.state['projects'].extend(projects)
+        assert fake_client.project.get_from_folder(folder['id']) == projects[:1]
+        del fake_client.state['projects'][-2:]
+        fake_client.delete_from_local_state(id=folder['id'], search='project_folders')
+
+    def test_get_from_folder_not_exist(self, fake_client):
+        with pytest.raises(ValueError):
+            fake_client.project.get_from_folder(str(uuid.uuid4()))
+
+
+class TestBatchResults:
+
+    @staticmethod
+    def synced(objects, search, fake_client):
+        """
+        Returns a sync replacement that adds the objects to the local state
+        """
+        def sync():
+            fake_client.state[search].extend(objects)
+        return sync
+
+    def test_create_many_in_order(self, fake_client):
+        """
+        Tests created projects are returned in input order, including repeated names
+        """
+        sent = [{'name': 'b'}, {'name': 'a'}, {'name': 'b'}]
+        synced = [{'id': str(uuid.uuid4()), 'name': name} for name in ('a', 'b', 'b')]
+        response = {'id2etag': {obj['id']: 'etag' for obj in synced}, 'id2error': {}}
+
+        with patch('ticktick.api.TickTickClient.http_post', return_value=response), \
+                patch('ticktick.api.TickTickClient.sync', side_effect=self.synced(synced, 'projects', fake_client)):
+            created = fake_client.project.create(sent)
+        assert created == [synced[1], synced[0], synced[2]]
+        fake_client.delete_many_from_local_state('projects', ids=[obj['id'] for obj in synced])
+
+    def test_update_folders_by_id(self, fake_client):
+        """
+        Tests updated folders are matched by id, even when renamed
+        """
+        folders = [{'id': str(uuid.uuid4()), 'name': 'same'} for _ in range(2)]
+        response = {'id2etag': {folders[1]['id']: 'etag', folders[0]['id']: 'etag'}, 'id2error': {}}
+
+        with patch('ticktick.api.TickTickClient.http_post', return_value=response), \
+                patch('ticktick.api.TickTickClient.sync', side_effect=self.synced(folders, 'project_folders',
+                                                                                  fake_client)):
+            assert fake_client.project.update_folder(folders) == folders
+        fake_client.delete_many_from_local_state('project_folders', ids=[obj['id'] for obj in folders])
@@ -0,0 +1,140 @@
+"""
+Unit tests for provision.py
+"""
+
+import pytest
+
+from unittest.mock import patch
+
+from ticktick.helpers.object_id import check_object_id
+
+
+SPEC = {
+    'tags': [{'label': 'Team', 'children': [{'label': 'Blocked', 'color': '#E03131'}]}],
+    'folders': [{'name': 'Engineering', 'projects': [
+        {'name': 'Sprint', 'tasks': [
+            {'title': 'Plan', 'tags': ['team'], 'subtasks': [{'title': 'Estimate'}]},
+            {'title': 'Retro'}]},
+        {'name': 'Existing', 'tasks': [{'title': 'Triage'}]}]}],
+    'tasks': [{'title': 'Read Handbook'}]
+}
+
+
+@pytest.fixture
+def client(fake_client):
+    inbox_id = fake_client.inbox_id
+    fake_client.inbox_id = 'inbox1'
+    fake_client.state['projects'].append({'id': 'existing', 'name': 'existing', 'color': '#000000', 'groupId': None})
+    yield fake_client
+    fake_client.reset_local_state()
+    fake_client.inbox_id = inbox_id
+
+
+def apply(client, http_post):
+    """
+    Adds the objects sent in every request to the local state, like a sync would
+    """
+    searches = {'batch/projectGroup': 'project_folders', 'batch/tag': 'tags', 'batch/project': 'projects',
+                'batch/task': 'tasks'}
+    for call in http_post.call_args_list:
+        endpoint = call[0][0][len(client.BASE_URL):]
+        if endpoint in searches:
+            client.state[searches[endpoint]].extend(call[1]['json'].get('add', []))
+
+
+class TestProvision:
+
+    def test_plan(self, client):
+        """
+        Tests the plan creates in dependency order, and reuses and moves existing objects
+        """
+        plan = client.provision(SPEC, execute=False)
+        requests = plan.requests
+        assert [endpoint for endpoint, _ in requests] == ['batch/projectGroup', 'batch/tag', 'batch/tag',
+                                                          'batch/project', 'batch/project', 'batch/task',
+                                                          'batch/taskParent']
+        assert len(plan) == 7
+        folder = requests[0][1]['add'][0]
+        assert check_object_id(folder['id'])
+        assert requests[1][1]['add'][0]['name'] == 'team'
+        assert requests[2][1]['add'][0]['parent'] == 'team'
+        projects = requests[3][1]['add']
+        assert [project['name'] for project in projects] == ['Sprint']
+        assert projects[0]['groupId'] == folder['id']
+        assert requests[4][1] == {'update': [{'id': 'existing', 'name': 'existing', 'color': '#000000',
+                                              'groupId': folder['id']}]}
+        tasks = requests[5][1]['add']
+        assert [task['title'] for task in tasks] == ['Plan', 'Estimate', 'Retro', 'Triage', 'Read Handbook']
+        assert [task['projectId'] for task in tasks] == [projects[0]['id']] * 3 + ['existing', 'inbox1']
+        assert 'subtasks' not in tasks[0]
+        assert requests[6][1] == [{'parentId': tasks[0]['id'], 'projectId': projects[0]['id'],
+                                   'taskId': tasks[1]['id']}]
+
+    def test_execute(self, client):
+        """
+        Tests the requests are sent in order with one sync, and the synced objects are returned
+        """
+        with patch('ticktick.api.TickTickClient.http_post', return_value={'id2etag': {}, 'id2error': {}}) as post, \
+                patch('ticktick.api.TickTickClient.sync', side_effect=lambda: apply(client, post)) as sync:
+            created = client.provision(SPEC)
+        sync.assert_called_once()
+        assert post.call_count == 7
+        assert [folder['name'] for folder in created['project_folders']] == ['Engineering']
+        assert [tag['name'] for tag in created['tags']] == ['team', 'blocked']
+        assert [project['name'] for project in created['projects']] == ['Sprint', 'existing']
+        assert [task['title'] for task in created['tasks']] == ['Plan', 'Estimate', 'Retro', 'Triage',
+                                                                'Read Handbook']
+
+    def test_reused_in_place(self, client):
+        """
+        Tests reused projects already in the spec's folder are not moved, ignoring the case of names
+        """
+        client.state['project_folders'].append({'id': 'folder', 'name': 'Engineering'})
+        client.state['projects'][-1]['groupId'] = 'folder'
+        plan = client.provision({'folders': [{'name': 'ENGINEERING', 'projects': [{'name': 'EXISTING'}]}]},
+                                execute=False)
+        assert plan.requests == []
+        assert plan.objects == [('project_folders', 'folder'), ('projects', 'existing')]
+
+    def test_chunked(self, client):
+        spec = {'tasks': [{'title': str(n), 'subtasks': [{'title': f'{n}.1'}]} for n in range(3)]}
+        with patch('ticktick.api.TickTickClient.MAX_BATCH_SIZE', 2):
+            plan = client.provision(spec, execute=False)
+            assert [endpoint for endpoint, _ in plan.requests] == ['batch/task'] * 3 + ['batch/taskParent'] * 2
+
+    def test_errors(self, client):
+        with patch('ticktick.api.TickTickClient.http_post',
+                   return_value={'id2etag': {}, 'id2error': {'x': 'EXCEED_QUOTA'}}), \
+                patch('ticktick.api.TickTickClient.sync') as sync:
+            with pytest.raises(RuntimeError):
+                client.provision({'tasks': [{'title': 'One'}]})
+        sync.assert_called_once()
+
+    def test_failed_links_skipped(self, client):
+        """
+        Tests the nesting of tasks that could not be created is not sent
+        """
+        def http_post(url, json, **kwargs):
+            if url.endswith('batch/task'):
+                return {'id2etag': {}, 'id2error': {json['add'][0]['id']: 'EXCEED_QUOTA'}}
+            return {'id2etag': {}, 'id2error': {}}
+
+        with patch('ticktick.api.TickTickClient.http_post', side_effect=http_post) as post, \
+                patch('ticktick.api.TickTickClient.sync'):
+            with pytest.raises(RuntimeError):
+                client.provision({'tasks': [{'title': 'One', 'subtasks': [{'title': 'Two'}]}]})
+        assert post.call_count == 1
+
+    def test_invalid_spec(self, client):
+        with pytest.raises(TypeError):
+            client.provision([])
+        with pytest.raises(ValueError):
+            client.provision({'lists': []})
+        with pytest.raises(TypeError):
+            client.provision({'projects': [{'title': 'Work'}]})
+        with pytest.raises(ValueError):
+            client.provision({'projects': [{'name': 'Work'}, {'name': 'Work'}]})
+        with pytest.raises(ValueError):
+            client.provision({'tags': [{'label': 'Work', 'sort': 9}]})
+        with pytest.raises(ValueError):
+            client.provision({'projects': [{'name': 'Work', 'kind': 'LIST'}]})
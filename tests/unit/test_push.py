@@ -0,0 +1,107 @@
+"""
+Unit tests for push.py
+"""
+
+import pytest
+import queue
+import threading
+
+from unittest.mock import patch
+
+from ticktick.autosync import AdaptiveInterval
+from ticktick.push import PushListener
+from tests.conftest import batch_response
+
+
+class FakeConnection:
+    """
+    Local stand-in for the websocket - messages put on `messages` are received in order
+    """
+
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.closed = False
+
+    def recv(self):
+        return self.messages.get(timeout=5)
+
+    def close(self):
+        self.closed = True
+        self.messages.put(None)
+
+
+class FakeServer:
+
+    def __init__(self, fail=0):
+        self.connections = []
+        self.connected = threading.Semaphore(0)
+        self.fail = fail
+        self.requests = []
+
+    def connect(self, url, headers, cookie):
+        self.requests.append((url, cookie))
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError('Could Not Connect')
+        connection = FakeConnection()
+        self.connections.append(connection)
+        self.connected.release()
+        return connection
+
+
+class TestPushListener:
+
+    def test_syncs_on_notifications(self, fake_client):
+        """
+        Tests the client syncs on connect and on change notifications, but not on heartbeats
+        """
+        inbox_id = fake_client.inbox_id
+        server = FakeServer()
+        synced = queue.Queue()
+        responses = [batch_response([]), batch_response([{'id': '1', 'etag': 'a'}])]
+
+        def http_get(url, **kwargs):
+            response = responses.pop(0) if responses else batch_response([{'id': '1', 'etag': 'a'}])
+            synced.put(url)
+            return response
+
+        changes = []
+        with patch('ticktick.api.TickTickClient.http_get', side_effect=http_get):
+            listener = fake_client.start_push_sync(url='ws://localhost', connect=server.connect,
+                                                   on_change=changes.append)
+            with pytest.raises(RuntimeError):
+                fake_client.start_push_sync(connect=server.connect)
+            assert server.connected.acquire(timeout=5)
+            assert synced.get(timeout=5)
+            connection = server.connections[0]
+            connection.messages.put('hello')
+            connection.messages.put(b'{"type":"task"}')
+            assert synced.get(timeout=5)
+            fake_client.stop_push_sync(timeout=5)
+        assert not listener.running
+        assert connection.closed
+        assert server.requests == [('ws://localhost', f't={fake_client.access_token}')]
+        assert [event.key for event in changes[0]] == ['1']
+        assert fake_client.get_by_id('1', search='tasks') == {'id': '1', 'etag': 'a'}
+        assert fake_client.swap_on_sync
+        fake_client.swap_on_sync = False
+        fake_client.reset_local_state()
+        fake_client.inbox_id = inbox_id
+
+    def test_reconnects(self, fake_client):
+        """
+        Tests failed and lost connections are reported and retried
+        """
+        server = FakeServer(fail=1)
+        errors = []
+        listener = PushListener(fake_client, connect=server.connect, on_error=errors.append,
+                                reconnect=AdaptiveInterval(0.01, 0.02, initial=0.01))
+        with patch('ticktick.push.sync_changes', return_value=[]):
+            with listener:
+                assert server.connected.acquire(timeout=5)
+                server.connections[0].messages.put(None)
+                assert server.connected.acquire(timeout=5)
+        assert [type(error) for error in errors] == [ConnectionError, RuntimeError]
+        assert len(server.connections) == 2
+        assert not listener.running
+        fake_client.swap_on_sync = False
@@ -0,0 +1,85 @@
+"""
+Unit tests for helpers/query.py
+"""
+
+import pytest
+from datetime import date, datetime
+
+from ticktick.helpers.query import compile_filter, order, projector
+
+
+class TestProjector:
+
+    def test_project_multiple_fields(self):
+        """Tests the values are returned in the order of the fields"""
+        project = projector(['title', 'id'])
+        assert project({'id': 'abc', 'title': 'Read', 'priority': 3}) == ('Read', 'abc')
+
+    def test_project_single_field(self):
+        """Tests a single field still returns a tuple"""
+        assert projector('id')({'id': 'abc'}) == ('abc',)
+
+    def test_project_missing_field(self):
+        """Tests missing fields are None"""
+        assert projector(['id', 'dueDate'])({'id': 'abc'}) == ('abc', None)
+        assert projector('dueDate')({'id': 'abc'}) == (None,)
+
+    def test_project_no_fields(self):
+        """Tests an exception is raised when no fields are passed"""
+        with pytest.raises(ValueError):
+            projector([])
+
+
+class TestCompileFilter:
+
+    TASK = {'priority': 3, 'tags': ['work', 'Home'], 'title': 'Write Report',
+            'dueDate': '2021-01-13T08:00:00.000+0000', 'items': [{'status': 0}, {'status': 1}]}
+
+    @pytest.mark.parametrize('lookup, value, expected', [
+        ('priority', 3, True),
+        ('priority__gte', 3, True),
+        ('priority__lt', 3, False),
+        ('priority__in', [1, 3], True),
+        ('priority__nin', [1, 3], False),
+        ('tags__contains', 'work', True),
+        ('tags__icontains', 'home', True),
+        ('title__contains', 'Report', True),
+        ('title__startswith', 'Read', False),
+        ('items__status', 1, True),
+        ('items.status__gt', 1, False),
+        ('items__status__ne', 0, False),
+        ('content__exists', False, True),
+        ('content__ne', 'x', True),
+        ('content__lt', 3, False),
+        ('dueDate__lt', datetime(2021, 1, 13, 9), True),
+        ('dueDate__gte', date(2021, 1, 14), False),
+    ])
+    def test_operators(self, lookup, value, expected):
+        assert compile_filter(lookup, value)(self.TASK) is expected
+
+    def test_naive_datetime_time_zone(self):
+        """
+        Tests naive datetimes are in the passed time zone
+        """
+        due = compile_filter('dueDate__lte', datetime(2021, 1, 13, 0), 'US/Pacific')
+        assert due(self.TASK)
+        assert not compile_filter('dueDate__lte', datetime(2021, 1, 13, 0))(self.TASK)
+
+    def test_uncomparable_values(self):
+        """
+        Tests values that can not be compared do not match
+        """
+        assert not compile_filter('priority__gt', 'high')(self.TASK)
+        assert not compile_filter('title__gt', datetime(2021, 1, 1))(self.TASK)
+
+
+class TestOrder:
+
+    def test_order_multiple_fields(self):
+        """
+        Tests descending and ascending fields sort together, and missing fields sort last
+        """
+        objects = [{'id': 1, 'priority': 1, 'title': 'b'}, {'id': 2, 'title': 'a'},
+                   {'id': 3, 'priority': 5, 'title': 'c'}, {'id': 4, 'priority': 1, 'title': 'a'}]
+        assert [obj['id'] for obj in order(objects, ['-priority', 'title'])] == [3, 4, 1, 2]
+        assert [obj['id'] for obj in order(objects, 'priority')] == [1, 4, 3, 2]
@@ -0,0 +1,188 @@
+"""
+Module for testing tags.py
+"""
+
+import pytest
+import uuid
+
+from unittest.mock import patch
+
+from ticktick.helpers.concurrency import BatchRequestError
+
+
+@pytest.fixture
+def tags(fake_client):
+    """
+    Adds three fake tags to the local state and removes them after the test
+    """
+    added = [{'name': str(uuid.uuid4()), 'label': 'Tag', 'etag': str(uuid.uuid4())} for _ in range(3)]
+    fake_client.state['tags'].extend(added)
+    yield added
+    fake_client.delete_many_from_local_state('tags', etags=[tag['etag'] for tag in added])
+
+
+class TestDelete:
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_delete_many(self, sync, fake_client, tags):
+        """
+        Tests a request is sent per tag, then one sync
+        """
+        with patch('ticktick.api.TickTickClient.http_delete') as http_delete:
+            assert fake_client.tag.delete([tag['name'] for tag in tags]) == tags
+        assert sorted(call[1]['params']['name'] for call in http_delete.call_args_list) == \
+            sorted(tag['name'] for tag in tags)
+        sync.assert_called_once()
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_delete_errors(self, sync, fake_client, tags):
+        """
+        Tests failed deletes are reported together after syncing
+        """
+        def http_delete(url, params, **kwargs):
+            if params['name'] != tags[0]['name']:
+                raise RuntimeError('Could Not Complete Request')
+
+        with patch('ticktick.api.TickTickClient.http_delete', side_effect=http_delete):
+            with pytest.raises(BatchRequestError) as error:
+                fake_client.tag.delete([tag['name'] for tag in tags])
+        assert sorted(error.value.errors) == [1, 2]
+        sync.assert_called_once()
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_delete_return_shape(self, sync, fake_client, tags):
+        """
+        Tests a label returns the tag and raises the request error, and a list of one returns a list
+        """
+        with patch('ticktick.api.TickTickClient.http_delete'):
+            assert fake_client.tag.delete([tags[0]['name']]) == [tags[0]]
+            assert fake_client.tag.delete(tags[1]['name']) == tags[1]
+        with patch('ticktick.api.TickTickClient.http_delete', side_effect=RuntimeError('Could Not Complete Request')):
+            with pytest.raises(RuntimeError) as error:
+                fake_client.tag.delete(tags[2]['name'])
+        assert not isinstance(error.value, BatchRequestError)
+
+
+class TestMerge:
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_merge_many(self, sync, fake_client, tags):
+        with patch('ticktick.api.TickTickClient.http_put') as http_put:
+            assert fake_client.tag.merge([tags[0]['name'], tags[1]['name']], tags[2]['name']) == tags[2]
+        assert sorted(call[1]['json']['name'] for call in http_put.call_args_list) == \
+            sorted([tags[0]['name'], tags[1]['name']])
+        sync.assert_called_once()
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_merge_errors(self, sync, fake_client, tags):
+        """
+        Tests a label raises the request error, and a list raises every error together
+        """
+        with patch('ticktick.api.TickTickClient.http_put', side_effect=RuntimeError('Could Not Complete Request')):
+            with pytest.raises(RuntimeError) as error:
+                fake_client.tag.merge(tags[0]['name'], tags[2]['name'])
+            assert not isinstance(error.value, BatchRequestError)
+            with pytest.raises(BatchRequestError):
+                fake_client.tag.merge([tags[0]['name'], tags[1]['name']], tags[2]['name'])
+        assert sync.call_count == 2
+
+
+class TestColor:
+
+    def test_color_found_before_sync(self, fake_client, tags):
+        """
+        Tests lookups see the changed color even when the update fails
+        """
+        assert fake_client.query('tags', color='#FFFFFF') == []
+        with patch('ticktick.api.TickTickClient.http_post', side_effect=RuntimeError('Could Not Complete Request')), \
+                patch('ticktick.api.TickTickClient.sync'):
+            with pytest.raises(RuntimeError):
+                fake_client.tag.color(tags[0]['name'], '#FFFFFF')
+        assert fake_client.query('tags', color='#FFFFFF') == [tags[0]]
+
+
+class TestHierarchy:
+
+    def test_children(self, fake_client, tags):
+        """
+        Tests listing direct and nested children of a tag
+        """
+        tags[1]['parent'] = tags[0]['name']
+        tags[2]['parent'] = tags[1]['name']
+        assert fake_client.tag.children(tags[0]['name'].upper()) == [tags[1]]
+        assert fake_client.tag.children(tags[0]['name'], recursive=True) == [tags[1], tags[2]]
+        assert fake_client.tag.children(tags[2]['name']) == []
+        assert fake_client.tag.is_parent(tags[1]['name'])
+        assert not fake_client.tag.is_parent(tags[2]['name'])
+
+    def test_children_cycle(self, fake_client, tags):
+        """
+        Tests a cycle of parents is walked once
+        """
+        tags[0]['parent'] = tags[1]['name']
+        tags[1]['parent'] = tags[0]['name']
+        assert fake_client.tag.children(tags[0]['name'], recursive=True) == [tags[1]]
+
+    def test_children_tag_not_exist(self, fake_client):
+        with pytest.raises(ValueError):
+            fake_client.tag.children(str(uuid.uuid4()))
+        with pytest.raises(ValueError):
+            fake_client.tag.is_parent(str(uuid.uuid4()))
+
+    def test_builder_parent(self, fake_client, tags):
+        """
+        Tests the builder checks the parent and the label against the existing tags
+        """
+        built = fake_client.tag.builder('Child', parent=tags[0]['name'])
+        assert built['parent'] == tags[0]['name']
+        with pytest.raises(ValueError):
+            fake_client.tag.builder('Child', parent=str(uuid.uuid4()))
+        with pytest.raises(ValueError):
+            fake_client.tag.builder(tags[0]['name'])
+
+
+class TestBatchUpdates:
+
+    @staticmethod
+    def batch_response(url, json, **kwargs):
+        return {'id2etag': {tag['name']: tag['etag'] for tag in json['update']}, 'id2error': {}}
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_color_many_chunked(self, sync, fake_client, tags):
+        """
+        Tests many colors are sent in chunked batch requests, then one sync
+        """
+        with patch.object(fake_client, 'MAX_BATCH_SIZE', 2), \
+                patch('ticktick.api.TickTickClient.http_post', side_effect=self.batch_response) as http_post:
+            updated = fake_client.tag.color([tag['name'] for tag in tags], '#d00000')
+        assert updated == tags
+        assert [len(call[1]['json']['update']) for call in http_post.call_args_list] == [2, 1]
+        assert all(tag['color'] == '#d00000' for tag in tags)
+        sync.assert_called_once()
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_sorting_per_label(self, sync, fake_client, tags):
+        with patch('ticktick.api.TickTickClient.http_post', side_effect=self.batch_response):
+            assert fake_client.tag.sorting(tags[0]['name'], 1) == tags[0]
+            fake_client.tag.sorting([tags[1]['name'], tags[2]['name']], [2, 3])
+        assert [tag['sortType'] for tag in tags] == ['dueDate', 'title', 'priority']
+
+    def test_batch_errors(self, fake_client, tags):
+        with pytest.raises(ValueError):
+            fake_client.tag.color([tags[0]['name'], tags[1]['name']], ['#d00000'])
+        with pytest.raises(ValueError):
+            fake_client.tag.color([tags[0]['name'], str(uuid.uuid4())], '#d00000')
+        with pytest.raises(TypeError):
+            fake_client.tag.sorting([tags[0]['name']], '1')
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_rename_many(self, sync, fake_client, tags):
+        """
+        Tests renames are sent per tag then synced once, and new names can not repeat
+        """
+        with pytest.raises(ValueError):
+            fake_client.tag.rename([tags[0]['name'], tags[1]['name']], ['Same', 'same'])
+        with patch('ticktick.api.TickTickClient.http_put') as http_put:
+            fake_client.tag.rename([tags[0]['name'], tags[1]['name']], ['One', 'Two'])
+        assert sorted(call[1]['json']['newName'] for call in http_put.call_args_list) == ['One', 'Two']
+        sync.assert_called_once()
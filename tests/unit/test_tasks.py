@@ -6,6 +6,8 @@ import pytest
 import uuid
 import datetime
 
+from ticktick.helpers.concurrency import BatchRequestError
+from ticktick.helpers.object_id import check_object_id
 from ticktick.helpers.time_methods import convert_date_to_tick_tick_format
 from ticktick.managers.tasks import TaskManager
 from unittest.mock import patch
@@ -181,6 +183,45 @@ class TestComplete:
             assert task_client.complete(task) == task
 
 
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_complete_many(self, mock_object, task_client):
+        """
+        Tests completing a list of tasks sends a request per task and syncs once
+        """
+        tasks = [example_task_response() for _ in range(3)]
+        for i, task in enumerate(tasks):
+            task['id'] = str(i)
+
+        with patch('ticktick.api.TickTickClient.http_post', return_value='') as http_post:
+            assert task_client.complete(tasks) == tasks
+        assert sorted(call[1]['url'] for call in http_post.call_args_list) == \
+            sorted(task_client._generate_mark_complete_url(task['projectId'], task['id']) for task in tasks)
+        mock_object.assert_called_once()
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_complete_many_errors(self, mock_object, task_client):
+        """
+        Tests failed completions are reported together after syncing
+        """
+        tasks = [example_task_response() for _ in range(2)]
+        tasks[1]['id'] = 'fails'
+
+        def http_post(url, **kwargs):
+            if 'fails' in url:
+                raise RuntimeError('Could Not Complete Request')
+            return ''
+
+        with patch('ticktick.api.TickTickClient.http_post', side_effect=http_post):
+            with pytest.raises(BatchRequestError) as error:
+                task_client.complete(tasks)
+        assert list(error.value.errors) == [1]
+        assert error.value.results[0] == tasks[0]
+        mock_object.assert_called_once()
+
+        with pytest.raises(TypeError):
+            task_client.complete(['not a task'])
+
+
 class TestDelete:
 
     def test_generate_delete_url(self, task_client):
@@ -336,6 +377,179 @@ class TestGetFromProject:
             fake_client.task.get_from_project(str(uuid.uuid4()))
 
 
+class TestGetSubtasks:
+
+    def test_get_subtasks(self, task_client):
+        """
+        Tests getting only the direct subtasks of a task
+        """
+        parent = {'id': str(uuid.uuid4())}
+        child = {'id': str(uuid.uuid4()), 'parentId': parent['id'], 'title': 'child'}
+        grandchild = {'id': str(uuid.uuid4()), 'parentId': child['id']}
+        task_client._client.state['tasks'].extend([parent, child, grandchild])
+        assert task_client.get_subtasks(parent['id']) == [child]
+        assert task_client.get_subtasks(child['id'], fields='id') == [(grandchild['id'],)]
+        assert task_client.get_subtasks(grandchild['id']) == []
+        del task_client._client.state['tasks'][-3:]
+
+    def test_get_subtasks_task_not_exist(self, task_client):
+        with pytest.raises(ValueError):
+            task_client.get_subtasks(str(uuid.uuid4()))
+
+
+class TestTrees:
+
+    @pytest.fixture
+    def outline(self, task_client):
+        """
+        Adds the outline root -> (a -> a1, b) in project 'one' to the local state
+        """
+        root = {'id': str(uuid.uuid4()), 'projectId': 'one'}
+        a = {'id': str(uuid.uuid4()), 'projectId': 'one', 'parentId': root['id']}
+        a1 = {'id': str(uuid.uuid4()), 'projectId': 'one', 'parentId': a['id']}
+        b = {'id': str(uuid.uuid4()), 'projectId': 'one', 'parentId': root['id']}
+        other = {'id': str(uuid.uuid4()), 'projectId': 'two'}
+        tasks = [root, a, a1, b, other]
+        task_client._client.state['tasks'].extend(tasks)
+        task_client._client.state['projects'].append({'id': 'two'})
+        yield tasks
+        task_client._client.delete_many_from_local_state('tasks', ids=[task['id'] for task in tasks])
+        task_client._client.delete_many_from_local_state('projects', ids=['two'])
+
+    @staticmethod
+    def posted(http_post, endpoint):
+        return [call[1]['json'] for call in http_post.call_args_list if call[0][0].endswith(endpoint)]
+
+    def test_tree(self, task_client, outline):
+        root, a, a1, b, other = outline
+        assert task_client.tree(root['id']) == {'task': root, 'children': [
+            {'task': a, 'children': [{'task': a1, 'children': []}]},
+            {'task': b, 'children': []}]}
+        assert task_client.tree(other['id']) == {'task': other, 'children': []}
+        with pytest.raises(ValueError):
+            task_client.tree(str(uuid.uuid4()))
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_move_tree(self, sync, task_client, outline):
+        """
+        Tests every task of the tree is moved in one request, and the subtasks are nested again in one request
+        """
+        root, a, a1, b, other = outline
+        with patch('ticktick.api.TickTickClient.http_post') as http_post:
+            task_client.move_tree(a['id'], 'two')
+        assert self.posted(http_post, 'batch/taskProject') == [[
+            {'fromProjectId': 'one', 'taskId': a['id'], 'toProjectId': 'two'},
+            {'fromProjectId': 'one', 'taskId': a1['id'], 'toProjectId': 'two'}]]
+        assert self.posted(http_post, 'batch/taskParent') == [[
+            {'oldParentId': root['id'], 'projectId': 'two', 'taskId': a['id']},
+            {'parentId': a['id'], 'projectId': 'two', 'taskId': a1['id']}]]
+        sync.assert_called_once()
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_reparent(self, sync, task_client, outline):
+        root, a, a1, b, other = outline
+        with patch('ticktick.api.TickTickClient.http_post') as http_post:
+            tree = task_client.reparent([a['id'], b['id']], other['id'])
+        assert tree['task'] is other
+        assert len(self.posted(http_post, 'batch/taskProject')[0]) == 3
+        assert self.posted(http_post, 'batch/taskParent')[0][0] == \
+            {'parentId': other['id'], 'projectId': 'two', 'taskId': a['id']}
+
+        with patch('ticktick.api.TickTickClient.http_post') as http_post:
+            task_client.reparent([a['id'], b['id']], None)
+        assert self.posted(http_post, 'batch/taskProject') == []
+        assert self.posted(http_post, 'batch/taskParent') == [[
+            {'oldParentId': root['id'], 'projectId': 'one', 'taskId': a['id']},
+            {'oldParentId': root['id'], 'projectId': 'one', 'taskId': b['id']}]]
+
+    def test_create_tree(self, task_client):
+        """
+        Tests a tree is created with one task request and one parent request using local ids
+        """
+        client = task_client._client
+        sent = []
+
+        def sync():
+            # The server applies the parents to the created tasks
+            parents = {link['taskId']: link['parentId'] for link in self.posted(http_post, 'batch/taskParent')[0]}
+            for obj in self.posted(http_post, 'batch/task')[0]['add']:
+                sent.append(dict(obj, parentId=parents.get(obj['id'])) if obj['id'] in parents else obj)
+            client.state['tasks'].extend(sent)
+
+        spec = {'task': {'title': 'Trip', 'projectId': 'one'}, 'children': [
+            {'task': {'title': 'Pack'}, 'children': [{'task': {'title': 'Socks'}, 'children': []}]},
+            {'task': {'title': 'Hotel'}, 'children': []}]}
+        with patch('ticktick.api.TickTickClient.http_post', return_value={'id2etag': {}, 'id2error': {}}) as http_post, \
+                patch('ticktick.api.TickTickClient.sync', side_effect=sync) as synced:
+            tree = task_client.create_tree(spec)
+        synced.assert_called_once()
+        assert http_post.call_count == 2
+        trip, pack, socks, hotel = sent
+        assert [obj['title'] for obj in sent] == ['Trip', 'Pack', 'Socks', 'Hotel']
+        assert all(check_object_id(obj['id']) and obj['projectId'] == 'one' for obj in sent)
+        assert self.posted(http_post, 'batch/taskParent') == [[
+            {'parentId': trip['id'], 'projectId': 'one', 'taskId': pack['id']},
+            {'parentId': pack['id'], 'projectId': 'one', 'taskId': socks['id']},
+            {'parentId': trip['id'], 'projectId': 'one', 'taskId': hotel['id']}]]
+        assert tree['task'] is trip
+        assert [child['task']['title'] for child in tree['children']] == ['Pack', 'Hotel']
+        assert 'id' not in spec['task']
+        with pytest.raises(TypeError):
+            task_client.create_tree({'children': []})
+        client.delete_many_from_local_state('tasks', ids=[obj['id'] for obj in sent])
+
+    def test_create_tree_failed_links_skipped(self, task_client):
+        """
+        Tests the nesting of tasks that could not be created is not sent
+        """
+        def http_post(url, json, **kwargs):
+            if 'add' in json:
+                pack = next(obj for obj in json['add'] if obj['title'] == 'Pack')
+                return {'id2etag': {}, 'id2error': {pack['id']: 'EXCEED_QUOTA'}}
+            return {}
+
+        spec = {'task': {'title': 'Trip', 'projectId': 'one'}, 'children': [
+            {'task': {'title': 'Pack'}, 'children': [{'task': {'title': 'Socks'}, 'children': []}]},
+            {'task': {'title': 'Hotel'}, 'children': []}]}
+        with patch('ticktick.api.TickTickClient.http_post', side_effect=http_post) as posted, \
+                patch('ticktick.api.TickTickClient.sync'):
+            with pytest.raises(RuntimeError):
+                task_client.create_tree(spec)
+        trip, pack, socks, hotel = self.posted(posted, 'batch/task')[0]['add']
+        assert self.posted(posted, 'batch/taskParent') == [[
+            {'parentId': trip['id'], 'projectId': 'one', 'taskId': hotel['id']}]]
+
+    def test_reparent_under_own_subtask(self, task_client, outline):
+        root, a, a1, b, other = outline
+        with pytest.raises(ValueError):
+            task_client.reparent(root['id'], a1['id'])
+
+
+class TestBetween:
+
+    def test_between(self, task_client):
+        """
+        Tests tasks overlapping the range are found in start date order
+        """
+        tasks = [{'id': 'long', 'startDate': '2021-01-01T08:00:00.000+0000', 'dueDate': '2021-01-20T08:00:00.000+0000'},
+                 {'id': 'due', 'dueDate': '2021-01-12T08:00:00+0000'},
+                 {'id': 'after', 'startDate': '2021-01-16T08:00:00.000+0000'},
+                 {'id': 'before', 'startDate': '2020-12-30T08:00:00.000+0000',
+                  'dueDate': '2020-12-31T08:00:00.000+0000'},
+                 {'id': 'undated'}]
+        task_client._client.state['tasks'].extend(tasks)
+        found = task_client.between(datetime.datetime(2021, 1, 10), datetime.datetime(2021, 1, 15), tz='US/Pacific')
+        assert [task['id'] for task in found] == ['long', 'due']
+        found = task_client.between(datetime.datetime(2021, 1, 16, 8), datetime.datetime(2021, 1, 17), tz='UTC')
+        assert [task['id'] for task in found] == ['long', 'after']
+        del task_client._client.state['tasks'][-5:]
+        assert task_client.between(datetime.datetime(2021, 1, 10), datetime.datetime(2021, 1, 15)) == []
+
+    def test_between_end_before_start(self, task_client):
+        with pytest.raises(ValueError):
+            task_client.between(datetime.datetime(2021, 1, 15), datetime.datetime(2021, 1, 10))
+
+
 class TestTimeConversions:
 
     def test_dates_just_start(self, task_client):
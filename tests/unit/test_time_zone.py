@@ -1,7 +1,8 @@
 """Testing module for local timezone to UTC conversion"""
 
 from datetime import datetime
-from ticktick.helpers.time_methods import convert_local_time_to_utc, convert_date_to_tick_tick_format
+from ticktick.helpers.time_methods import convert_local_time_to_utc, convert_date_to_tick_tick_format, \
+    parse_tick_tick_date
 
 
 def test_pacific_time():
@@ -45,3 +46,9 @@ def test_convert_iso_to_tick_tick_2():
     expected = '2022-12-31T08:00:00+0000'
     assert convert_date_to_tick_tick_format(date, 'US/Pacific') == expected
 
+
+
+def test_parse_tick_tick_date():
+    expected_utc = datetime(2021, 1, 14, 0, 0)
+    assert parse_tick_tick_date('2021-01-13T16:00:00.000-0800') == expected_utc
+    assert parse_tick_tick_date('2021-01-14T00:00:00+0000') == expected_utc
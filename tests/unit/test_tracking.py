@@ -0,0 +1,79 @@
+"""
+Unit tests for tracking.py
+"""
+
+import pytest
+
+from unittest.mock import patch
+
+from ticktick.tracking import ChangeTracker
+
+
+@pytest.fixture
+def tracked(fake_client):
+    """
+    Tracks changes on the fake client with one task and one tag in the snapshot
+    """
+    task = {'id': 'tracked', 'projectId': 'inbox', 'etag': 'a', 'title': 'Dentist', 'items': [{'status': 0}]}
+    tag = {'name': 'tracked', 'label': 'Tracked', 'etag': 'b', 'color': '#000000'}
+    fake_client.state['tasks'].append(task)
+    fake_client.state['tags'].append(tag)
+    fake_client.tracker = ChangeTracker()
+    fake_client.tracker.snapshot(fake_client.state)
+    yield task, tag
+    fake_client.tracker = None
+    fake_client.delete_many_from_local_state('tasks', ids=['tracked'])
+    fake_client.delete_many_from_local_state('tags', etags=['b'])
+
+
+class TestChangeTracker:
+
+    def test_changes(self, fake_client, tracked):
+        """
+        Tests scalar and nested changes are found
+        """
+        task, tag = tracked
+        tracker = fake_client.tracker
+        assert tracker.changes('tasks', task) == {}
+        task['title'] = 'Doctor'
+        task['items'][0]['status'] = 2
+        task['priority'] = 5
+        assert tracker.changes('tasks', task) == {'title': 'Doctor', 'items': [{'status': 2}], 'priority': 5}
+
+    def test_changes_unknown(self, fake_client, tracked):
+        """
+        Tests changes are unknown for untracked, stale and trimmed objects
+        """
+        task, tag = tracked
+        tracker = fake_client.tracker
+        assert tracker.changes('tasks', {'id': 'other', 'etag': 'a'}) is None
+        assert tracker.changes('tasks', dict(task, etag='z')) is None
+        trimmed = dict(task)
+        del trimmed['items']
+        assert tracker.changes('tasks', trimmed) is None
+        assert tracker.unchanged('tags', dict(tag))
+
+
+class TestDiffUpdates:
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_task_update_sends_changes(self, sync, fake_client, tracked):
+        """
+        Tests only the changed fields are sent, and unchanged tasks are not sent at all
+        """
+        task, tag = tracked
+        with patch('ticktick.api.TickTickClient.http_post') as http_post:
+            assert fake_client.task.update(task) is task
+            http_post.assert_not_called()
+            task['title'] = 'Doctor'
+            fake_client.task.update(task)
+        assert http_post.call_args[1]['json'] == {'id': 'tracked', 'projectId': 'inbox', 'title': 'Doctor'}
+
+    @patch('ticktick.api.TickTickClient.sync')
+    def test_tag_update_skips_unchanged(self, sync, fake_client, tracked):
+        task, tag = tracked
+        with patch('ticktick.api.TickTickClient.http_post') as http_post:
+            assert fake_client.tag.update(tag) is tag
+            assert fake_client.tag.color(tag['name'], '#000000') is tag
+        http_post.assert_not_called()
+        sync.assert_not_called()
@@ -1,13 +1,42 @@
+import importlib
+import itertools
 import secrets
 
-from ticktick.managers.focus import FocusTimeManager
-from ticktick.managers.habits import HabitManager
-from ticktick.managers.pomo import PomoManager
-from ticktick.managers.projects import ProjectManager
-from ticktick.managers.settings import SettingsManager
-from ticktick.managers.tags import TagsManager
-from ticktick.managers.tasks import TaskManager
+from ticktick.helpers.concurrency import SingleFlight
+from ticktick.helpers.query import compile_filter, order, projector, split_lookup
+from ticktick.index import StateIndex
 from ticktick.oauth2 import OAuth2
+from ticktick.tracking import ChangeTracker
+
+_MISSING = object()
+
+# Filter values the lookup tables can be used for - the types state holds them as. Others, like dates,
+# are converted by the filters before comparing.
+_INDEXABLE = (str, int, float, type(None))
+
+
+class _LazyManager:
+    """
+    Descriptor that imports and builds a manager the first time it is accessed on a client.
+
+    The built manager is stored on the instance, so later lookups skip the descriptor entirely.
+    """
+
+    def __init__(self, module: str, name: str):
+        self.module = module
+        self.name = name
+        self.attribute = None
+
+    def __set_name__(self, owner, name):
+        self.attribute = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        manager_class = getattr(importlib.import_module(self.module), self.name)
+        manager = manager_class(instance)
+        instance.__dict__[self.attribute] = manager
+        return manager
 
 
 class TickTickClient:
@@ -24,7 +53,23 @@ class TickTickClient:
     HEADERS = {'User-Agent': USER_AGENT,
                'x-device': X_DEVICE_}
 
-    def __init__(self, username: str, password: str, oauth: OAuth2) -> None:
+    # Maximum number of requests sent at the same time for endpoints without a batch form
+    MAX_WORKERS = 8
+
+    # Maximum number of objects sent in a single batch request
+    MAX_BATCH_SIZE = 100
+
+    # Mangers for the different operations -> built on first access
+    focus = _LazyManager('ticktick.managers.focus', 'FocusTimeManager')
+    habit = _LazyManager('ticktick.managers.habits', 'HabitManager')
+    project = _LazyManager('ticktick.managers.projects', 'ProjectManager')
+    pomo = _LazyManager('ticktick.managers.pomo', 'PomoManager')
+    settings = _LazyManager('ticktick.managers.settings', 'SettingsManager')
+    tag = _LazyManager('ticktick.managers.tags', 'TagsManager')
+    task = _LazyManager('ticktick.managers.tasks', 'TaskManager')
+
+    def __init__(self, username: str, password: str, oauth: OAuth2, track_changes: bool = False,
+                 merge_on_sync: bool = False, swap_on_sync: bool = False) -> None:
         """
         Initializes a client session. In order to interact with the API
         a successful login must occur.
@@ -33,6 +78,12 @@ class TickTickClient:
             username: TickTick Username
             password: TickTick Password
             oauth: OAuth2 manager
+            track_changes: Remember the objects as of each sync in a [ChangeTracker][tracking.ChangeTracker],
+                so updates only send changed fields and skip unchanged objects.
+            merge_on_sync: Merge each [`sync`][api.TickTickClient.sync] into the existing [`state`](api.md#state)
+                objects instead of replacing them. See `merge_on_sync`.
+            swap_on_sync: Make every [`sync`][api.TickTickClient.sync] a state swap - see `swap`. Turned on by
+                background syncing, so the syncs made after writes are never half applied for reader threads.
 
         Raises:
             RunTimeError: If the login was not successful.
@@ -44,22 +95,21 @@ class TickTickClient:
         self.time_zone = ''
         self.profile_id = ''
         self.inbox_id = ''
-        self.state = {}
+        self._index = None
+        self.tracker = ChangeTracker() if track_changes else None
+        self._events = None
+        self.merge_on_sync = merge_on_sync
+        self.swap_on_sync = swap_on_sync
+        self._syncer = None
+        self._pusher = None
+        self._flights = SingleFlight()
+        self._batch = None
         self.reset_local_state()
         self.oauth_manager = oauth
         self._session = self.oauth_manager.session
 
         self._prepare_session(username, password)
 
-        # Mangers for the different operations
-        self.focus = FocusTimeManager(self)
-        self.habit = HabitManager(self)
-        self.project = ProjectManager(self)
-        self.pomo = PomoManager(self)
-        self.settings = SettingsManager(self)
-        self.tag = TagsManager(self)
-        self.task = TaskManager(self)
-
     def _prepare_session(self, username, password):
         """
         Creates all the necessary calls to prepare the session
@@ -68,6 +118,29 @@ class TickTickClient:
         self._settings()
         self.sync()
 
+    @property
+    def state(self) -> dict:
+        """
+        The local copy of the TickTick account. See [`state`](api.md#state).
+        """
+        return self._index.state
+
+    @state.setter
+    def state(self, value: dict):
+        self._index = StateIndex(value)
+
+    @property
+    def events(self):
+        """
+        The [EventFeed][events.EventFeed] of changes found at each [`sync`][api.TickTickClient.sync].
+
+        Changes are only tracked once this is first accessed.
+        """
+        if self._events is None:
+            from ticktick.events import EventFeed
+            self._events = EventFeed(self.state)
+        return self._events
+
     def reset_local_state(self):
         """
         Resets the contents of the items in the [`state`](api.md#state) dictionary.
@@ -82,6 +155,28 @@ class TickTickClient:
             'profile': {}
         }
 
+    def invalidate_index(self, search: str = None) -> None:
+        """
+        Throws away the lookup tables kept for [`state`](api.md#state), so they are rebuilt on the next lookup.
+
+        The tables behind [`query`][api.TickTickClient.query], [`get_by_id`][api.TickTickClient.get_by_id] and
+        the manager lookups follow syncs and the changes made through the managers, but not fields of `state`
+        objects changed in place by your own code - call this after changing them, before looking them up by
+        the new values.
+
+        !!! example
+            ```python
+            # Assumes that `client` is the name referencing the TickTickClient instance.
+            client.state['tasks'][0]['priority'] = 5
+            client.invalidate_index('tasks')
+            client.query('tasks', priority=5)  # Finds the changed task
+            ```
+
+        Arguments:
+            search: Key in [`state`](api.md#state) whose tables to throw away, or every list when not passed.
+        """
+        self._index.invalidate(search)
+
     def _login(self, username: str, password: str) -> None:
         """
         Logs in to TickTick and sets the instance access token.
@@ -140,33 +235,255 @@ class TickTickClient:
 
         return response
 
-    def sync(self):
+    def sync(self, swap: bool = False):
         """
         Populates the `TickTickClient` [`state`](api.md#state) dictionary with the contents of your account.
 
         **This method is called when necessary by other methods and does not need to be explicitly called.**
 
+        Arguments:
+            swap: Build the synced [`state`](api.md#state) and its lookup tables as a new dictionary, then swap
+                it in with a single assignment - so other threads see either the old or the new state,
+                never a mix. Takes precedence over `merge_on_sync`, which changes objects other threads may be
+                reading. Every sync swaps while `swap_on_sync` is set - which starting a
+                [background syncer][autosync.BackgroundSyncer], [push listener][push.PushListener] or
+                [polling scheduler][polling.PollingScheduler] does, so concurrent syncs all swap whichever of
+                them makes the request.
+
+        Calls made while another thread is syncing are coalesced: they wait for and share the next sync, made
+        with the options of the first of them.
+
         Returns:
             httpx: The response from the get request.
 
         Raises:
             RunTimeError: If the request could not be completed.
         """
+        # Concurrent syncs share one request - made after the latest of them was called, so writes made
+        # before calling sync are always included
+        return self._flights.do('sync', lambda: self._sync(swap), fresh=True)
+
+    def _sync(self, swap: bool):
+        """
+        Requests the account contents and applies them to [`state`](api.md#state). See `sync`.
+        """
         response = self.http_get(self.INITIAL_BATCH_URL, cookies=self.cookies, headers=self.HEADERS)
 
         # Inbox Id
         self.inbox_id = response['inboxId']
-        # Set list groups
-        self.state['project_folders'] = response['projectGroups']
-        # Set lists
-        self.state['projects'] = response['projectProfiles']
-        # Set Uncompleted Tasks
-        self.state['tasks'] = response['syncTaskBean']['update']
-        # Set tags
-        self.state['tags'] = response['tags']
+        merged = None
+        if swap or self.swap_on_sync:
+            self._swap(response)
+        elif self.merge_on_sync:
+            merged = self._merge(response)
+        else:
+            # Set list groups
+            self.state['project_folders'] = response['projectGroups']
+            # Set lists
+            self.state['projects'] = response['projectProfiles']
+            # Set Uncompleted Tasks
+            self.state['tasks'] = response['syncTaskBean']['update']
+            # Set tags
+            self.state['tags'] = response['tags']
+        # Remember the synced objects for sending only changed fields
+        if self.tracker is not None:
+            self.tracker.snapshot(self.state)
+        # Publish the changes last, so subscribers see the sync fully applied
+        if self._events is not None:
+            if merged is not None:
+                self._events.apply(merged)
+            else:
+                self._events.record(self.state)
 
         return response
 
+    def start_auto_sync(self, minimum: float = 5, maximum: float = 300, on_error=None):
+        """
+        Starts syncing [`state`](api.md#state) from a background thread.
+
+        Syncs happen more often while the account is changing and less often while it is idle, between
+        `minimum` and `maximum` seconds apart. See [BackgroundSyncer][autosync.BackgroundSyncer].
+
+        !!! example
+            ```python
+            # Assumes that `client` is the name referencing the TickTickClient instance.
+            client.start_auto_sync(minimum=10, maximum=600)
+
+            # Lookups read the latest synced state without waiting on the network
+            task = client.get_by_id(task_id, search='tasks')
+
+            client.stop_auto_sync()
+            ```
+
+        Arguments:
+            minimum: Shortest time between syncs in seconds.
+            maximum: Longest time between syncs in seconds.
+            on_error (callable): Called with the exception when a background sync fails.
+
+        Returns:
+            BackgroundSyncer: The running syncer.
+
+        Raises:
+            RuntimeError: If auto sync is already running.
+        """
+        from ticktick.autosync import AdaptiveInterval, BackgroundSyncer
+
+        if self._syncer is not None and self._syncer.running:
+            raise RuntimeError('Auto Sync Is Already Running')
+        interval = AdaptiveInterval(minimum, maximum, initial=minimum)
+        self._syncer = BackgroundSyncer(self, interval, on_error=on_error).start()
+        return self._syncer
+
+    def stop_auto_sync(self, timeout: float = None) -> None:
+        """
+        Stops the background syncing started by [`start_auto_sync`][api.TickTickClient.start_auto_sync].
+        """
+        if self._syncer is not None:
+            self._syncer.stop(timeout)
+            self._syncer = None
+
+    def start_push_sync(self, url: str = None, connect=None, on_change=None, on_error=None):
+        """
+        Starts syncing [`state`](api.md#state) whenever the server pushes a change notification over the
+        web client websocket, instead of polling. Needs the optional `websocket-client` package
+        (`pip install ticktick-py[push]`). See [PushListener][push.PushListener].
+
+        !!! example
+            ```python
+            # Assumes that `client` is the name referencing the TickTickClient instance.
+            client.start_push_sync(on_change=lambda events: print(len(events), 'changes'))
+            ...
+            client.stop_push_sync()
+            ```
+
+        Arguments:
+            url: The websocket url. Defaults to the web client's.
+            connect (callable): Opens the websocket - see [PushListener][push.PushListener].
+            on_change (callable): Called with the [change events][events.ChangeEvent] of every sync that
+                found changes.
+            on_error (callable): Called with the exception when the connection or a sync fails.
+
+        Returns:
+            PushListener: The running listener.
+
+        Raises:
+            RuntimeError: If push sync is already running.
+        """
+        from ticktick.push import PUSH_URL, PushListener
+
+        if self._pusher is not None and self._pusher.running:
+            raise RuntimeError('Push Sync Is Already Running')
+        self._pusher = PushListener(self, url or PUSH_URL, connect=connect, on_change=on_change,
+                                    on_error=on_error).start()
+        return self._pusher
+
+    def stop_push_sync(self, timeout: float = None) -> None:
+        """
+        Stops the push syncing started by [`start_push_sync`][api.TickTickClient.start_push_sync].
+        """
+        if self._pusher is not None:
+            self._pusher.stop(timeout)
+            self._pusher = None
+
+    def batch(self, window: float = None):
+        """
+        Opens an [AutoBatch][batching.AutoBatch]: until the block exits, single object writes through the managers
+        are queued and sent together as `batch/project`, `batch/tag` and `batch/task` requests followed by one
+        sync. The writes return futures of their results.
+
+        !!! example
+            ```python
+            # Assumes that `client` is the name referencing the TickTickClient instance.
+            with client.batch():
+                futures = [client.task.update(task) for task in changed_tasks]
+                client.tag.color('work', '#FFFFFF')
+
+            updated = [future.result() for future in futures]
+            ```
+
+            Long running code can keep a batch open and flush it every `window` seconds:
+
+            ```python
+            with client.batch(window=0.05):
+                serve_forever()  # Writes from any thread share a request every 50ms
+            ```
+
+        Arguments:
+            window: Seconds after the first queued write to flush the batch. `None` only flushes on exit.
+
+        Returns:
+            AutoBatch: The batch - use it as a context manager.
+        """
+        from ticktick.batching import AutoBatch
+
+        return AutoBatch(self, window)
+
+    def provision(self, spec: dict, execute: bool = True):
+        """
+        Creates the folders, tags, projects, tasks and subtasks described by a declarative spec with as few
+        batch requests as possible, and syncs once. See [ProvisioningPlan][provision.ProvisioningPlan] for the
+        spec format.
+
+        !!! example
+            ```python
+            # Assumes that `client` is the name referencing the TickTickClient instance.
+            created = client.provision({
+                'folders': [{'name': 'Engineering', 'projects': [
+                    {'name': 'Sprint', 'tasks': [{'title': 'Plan', 'subtasks': [{'title': 'Estimate'}]}]}]}]
+            })
+            created['tasks']  # The synced Plan and Estimate tasks
+            ```
+
+        Arguments:
+            spec: What to create.
+            execute: Whether to send the requests. When `False` the plan is returned without sending anything.
+
+        Returns:
+            dict or ProvisioningPlan: The synced objects of the spec by `state` key, or the plan.
+
+        Raises:
+            TypeError: If a part of the spec has the wrong type.
+            ValueError: If the spec is not valid.
+            RuntimeError: If the objects could not be created.
+        """
+        from ticktick.provision import ProvisioningPlan
+
+        plan = ProvisioningPlan(self, spec)
+        return plan.execute() if execute else plan
+
+    def _swap(self, response: dict) -> None:
+        """
+        Builds the synced state and its id lookup tables off to the side, then swaps them in.
+        """
+        state = dict(self.state)
+        state['project_folders'] = response['projectGroups']
+        state['projects'] = response['projectProfiles']
+        state['tasks'] = response['syncTaskBean']['update']
+        state['tags'] = response['tags']
+        index = StateIndex(state)
+        for search in ('project_folders', 'projects', 'tasks'):
+            index.table(search, 'id')
+        index.table('tags', 'name')
+        # A single assignment -> readers get the old or the new state and tables, never a mix
+        self._index = index
+
+    def _merge(self, response: dict) -> list:
+        """
+        Merges the synced lists into the existing [`state`](api.md#state) objects, and returns the change events.
+        """
+        from ticktick.events import merge
+
+        events = merge(self.state, {
+            'project_folders': response['projectGroups'],
+            'projects': response['projectProfiles'],
+            'tasks': response['syncTaskBean']['update'],
+            'tags': response['tags']
+        })
+        # Objects were changed in place -> the lookup tables of the changed lists are out of date
+        for search in {event.search for event in events}:
+            self._index.invalidate(search)
+        return events
+
     def http_post(self, url, **kwargs):
         """
         Sends an http post request with the specified url and keyword arguments.
@@ -193,6 +510,9 @@ class TickTickClient:
         """
         Sends an http get request with the specified url and keyword arguments.
 
+        Identical requests (same url and `params`) made at the same time from different threads are sent
+        once, and every caller gets the same parsed response - so it should not be modified.
+
         Arguments:
             url (str): Url to send the request.
             **kwargs: Arguments to send with the request.
@@ -203,6 +523,28 @@ class TickTickClient:
         Raises:
             RunTimeError: If the request could not be completed.
         """
+        key = self._request_key(url, kwargs)
+        if key is None:
+            return self._get(url, **kwargs)
+        return self._flights.do(key, lambda: self._get(url, **kwargs))
+
+    @staticmethod
+    def _request_key(url, kwargs):
+        """
+        Returns the key identifying a get request, or `None` if it cannot be shared.
+        """
+        if not set(kwargs) <= {'params', 'cookies', 'headers'}:
+            return None
+        params = kwargs.get('params') or {}
+        try:
+            return 'GET', url, tuple(sorted((str(name), str(value)) for name, value in params.items()))
+        except AttributeError:
+            return None
+
+    def _get(self, url, **kwargs):
+        """
+        Sends the get request. See `http_get`.
+        """
         response = self._session.get(url, **kwargs)
         self.check_status_code(response, 'Could Not Complete Request')
 
@@ -307,7 +649,7 @@ class TickTickClient:
                 etags.append(etag[etag2[key]])
             return etags
 
-    def get_by_fields(self, search: str = None, **kwargs):
+    def get_by_fields(self, search: str = None, fields=None, first: bool = False, **kwargs):
         """
         Finds and returns the objects in `state` that match the inputted fields.
 
@@ -341,11 +683,25 @@ class TickTickClient:
 
             The search will now only look through `tasks` in [`state`](api.md#state).
 
+            If only a few fields of each object are needed, pass them with `fields` to get back
+            lightweight tuples instead of the full dictionaries.
+
+            ```python
+            # Assumes that `client` is the name referencing the TickTickClient instance.
+
+            found = client.get_by_fields(projectId=client.inbox_id, search='tasks', fields=['id', 'title'])
+            ```
+
+            `found` would now reference tuples like `('5ff2bcf68f08093e5b745a30', 'Hello')`.
+
 
         Arguments:
             search: Key in [`state`](api.md#state) that the search should take place in. If empty the
             entire [`state`](api.md#state) dictionary will be searched.
-            **kwargs: Matching fields in the object to look for.
+            fields (str or list): Field name(s) to project the found objects down to. See
+            [projector][helpers.query.projector].
+            first: Stop at the first matching object and always return a single object.
+            **kwargs: Matching fields in the object to look for. Objects missing a field do not match.
 
         Returns:
             dict or list:
@@ -355,6 +711,15 @@ class TickTickClient:
 
             **Nothing Found (list)**: Empty List
 
+            When `fields` is passed the objects are replaced by their projected tuples.
+
+            When `first` is true, the dictionary of the first matching object or an empty dictionary
+            (an empty tuple when `fields` is passed).
+
+        !!! tip
+            For a stable return type and scans that stop early, see
+            [`iter_by_fields`][api.TickTickClient.iter_by_fields].
+
         Raises:
             ValueError: If no key word arguments are provided.
             KeyError: If the search key provided is not a key in `state`.
@@ -362,55 +727,182 @@ class TickTickClient:
         if kwargs == {}:
             raise ValueError('Must Include Field(s) To Be Searched For')
 
-        if search is not None and search not in self.state:
-            raise KeyError(f"'{search}' Is Not Present In self.state Dictionary")
-
-        objects = []
-        if search is not None:
-            # If a specific key was passed for self.state
-            # Go through self.state[key_name] and see if all the fields in kwargs match
-            # If all don't match return empty list
-            for index in self.state[search]:
-                all_match = True
-                for field in kwargs:
-                    if kwargs[field] != index[field]:
-                        all_match = False
-                        break
-                if all_match:
-                    objects.append(index)
-
-        else:
-            # No key passed, search entire self.state dictionary
-            # Search the first level of the state dictionary
-            for primarykey in self.state:
-                skip_primary_key = False
-                all_match = True
-                middle_key = 0
-                # Search the individual lists of the dictionary
-                for middle_key in range(len(self.state[primarykey])):
-                    if skip_primary_key:
-                        break
-                    # Match the fields in the kwargs dictionary to the specific object -> if all match add index
-                    for fields in kwargs:
-                        # if the field doesn't exist, we can assume every other item in the list doesn't have the
-                        # field either -> so skip this primary_key entirely
-                        if fields not in self.state[primarykey][middle_key]:
-                            all_match = False
-                            skip_primary_key = True
-                            break
-                        if kwargs[fields] == self.state[primarykey][middle_key][fields]:
-                            all_match = True
-                        else:
-                            all_match = False
-                    if all_match:
-                        objects.append(self.state[primarykey][middle_key])
+        found = self.iter_by_fields(search=search, fields=fields, **kwargs)
+        if first:
+            return next(found, () if fields is not None else {})
 
+        objects = list(found)
         if len(objects) == 1:
             return objects[0]
         else:
             return objects
 
-    def get_by_id(self, obj_id: str, search: str = None) -> dict:
+    def iter_state(self, search: str = None):
+        """
+        Lazily iterates over the objects in [`state`](api.md#state).
+
+        If search is specified, only the specific [`state`](api.md#state) list is iterated, else every
+        list in the [`state`](api.md#state) dictionary is iterated in order.
+
+        Arguments:
+            search: Key in [`state`](api.md#state) to iterate over. If empty the entire
+            [`state`](api.md#state) dictionary will be iterated.
+
+        Returns:
+            iterator: The object dictionaries.
+
+        Raises:
+            KeyError: If the search key provided is not a key in [`state`](api.md#state).
+        """
+        if search is not None and search not in self.state:
+            raise KeyError(f"'{search}' Is Not Present In self.state Dictionary")
+
+        keys = [search] if search is not None else list(self.state)
+        return (obj for key in keys if isinstance(self.state[key], list) for obj in self.state[key])
+
+    def iter_by_fields(self, search: str = None, predicate=None, limit: int = None, fields=None, **kwargs):
+        """
+        Lazily finds the objects in [`state`](api.md#state) that match the inputted fields.
+
+        Unlike [`get_by_fields`][api.TickTickClient.get_by_fields] nothing is searched until the results are
+        consumed, and the scan stops as soon as the caller stops asking for results. The results are
+        always an iterator, no matter how many objects match.
+
+        !!! example
+            ```python
+            # Assumes that `client` is the name referencing the TickTickClient instance.
+
+            # The first three high priority tasks in the inbox
+            urgent = client.iter_by_fields(search='tasks', projectId=client.inbox_id,
+                                           predicate=lambda task: task.get('priority', 0) >= 3, limit=3)
+            for task in urgent:
+                print(task['title'])
+            ```
+
+        Arguments:
+            search: Key in [`state`](api.md#state) that the search should take place in. If empty the
+            entire [`state`](api.md#state) dictionary will be searched.
+            predicate (callable): Function taking an object and returning whether it matches. Applied after
+            the fields in `kwargs` match.
+            limit: Maximum number of objects to return.
+            fields (str or list): Field name(s) to project the found objects down to. See
+            [projector][helpers.query.projector].
+            **kwargs: Matching fields in the object to look for. Objects missing a field do not match.
+
+        Returns:
+            iterator: The matching object dictionaries, or their projected tuples when `fields` is passed.
+
+        Raises:
+            ValueError: If no key word arguments or predicate are provided.
+            KeyError: If the search key provided is not a key in [`state`](api.md#state).
+        """
+        if kwargs == {} and predicate is None:
+            raise ValueError('Must Include Field(s) Or A Predicate To Be Searched For')
+
+        objects = self.iter_state(search)
+        items = tuple(kwargs.items())
+
+        def matches(obj):
+            for field, value in items:
+                if obj.get(field, _MISSING) != value:
+                    return False
+            return predicate is None or predicate(obj)
+
+        found = filter(matches, objects)
+        if limit is not None:
+            found = itertools.islice(found, limit)
+        if fields is not None:
+            found = map(projector(fields), found)
+        return found
+
+    def query(self, search: str, order_by=None, limit: int = None, fields=None, **filters) -> list:
+        """
+        Finds the objects in `state[search]` that match every filter.
+
+        Filters are named `<field>__<operator>`. Nested fields are joined by `__` or `.`, and a field
+        inside a list of dictionaries (like the checklist `items` of a task) matches if any element matches.
+        Equality and list membership filters on top level fields are answered from lookup tables kept
+        for [`state`](api.md#state), so repeated queries do not scan every object.
+
+        | Operator | Matches when the field value |
+        | -------- | ---------------------------- |
+        | `eq` (default) | equals the value |
+        | `ne` | does not equal the value (missing fields match) |
+        | `lt`, `lte`, `gt`, `gte` | compares to the value |
+        | `in`, `nin` | is / is not one of the values |
+        | `contains` | is a list holding the value, or a string holding the substring |
+        | `icontains` | like `contains`, ignoring case |
+        | `startswith` | is a string starting with the value |
+        | `exists` | is present (`True`) or missing (`False`) |
+
+        Date and datetime values are compared against the parsed TickTick date strings. Datetimes
+        without timezone information are in the `time_zone` of the client.
+
+        !!! note
+            Equality and `contains` filters use lookup tables. Fields of `state` objects changed in place by
+            your own code are only found by their new values after
+            [`invalidate_index`][api.TickTickClient.invalidate_index].
+
+        !!! example
+            ```python
+            # Assumes that `client` is the name referencing the TickTickClient instance.
+
+            # Tasks tagged 'work' due in the next week, highest priority first
+            now = datetime.now()
+            tasks = client.query('tasks', tags__contains='work', priority__gte=3,
+                                 dueDate__gte=now, dueDate__lt=now + timedelta(days=7),
+                                 order_by=['-priority', 'dueDate'], limit=10)
+
+            # Tasks with an uncompleted checklist item
+            tasks = client.query('tasks', items__status=0)
+            ```
+
+        Arguments:
+            search: Key in [`state`](api.md#state) to search.
+            order_by (str or list): Field(s) to sort the results by - prefix with `-` for descending.
+                Results keep their [`state`](api.md#state) order otherwise.
+            limit: Maximum number of objects to return.
+            fields (str or list): Field name(s) to project the found objects down to. See
+                [projector][helpers.query.projector].
+            **filters: The filters the objects must match.
+
+        Returns:
+            list: The matching object dictionaries, or their projected tuples when `fields` is passed.
+
+        Raises:
+            KeyError: If the search key provided is not a key in [`state`](api.md#state).
+        """
+        if search not in self.state or not isinstance(self.state[search], list):
+            raise KeyError(f"'{search}' Is Not Present In self.state Dictionary")
+
+        # Start from the smallest set of objects the lookup tables can give
+        candidates = self.state[search]
+        for lookup, value in filters.items():
+            path, op = split_lookup(lookup)
+            if len(path) != 1 or op not in ('eq', 'contains') or not isinstance(value, _INDEXABLE):
+                continue
+            try:
+                if op == 'eq':
+                    found = self._index.lookup(search, path[0], value)
+                elif self._index.table(search, path[0]).lists_only:
+                    found = self._index.lookup_contains(search, path[0], value)
+                else:
+                    continue
+            except TypeError:
+                continue
+            if len(found) < len(candidates):
+                candidates = found
+
+        predicates = [compile_filter(lookup, value, self.time_zone) for lookup, value in filters.items()]
+        found = (obj for obj in candidates if all(predicate(obj) for predicate in predicates))
+        if order_by:
+            found = order(found, order_by)
+        found = itertools.islice(found, limit)
+        if fields is not None:
+            found = map(projector(fields), found)
+        return list(found)
+
+    def get_by_id(self, obj_id: str, search: str = None, fields=None):
         """
         Returns the dictionary of the object corresponding to the passed id.
 
@@ -449,9 +941,12 @@ class TickTickClient:
             obj_id: Id of the item.
             search: Key in [`state`](api.md#state) that the search should take place in. If empty the
             entire [`state`](api.md#state) dictionary will be searched.
+            fields (str or list): Field name(s) to project the found object down to. See
+            [projector][helpers.query.projector].
 
         Returns:
-            The dictionary object of the item if found, or an empty dictionary if not found.
+            The dictionary object of the item if found, or an empty dictionary if not found. When `fields`
+            is passed, the projected tuple of the item if found, or an empty tuple if not found.
 
         Raises:
             KeyError: If the search key provided is not a key in [`state`](api.md#state).
@@ -459,11 +954,10 @@ class TickTickClient:
         if search is not None and search not in self.state:
             raise KeyError(f"'{search}' Is Not Present In self.state Dictionary")
 
+        found = {}
         # Search just in the desired list
         if search is not None:
-            for index in self.state[search]:
-                if index['id'] == obj_id:
-                    return index
+            found = self._index.first(search, 'id', obj_id)
 
         else:
             # Search all items in self.state
@@ -472,11 +966,17 @@ class TickTickClient:
                     if 'id' not in our_object:
                         break
                     if our_object['id'] == obj_id:
-                        return our_object
+                        found = our_object
+                        break
+                if found:
+                    break
+
+        if fields is not None:
+            return projector(fields)(found) if found else ()
         # Return empty dictionary if not found
-        return {}
+        return found
 
-    def get_by_etag(self, etag: str, search: str = None) -> dict:
+    def get_by_etag(self, etag: str, search: str = None, fields=None):
         """
         Returns the dictionary object of the item with the matching etag.
 
@@ -514,9 +1014,12 @@ class TickTickClient:
             etag: The etag of the object that you are looking for.
             search: Key in [`state`](#state) that the search should take place in. If empty the
             entire [`state`](api.md#state) dictionary will be searched.
+            fields (str or list): Field name(s) to project the found object down to. See
+            [projector][helpers.query.projector].
 
         Returns:
-            The dictionary object of the item if found, or an empty dictionary if not found.
+            The dictionary object of the item if found, or an empty dictionary if not found. When `fields`
+            is passed, the projected tuple of the item if found, or an empty tuple if not found.
 
         Raises:
             KeyError: If the search key provided is not a key in [`state`](api.md#state).
@@ -525,11 +1028,10 @@ class TickTickClient:
         if search is not None and search not in self.state:
             raise KeyError(f"'{search}' Is Not Present In self.state Dictionary")
 
+        found = {}
         # Search just in the desired list
         if search is not None:
-            for index in self.state[search]:
-                if index['etag'] == etag:
-                    return index
+            found = self._index.first(search, 'etag', etag)
 
         else:
             # Search all items in self.state
@@ -538,9 +1040,15 @@ class TickTickClient:
                     if 'etag' not in our_object:
                         break
                     if our_object['etag'] == etag:
-                        return our_object
+                        found = our_object
+                        break
+                if found:
+                    break
+
+        if fields is not None:
+            return projector(fields)(found) if found else ()
         # Return empty dictionary if not found
-        return {}
+        return found
 
     def delete_from_local_state(self, search: str = None, **kwargs) -> dict:
         """
@@ -613,6 +1121,7 @@ class TickTickClient:
                     deleted = self.state[search][item]
                     # Delete the item
                     del self.state[search][item]
+                    self._index.invalidate(search)
                     return deleted
 
         else:
@@ -641,4 +1150,58 @@ class TickTickClient:
                     if all_match:
                         deleted = self.state[primary_key][middle_key]
                         del self.state[primary_key][middle_key]
+                        self._index.invalidate(primary_key)
                         return deleted
+
+    def delete_many_from_local_state(self, search: str, ids=None, etags=None) -> list:
+        """
+        Deletes every object with one of the passed ids or etags from the local `state` list.
+        **Does not delete any items remotely.**
+
+        Unlike calling [`delete_from_local_state`][api.TickTickClient.delete_from_local_state] once per object,
+        the list is rebuilt in a single pass no matter how many objects are deleted.
+
+        !!! example
+            ```python
+            # Assumes that `client` is the name referencing the TickTickClient instance.
+
+            # Delete every task of a project from the local state
+            tasks = client.task.get_from_project(project_id, fields='id')
+            deleted = client.delete_many_from_local_state('tasks', ids=[task_id for task_id, in tasks])
+            ```
+
+        Arguments:
+            search: Key in [`state`](api.md#state) to delete the objects from.
+            ids (list): ID strings of the objects to delete.
+            etags (list): Etag strings of the objects to delete.
+
+        Returns:
+            list: The deleted object dictionaries, in the order their ids or etags were passed. Ids or etags
+            that are not found are skipped.
+
+        Raises:
+            ValueError: If not exactly one of `ids` or `etags` is passed.
+            KeyError: If the search key provided is not a key in [`state`](api.md#state).
+        """
+        if (ids is None) == (etags is None):
+            raise ValueError('Must Include Either Ids Or Etags To Delete')
+        if search not in self.state or not isinstance(self.state[search], list):
+            raise KeyError(f"'{search}' Is Not Present In self.state Dictionary")
+
+        field, values = ('id', ids) if ids is not None else ('etag', etags)
+        values = list(dict.fromkeys(values))  # Unique, in input order
+        wanted = set(values)
+        deleted = {}
+        kept = []
+        for obj in self.state[search]:
+            value = obj.get(field)
+            if value in wanted:
+                deleted.setdefault(value, []).append(obj)
+            else:
+                kept.append(obj)
+
+        if deleted:
+            # Keep the list object itself, since callers may hold on to it
+            self.state[search][:] = kept
+            self._index.invalidate(search)
+        return [obj for value in values for obj in deleted.get(value, ())]
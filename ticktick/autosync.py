@@ -0,0 +1,130 @@
+"""
+Keeping the local `state` up to date from a background thread.
+"""
+
+import threading
+
+from ticktick.events import diff, etag_map
+
+
+def sync_changes(client) -> list:
+    """
+    Syncs the client with a [state swap][api.TickTickClient.sync] and returns the
+    [change events][events.ChangeEvent] of the sync.
+    """
+    before = etag_map(client.state)
+    client.sync(swap=True)
+    return diff(before, etag_map(client.state))
+
+
+class AdaptiveInterval:
+    """
+    Time to wait between syncs - halved after a sync that found changes, and doubled after a sync that
+    did not, within `minimum` and `maximum` seconds.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.autosync import AdaptiveInterval
+        ```
+    """
+
+    def __init__(self, minimum: float = 5, maximum: float = 300, initial: float = 30):
+        if not 0 < minimum <= maximum:
+            raise ValueError('Minimum Must Be Positive And No More Than Maximum')
+        self.minimum = minimum
+        self.maximum = maximum
+        self.current = min(max(initial, minimum), maximum)
+
+    def update(self, changed: bool) -> float:
+        """
+        Moves the interval after a sync, and returns the new interval in seconds.
+        """
+        if changed:
+            self.current = max(self.current / 2, self.minimum)
+        else:
+            self.current = min(self.current * 2, self.maximum)
+        return self.current
+
+
+class BackgroundSyncer:
+    """
+    Syncs a client from a daemon thread on an [adaptive interval][autosync.AdaptiveInterval].
+
+    Each sync builds the new [`state`](api.md#state) and its lookup tables off to the side and swaps them
+    in at once (see [`sync`][api.TickTickClient.sync]), so readers like
+    [`get_by_id`][api.TickTickClient.get_by_id] never wait on the network or see a half applied sync.
+    Clients with `merge_on_sync` swap too, as merging would change objects while they are being read.
+    Starting the syncer sets `swap_on_sync` on the client, so the syncs made after writes swap as well.
+
+    Start it through [`start_auto_sync`][api.TickTickClient.start_auto_sync].
+
+    Arguments:
+        client (TickTickClient): The client to sync.
+        interval (AdaptiveInterval): Time between syncs.
+        on_error (callable): Called with the exception when a sync fails. The syncer waits longer and tries
+            again either way.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.autosync import BackgroundSyncer
+        ```
+    """
+
+    def __init__(self, client, interval: AdaptiveInterval = None, on_error=None):
+        self._client = client
+        self.interval = interval if interval is not None else AdaptiveInterval()
+        self.on_error = on_error
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the background thread is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> 'BackgroundSyncer':
+        """
+        Starts syncing in the background.
+
+        Raises:
+            RuntimeError: If the syncer is already running.
+        """
+        if self.running:
+            raise RuntimeError('Background Syncer Is Already Running')
+        self._client.swap_on_sync = True
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='ticktick-autosync', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None) -> None:
+        """
+        Stops syncing, waiting up to `timeout` seconds for a sync in progress to finish.
+        """
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def sync_once(self) -> bool:
+        """
+        Syncs the client and returns whether anything changed.
+        """
+        return bool(sync_changes(self._client))
+
+    def _run(self):
+        while not self._stopped.wait(self.interval.current):
+            try:
+                changed = self.sync_once()
+            except Exception as error:
+                changed = False
+                if self.on_error is not None:
+                    self.on_error(error)
+            self.interval.update(changed)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,222 @@
+"""
+Combining individual writes into batch requests.
+"""
+
+import collections
+import threading
+
+from concurrent.futures import Future
+
+from ticktick.helpers.concurrency import chunked
+from ticktick.helpers.object_id import generate_object_id
+from ticktick.tracking import KEYS
+
+# Endpoint of each state list - in the order they are flushed, so tasks can use new projects and tags
+ENDPOINTS = collections.OrderedDict([
+    ('projects', 'batch/project'),
+    ('tags', 'batch/tag'),
+    ('tasks', 'batch/task')
+])
+
+
+class _Operation:
+    """
+    A queued write and the future of its result.
+    """
+
+    __slots__ = ('search', 'action', 'obj', 'result', 'future')
+
+    def __init__(self, search: str, action: str, obj, result):
+        self.search = search
+        self.action = action
+        self.obj = obj
+        self.result = result
+        self.future = Future()
+
+
+class AutoBatch:
+    """
+    Queues the single object writes of the managers and sends them together - as one `batch/project`,
+    `batch/tag` and `batch/task` request each (chunked by `MAX_BATCH_SIZE`), followed by a single sync.
+
+    While a batch is open, [`task.create`][managers.tasks.TaskManager.create],
+    [`task.update`][managers.tasks.TaskManager.update], [`task.delete`][managers.tasks.TaskManager.delete],
+    [`project.create`][managers.projects.ProjectManager.create],
+    [`project.update`][managers.projects.ProjectManager.update],
+    [`project.delete`][managers.projects.ProjectManager.delete],
+    [`tag.create`][managers.tags.TagsManager.create], [`tag.update`][managers.tags.TagsManager.update],
+    [`tag.color`][managers.tags.TagsManager.color] and [`tag.sorting`][managers.tags.TagsManager.sorting]
+    return a `concurrent.futures.Future` (a list of them for lists) instead of their result. Each future
+    resolves to that object as synced - or the passed object for deletes - once the batch is flushed, or
+    raises the error the server returned for that object.
+
+    Created projects and tasks without an id are given one made by
+    [generate_object_id][helpers.object_id.generate_object_id], so every result is matched by id. Set the id
+    yourself to reference a new project or parent task from writes in the same batch.
+
+    Writes are flushed when the block exits, when `window` seconds passed since the first queued write, or
+    when a queue reaches `MAX_BATCH_SIZE` - whichever comes first.
+
+    Open one with [`batch`][api.TickTickClient.batch].
+
+    Arguments:
+        client (TickTickClient): The client to write through.
+        window: Seconds to wait after the first queued write before flushing. `None` only flushes on exit.
+        on_sent (callable): Called after each request with the `result` passed to [`queue`][batching.AutoBatch.queue]
+            for every write the server applied in it - before the sync, so their futures are not resolved yet.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.batching import AutoBatch
+        ```
+    """
+
+    def __init__(self, client, window: float = None, on_sent=None):
+        self._client = client
+        self.window = window
+        self.on_sent = on_sent
+        self._pending = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def queue(self, search: str, action: str, obj, result=None) -> Future:
+        """
+        Queues a write.
+
+        Arguments:
+            search: Key in [`state`](api.md#state) of the object - like `'tasks'`.
+            action: `'add'`, `'update'` or `'delete'`.
+            obj: The object as sent in the batch payload.
+            result: What the future of a delete resolves to.
+
+        Returns:
+            Future: The result of the write.
+
+        Raises:
+            ValueError: If `search` has no batch endpoint or `action` is not valid.
+        """
+        if search not in ENDPOINTS:
+            raise ValueError(f"'{search}' Can Not Be Batched")
+        if action not in ('add', 'update', 'delete'):
+            raise ValueError(f"Invalid Batch Action '{action}'")
+
+        if action == 'add' and KEYS[search] == 'id' and not obj.get('id'):
+            obj = dict(obj, id=generate_object_id())
+        operation = _Operation(search, action, obj, result)
+        with self._lock:
+            self._pending.append(operation)
+            full = sum(op.search == search and op.action == action
+                       for op in self._pending) >= self._client.MAX_BATCH_SIZE
+            if not full and self.window is not None and self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+        return operation.future
+
+    @staticmethod
+    def resolved(value) -> Future:
+        """
+        Returns a future already holding `value` - for writes that need no request.
+        """
+        future = Future()
+        future.set_result(value)
+        return future
+
+    def flush(self) -> None:
+        """
+        Sends the queued writes, syncs once, and resolves their futures.
+        """
+        with self._lock:
+            operations, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not operations:
+            return
+
+        responses = {}
+        try:
+            for search, endpoint in ENDPOINTS.items():
+                url = self._client.BASE_URL + endpoint
+                for chunk in self._payloads([op for op in operations if op.search == search]):
+                    payload = {action: [op.obj for op in ops] for action, ops in chunk.items()}
+                    try:
+                        response = self._client.http_post(url, json=payload, cookies=self._client.cookies,
+                                                          headers=self._client.HEADERS)
+                    except Exception as error:
+                        response = error
+                    for ops in chunk.values():
+                        for op in ops:
+                            responses[op] = response
+                    if self.on_sent is not None:
+                        self.on_sent([op.result for ops in chunk.values() for op in ops
+                                      if self._error(op, response) is None])
+            self._client.sync()
+        except Exception as error:
+            for op in operations:
+                op.future.set_exception(error)
+            return
+
+        for op in operations:
+            try:
+                op.future.set_result(self._result(op, responses[op]))
+            except Exception as error:
+                op.future.set_exception(error)
+
+    def _payloads(self, operations: list):
+        """
+        Yields `{action: operations}` groups of at most `MAX_BATCH_SIZE` operations per action.
+        """
+        actions = collections.OrderedDict()
+        for op in operations:
+            actions.setdefault(op.action, []).append(op)
+        chunks = {action: list(chunked(ops, self._client.MAX_BATCH_SIZE)) for action, ops in actions.items()}
+        for position in range(max((len(c) for c in chunks.values()), default=0)):
+            yield {action: c[position] for action, c in chunks.items() if position < len(c)}
+
+    @staticmethod
+    def _key(op):
+        """
+        Returns the id - or name for tags - of the object of an operation.
+        """
+        if op.action == 'delete':
+            return op.obj.get('taskId') if isinstance(op.obj, dict) else op.obj
+        return op.obj.get(KEYS[op.search])
+
+    def _error(self, op, response):
+        """
+        Returns the error of the request or of the object of an operation, or `None` if it was applied.
+        """
+        if isinstance(response, Exception):
+            return response
+        key = self._key(op)
+        error = response.get('id2error', {}).get(key)
+        if error:
+            return RuntimeError(f"Could Not Complete Request For '{key}': {error}")
+        return None
+
+    def _result(self, op, response):
+        """
+        Returns the result of an operation, raising the error of the request or of the object.
+        """
+        error = self._error(op, response)
+        if error is not None:
+            raise error
+        if op.action == 'delete':
+            return op.result
+        return self._lookup(op.search, self._key(op))
+
+    def _lookup(self, search: str, key) -> dict:
+        return self._client._index.first(search, KEYS[search], key)
+
+    def __enter__(self):
+        if self._client._batch is not None:
+            raise RuntimeError('A Batch Is Already Open')
+        self._client._batch = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._client._batch = None
+        self.flush()
@@ -0,0 +1,207 @@
+"""
+Change events for the objects in the local `state`.
+"""
+
+import collections
+import logging
+import threading
+
+from ticktick.tracking import KEYS
+
+log = logging.getLogger(__name__)
+
+ChangeEvent = collections.namedtuple('ChangeEvent', ['kind', 'search', 'key', 'obj'])
+ChangeEvent.__doc__ = """
+A change to an object in [`state`](api.md#state) found by a sync.
+
+Attributes:
+    kind (str): `'created'`, `'updated'` or `'deleted'`.
+    search (str): Key in [`state`](api.md#state) of the object - like `'tasks'`.
+    key (str): The id of the object, or the name for tags.
+    obj (dict): The object dictionary - as it was before the sync for deleted objects.
+"""
+
+
+def etag_map(state: dict) -> dict:
+    """
+    Returns a dictionary of `(search, key)` to `(etag, object)` for the objects in `state`.
+    """
+    etags = {}
+    for search, key in KEYS.items():
+        for obj in state.get(search, ()):
+            etags[(search, obj.get(key))] = (obj.get('etag'), obj)
+    return etags
+
+
+def diff(old: dict, new: dict) -> list:
+    """
+    Returns the change events between two [etag maps][events.etag_map].
+
+    Objects are matched by id (by name for tags) and are updated when their etag changed.
+    """
+    events = []
+    for (search, key), (etag, obj) in new.items():
+        previous = old.get((search, key))
+        if previous is None:
+            events.append(ChangeEvent('created', search, key, obj))
+        elif previous[0] != etag:
+            events.append(ChangeEvent('updated', search, key, obj))
+    for (search, key), (etag, obj) in old.items():
+        if (search, key) not in new:
+            events.append(ChangeEvent('deleted', search, key, obj))
+    return events
+
+
+def merge(state: dict, lists: dict) -> list:
+    """
+    Merges freshly synced lists into the lists of `state` in place, and returns the change events.
+
+    Objects are matched by id (by name for tags). An object that differs from the synced one is updated in
+    place, so references to it stay valid - whether its etag changed, or it was changed locally without the
+    change reaching the server. Unchanged objects are left untouched, new objects are added, and missing
+    objects are removed. A list with no changes is not modified at all - not even reordered.
+
+    Arguments:
+        state: The [`state`](api.md#state) dictionary to merge into.
+        lists: Key in `state` to the freshly synced list of objects.
+
+    Returns:
+        list: The [change events][events.ChangeEvent] - events of updated objects hold the existing object.
+    """
+    events = []
+    for search, synced in lists.items():
+        key = KEYS.get(search, 'id')
+        objects = state.setdefault(search, [])
+        current = {obj.get(key): obj for obj in objects}
+        merged = []
+        changes = []
+        for obj in synced:
+            existing = current.pop(obj.get(key), None)
+            if existing is None:
+                changes.append(ChangeEvent('created', search, obj.get(key), obj))
+                merged.append(obj)
+            elif existing != obj:
+                existing.clear()
+                existing.update(obj)
+                changes.append(ChangeEvent('updated', search, obj.get(key), existing))
+                merged.append(existing)
+            else:
+                merged.append(existing)
+        for obj_key, obj in current.items():
+            changes.append(ChangeEvent('deleted', search, obj_key, obj))
+
+        if changes:
+            objects[:] = merged
+            events.extend(changes)
+    return events
+
+
+class EventFeed:
+    """
+    Feed of the objects created, updated and deleted remotely, found by comparing etags at every
+    [`sync`][api.TickTickClient.sync].
+
+    The feed starts when [`events`][api.TickTickClient.events] is first accessed - the current
+    [`state`](api.md#state) is the baseline, so only later changes become events. Events go to every
+    subscriber as they are found, and are queued for iterating over (up to `maxlen` of the newest).
+
+    !!! example
+        ```python
+        # Assumes that `client` is the name referencing the TickTickClient instance.
+
+        # Called from sync with each change
+        client.events.subscribe(lambda event: print(event.kind, event.search, event.key))
+
+        # Or handle the queued changes whenever it suits
+        client.sync()
+        for event in client.events:
+            mirror(event)
+        ```
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.events import ChangeEvent, EventFeed
+        ```
+    """
+
+    def __init__(self, state: dict = None, maxlen: int = 10000):
+        self._etags = etag_map(state or {})
+        self._events = collections.deque(maxlen=maxlen)
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """
+        Calls `callback` with every [ChangeEvent][events.ChangeEvent] found from now on.
+
+        Returns:
+            callable: The callback, so this can be used as a decorator.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback) -> None:
+        """
+        Stops calling `callback`.
+
+        Raises:
+            ValueError: If `callback` is not subscribed.
+        """
+        with self._lock:
+            self._subscribers.remove(callback)
+
+    def record(self, state: dict) -> list:
+        """
+        Finds the changes between the last recorded `state` and this one, and publishes them.
+
+        Returns:
+            list: The [change events][events.ChangeEvent] found.
+        """
+        etags = etag_map(state)
+        with self._lock:
+            events = diff(self._etags, etags)
+            self._etags = etags
+        self.publish(events)
+        return events
+
+    def apply(self, events: list) -> None:
+        """
+        Publishes events that were already found - like by [merge][events.merge] - and moves the
+        baseline forward by just those changes.
+        """
+        with self._lock:
+            for event in events:
+                if event.kind == 'deleted':
+                    self._etags.pop((event.search, event.key), None)
+                else:
+                    self._etags[(event.search, event.key)] = (event.obj.get('etag'), event.obj)
+        self.publish(events)
+
+    def publish(self, events: list) -> None:
+        """
+        Queues the events and sends them to every subscriber. An exception raised by a subscriber is logged,
+        and does not stop the other events and subscribers - or the sync publishing them.
+        """
+        with self._lock:
+            self._events.extend(events)
+            subscribers = list(self._subscribers)
+        for event in events:
+            for callback in subscribers:
+                try:
+                    callback(event)
+                except Exception:
+                    log.exception(f"Change event subscriber {callback!r} failed")
+
+    def __len__(self):
+        return len(self._events)
+
+    def __iter__(self):
+        """
+        Yields and removes the queued events, oldest first, until none are left.
+        """
+        while True:
+            try:
+                yield self._events.popleft()
+            except IndexError:
+                return
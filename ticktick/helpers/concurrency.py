@@ -0,0 +1,216 @@
+"""
+Helpers for sending many independent requests at once.
+"""
+
+import threading
+
+
+class BatchRequestError(RuntimeError):
+    """
+    Raised when some of the calls in [run_concurrently][helpers.concurrency.run_concurrently] fail.
+
+    Attributes:
+        errors (dict): Input item position to the exception raised for that item.
+        results (list): The results of every item in input order - `None` for the items that failed.
+    """
+
+    def __init__(self, errors: dict, results: list):
+        self.errors = errors
+        self.results = results
+        messages = '; '.join(f'{position}: {error}' for position, error in sorted(errors.items()))
+        super().__init__(f'{len(errors)} Of {len(results)} Requests Failed ({messages})')
+
+
+def run_concurrently(func, items, max_workers: int = 8) -> list:
+    """
+    Calls `func` with every item using a bounded pool of threads, and waits for every call to finish.
+
+    Use it for endpoints that have no batch form, so `n` requests take about as long as the slowest one
+    instead of the sum of all of them.
+
+    Arguments:
+        func (callable): Function taking a single item.
+        items (list): Items to call `func` with.
+        max_workers: Maximum number of calls running at the same time.
+
+    Returns:
+        list: The results of the calls in the order of `items`.
+
+    Raises:
+        BatchRequestError: If any call raised an exception. Raised after every call has finished, and holds
+            the exception of every failed call and the results of the others.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.helpers.concurrency import run_concurrently
+        ```
+
+    ??? example
+        ```python
+        run_concurrently(lambda name: client.http_delete(url, params={'name': name}), ['fun', 'work'])
+        ```
+    """
+    items = list(items)
+    results = [None] * len(items)
+    errors = {}
+
+    if len(items) <= 1 or max_workers <= 1:
+        for position, item in enumerate(items):
+            try:
+                results[position] = func(item)
+            except Exception as error:
+                errors[position] = error
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            futures = [executor.submit(func, item) for item in items]
+            for position, future in enumerate(futures):
+                try:
+                    results[position] = future.result()
+                except Exception as error:
+                    errors[position] = error
+
+    if errors:
+        raise BatchRequestError(errors, results)
+    return results
+
+
+def chunked(items, size: int):
+    """
+    Yields consecutive lists of at most `size` items.
+
+    Arguments:
+        items (list): Items to split.
+        size: Maximum length of each chunk.
+
+    Raises:
+        ValueError: If `size` is less than one.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.helpers.concurrency import chunked
+        ```
+
+    ??? example
+        ```python
+        list(chunked([1, 2, 3, 4, 5], 2))
+        ```
+
+        ??? success "Result"
+            ```python
+            [[1, 2], [3, 4], [5]]
+            ```
+    """
+    if size < 1:
+        raise ValueError('Chunk Size Must Be At Least One')
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class _Call:
+    """
+    A call in flight, shared by every caller with the same key.
+    """
+
+    __slots__ = ('done', 'result', 'error', 'owner')
+
+    def __init__(self, owner):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # Thread running the call
+        self.owner = owner
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key, so only one of them runs and the others share its result.
+
+    A caller that arrives while a call with its key is running waits for it and gets the same result - or
+    the same exception. With `fresh=True` the caller instead waits for a call that *starts* after it arrived,
+    so the result reflects everything done before the call was made. Fresh callers arriving together still
+    share a single follow up call, so a burst of `n` calls runs at most twice. A call made from inside the
+    running call of its key - on the thread running it - runs directly, as waiting on itself would never end.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.helpers.concurrency import SingleFlight
+        ```
+
+    ??? example
+        ```python
+        flights = SingleFlight()
+
+        # From many threads at once -> a single request
+        flights.do(('user/preferences/settings', ()), lambda: client.http_get(url))
+        ```
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = {}
+        self._queued = {}
+
+    def do(self, key, func, fresh: bool = False):
+        """
+        Calls `func` unless a call with the same `key` is already in flight, and returns the shared result.
+
+        Arguments:
+            key: Hashable identity of the call.
+            func (callable): Function taking no arguments.
+            fresh: Whether to wait for a call that starts after this one, instead of joining a running call.
+
+        Returns:
+            The result of the shared call. Callers get the same object, so it should not be modified.
+
+        Raises:
+            Exception: Whatever the shared call raised.
+        """
+        previous = None
+        thread = threading.current_thread()
+        with self._lock:
+            running = self._running.get(key)
+            nested = running is not None and running.owner is thread
+            if running is None:
+                call = self._running[key] = _Call(thread)
+                lead = True
+            elif nested:
+                call = None
+                lead = False
+            elif not fresh:
+                call = running
+                lead = False
+            else:
+                call = self._queued.get(key)
+                lead = call is None
+                if lead:
+                    call = self._queued[key] = _Call(thread)
+                    previous = running
+
+        if nested:
+            return func()
+        if not lead:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        if previous is not None:
+            # The queued call is promoted to running once the previous one is done
+            previous.done.wait()
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                queued = self._queued.pop(key, None)
+                if queued is not None:
+                    self._running[key] = queued
+                else:
+                    del self._running[key]
+            call.done.set()
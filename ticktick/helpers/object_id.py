@@ -0,0 +1,79 @@
+"""
+Provides methods for creating TickTick object ids locally.
+"""
+
+import itertools
+import os
+import re
+import threading
+import time
+
+VALID_OBJECT_ID = "^[a-f0-9]{24}$"
+
+# Random value per process, and a counter starting at a random value - like MongoDB ObjectIds
+_PROCESS = os.urandom(5)
+_COUNTER = itertools.count(int.from_bytes(os.urandom(3), 'big'))
+_LOCK = threading.Lock()
+
+
+def generate_object_id() -> str:
+    """
+    Generates a new id in the format of the ids TickTick creates: 24 hexadecimal digits made of the
+    seconds since the epoch, a random value for this process, and an incrementing counter.
+
+    Objects created with an id made here can be referenced - as a project of a task, or a parent
+    task - before the server has seen them, so dependent objects can be created in the same batch.
+
+    Returns:
+        24 lowercase hexadecimal digits.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.helpers.object_id import generate_object_id
+        ```
+
+    ??? example
+        ```python
+        task = client.task.builder('Groceries')
+        task['id'] = generate_object_id()
+        ```
+
+        ??? success "Result"
+            ```python
+            {'title': 'Groceries', 'id': '653c1f5a9e1b2c3d4e000001'}
+            ```
+    """
+    with _LOCK:
+        count = next(_COUNTER) & 0xFFFFFF
+    return (int(time.time()).to_bytes(4, 'big') + _PROCESS + count.to_bytes(3, 'big')).hex()
+
+
+def reseed() -> None:
+    """
+    Draws a new random value for this process - called in a forked child so it does not repeat the
+    ids of its parent.
+    """
+    global _PROCESS
+    _PROCESS = os.urandom(5)
+
+
+def check_object_id(value) -> bool:
+    """
+    Verifies if the passed in value is an object id string.
+
+    Arguments:
+        value: Value to check.
+
+    Returns:
+        True if the value is 24 lowercase hexadecimal digits, else False.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.helpers.object_id import check_object_id
+        ```
+    """
+    return isinstance(value, str) and re.match(VALID_OBJECT_ID, value) is not None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reseed)
@@ -0,0 +1,217 @@
+"""
+Helpers for querying the objects in the local `state`.
+"""
+
+import datetime
+import operator
+
+from ticktick.helpers.time_methods import parse_tick_tick_date, to_utc
+
+_MISSING = object()
+
+
+def _contains(value, element):
+    return isinstance(value, (list, str)) and element in value
+
+
+def _icontains(value, element):
+    if isinstance(value, list):
+        return any(isinstance(item, str) and item.lower() == element.lower() for item in value)
+    return isinstance(value, str) and element.lower() in value.lower()
+
+
+def _startswith(value, prefix):
+    return isinstance(value, str) and value.startswith(prefix)
+
+
+# Lookup operator name -> function taking (object value, filter value)
+OPERATORS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'lt': operator.lt,
+    'lte': operator.le,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'in': lambda value, options: value in options,
+    'nin': lambda value, options: value not in options,
+    'contains': _contains,
+    'icontains': _icontains,
+    'startswith': _startswith,
+}
+
+
+def projector(fields):
+    """
+    Returns a function that projects an object dictionary down to the passed fields.
+
+    Projected records are tuples holding the values of `fields` in order. A field missing from
+    the object is `None` in the record.
+
+    Arguments:
+        fields (str or list): A single field name or a sequence of field names.
+
+    Returns:
+        callable: Function taking an object dictionary and returning its projected tuple.
+
+    Raises:
+        ValueError: If no fields are passed.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.helpers.query import projector
+        ```
+
+    ??? example
+        ```python
+        project = projector(['id', 'title'])
+        project({'id': '5ff2bcf68f08093e5b745a30', 'title': 'Read', 'priority': 0})
+        ```
+
+        ??? success "Result"
+            ```python
+            ('5ff2bcf68f08093e5b745a30', 'Read')
+            ```
+    """
+    if isinstance(fields, str):
+        fields = (fields,)
+    fields = tuple(fields)
+    if not fields:
+        raise ValueError('Must Include Field(s) To Project')
+
+    getter = operator.itemgetter(*fields)
+
+    if len(fields) == 1:
+        field = fields[0]
+
+        def project(obj):
+            try:
+                return getter(obj),
+            except KeyError:
+                return obj.get(field),
+    else:
+        def project(obj):
+            try:
+                return getter(obj)
+            except KeyError:
+                return tuple(obj.get(name) for name in fields)
+
+    return project
+
+
+def split_lookup(lookup: str):
+    """
+    Splits a filter name like `'items__status__gte'` or `'items.status__gte'` into its field path and operator.
+
+    A name not ending in an operator is an `eq` lookup.
+
+    Returns:
+        tuple: The field path tuple and the operator name.
+    """
+    parts = [part for chunk in lookup.split('__') for part in chunk.split('.')]
+    if len(parts) > 1 and (parts[-1] in OPERATORS or parts[-1] == 'exists'):
+        return tuple(parts[:-1]), parts[-1]
+    return tuple(parts), 'eq'
+
+
+def resolve(obj: dict, path: tuple) -> list:
+    """
+    Returns the values found at the field path in the object.
+
+    Each step of the path looks the field up in the current dictionaries, or in every dictionary of
+    the current lists - so `('items', 'status')` is the status of every checklist item.
+    """
+    current = [obj]
+    for field in path:
+        found = []
+        for value in current:
+            if isinstance(value, dict):
+                if field in value:
+                    found.append(value[field])
+            elif isinstance(value, list):
+                found.extend(item[field] for item in value if isinstance(item, dict) and field in item)
+        current = found
+    return current
+
+
+def _comparable(value, comparand):
+    """
+    Returns the object value in the type of the filter value - parsing date strings when filtering on dates.
+    """
+    if isinstance(comparand, datetime.datetime) and isinstance(value, str):
+        return parse_tick_tick_date(value)
+    return value
+
+
+def compile_filter(lookup: str, value, time_zone: str = None):
+    """
+    Returns a predicate taking an object dictionary and returning whether it matches the filter.
+
+    An object matches if any value found at the field path matches. Comparisons between values that can
+    not be compared (like `None` and an integer) do not match.
+
+    Arguments:
+        lookup: Filter name - a field path joined by `__` or `.`, optionally ending in an operator.
+        value: Value to compare against. Date and datetime values are compared against parsed TickTick
+            date strings, and datetimes without timezone information are in `time_zone`.
+        time_zone: Time zone for datetimes without timezone information.
+    """
+    path, op = split_lookup(lookup)
+
+    if op == 'exists':
+        expected = bool(value)
+        return lambda obj: bool(resolve(obj, path)) == expected
+
+    if op in ('ne', 'nin'):
+        # Every found value has to differ, so objects missing the field match
+        inverse = compile_filter('__'.join(path + ('eq' if op == 'ne' else 'in',)), value, time_zone)
+        return lambda obj: not inverse(obj)
+
+    if op == 'in':
+        value = [to_utc(option, time_zone) if isinstance(option, datetime.date) else option for option in value]
+        sample = value[0] if value else None
+    else:
+        if isinstance(value, datetime.date):
+            value = to_utc(value, time_zone)
+        sample = value
+    compare = OPERATORS[op]
+
+    def matches(obj):
+        for found in resolve(obj, path):
+            try:
+                if compare(_comparable(found, sample), value):
+                    return True
+            except (TypeError, ValueError):
+                continue
+        return False
+
+    return matches
+
+
+def order(objects: list, order_by) -> list:
+    """
+    Sorts the objects by the fields in `order_by`.
+
+    Fields prefixed with `-` sort descending. Objects missing a field sort after the objects that have it,
+    in either direction.
+
+    Arguments:
+        objects: Object dictionaries to sort.
+        order_by (str or list): Field path(s) to sort by, most significant first.
+
+    Returns:
+        list: The sorted objects.
+    """
+    if isinstance(order_by, str):
+        order_by = [order_by]
+    objects = list(objects)
+    # Stable sorts from the least significant field to the most significant
+    for key in reversed(order_by):
+        descending = key.startswith('-')
+        path, _ = split_lookup(key.lstrip('-'))
+        present, missing = [], []
+        for obj in objects:
+            found = resolve(obj, path)
+            (present if found and found[0] is not None else missing).append((found[0] if found else None, obj))
+        present.sort(key=operator.itemgetter(0), reverse=descending)
+        objects = [obj for _, obj in present] + [obj for _, obj in missing]
+    return objects
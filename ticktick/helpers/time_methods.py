@@ -2,10 +2,9 @@
 Useful time conversion methods.
 """
 
-import pytz
-
 from ticktick.helpers.constants import DATE_FORMAT
 import datetime
+import functools
 
 
 def convert_local_time_to_utc(original_time, time_zone: str):
@@ -37,6 +36,7 @@ def convert_local_time_to_utc(original_time, time_zone: str):
             datetime(2020, 12, 12, 7, 59)
             ```
     """
+    import pytz
 
     utc = pytz.utc
     time_zone = pytz.timezone(time_zone)
@@ -87,3 +87,68 @@ def convert_date_to_tick_tick_format(datetime_obj, tz: str):
     date = date.replace(tzinfo=datetime.timezone.utc).isoformat()
     date = date[::-1].replace(":", "", 1)[::-1]
     return date
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_tick_tick_date(date: str):
+    """
+    Parses a TickTick date string to a UTC datetime object.
+
+    TickTick sends dates both with and without milliseconds. Parsed dates are cached, so parsing the same
+    date string again is a dictionary lookup.
+
+    Arguments:
+        date: TickTick date string, like `'2021-01-13T08:00:00.000+0000'`.
+
+    Returns:
+        datetime: Datetime object with the UTC time - with no timezone information attached.
+
+    Raises:
+        ValueError: If `date` is not a TickTick date string.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.helpers.time_methods import parse_tick_tick_date
+        ```
+
+    ??? example
+        ```python
+        parse_tick_tick_date('2021-01-13T16:00:00.000-0800')
+        ```
+
+        ??? success "Result"
+            ```python
+            datetime(2021, 1, 14, 0, 0)
+            ```
+    """
+    fmt = '%Y-%m-%dT%H:%M:%S.%f%z' if '.' in date else '%Y-%m-%dT%H:%M:%S%z'
+    parsed = datetime.datetime.strptime(date, fmt)
+    return parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def to_utc(value, time_zone: str = None):
+    """
+    Converts a date or datetime object to a UTC datetime object with no timezone information attached.
+
+    Datetime objects without timezone information are in `time_zone`, or already in UTC if no time
+    zone is passed. Date objects are the start of that day.
+
+    Arguments:
+        value (date or datetime): Date to convert.
+        time_zone: Time zone of `value` when it has no timezone information.
+
+    Returns:
+        datetime: Datetime object with the UTC time - with no timezone information attached.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.helpers.time_methods import to_utc
+        ```
+    """
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    if value.tzinfo is not None:
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    if time_zone:
+        return convert_local_time_to_utc(value, time_zone)
+    return value
@@ -0,0 +1,238 @@
+
+from ticktick.helpers.time_methods import parse_tick_tick_date
+
+_MISSING = object()
+
+
+def _interval(obj: dict, start_field: str, end_field: str):
+    """
+    Returns the parsed `(start, end)` UTC datetimes of the object, or `None` if it has neither date.
+
+    An object with only one of the dates is an instant at that date.
+    """
+    start = obj.get(start_field) or obj.get(end_field)
+    if not start:
+        return None
+    end = obj.get(end_field) or start
+    try:
+        start, end = parse_tick_tick_date(start), parse_tick_tick_date(end)
+    except (TypeError, ValueError):
+        return None
+    return (start, end) if start <= end else (end, start)
+
+
+class _FieldTable:
+    """
+    Lookup tables for a single field of the objects in a `state` list.
+
+    `equal` maps a field value to the objects holding it. For list fields (like `tags`) `contains`
+    maps each element to the objects whose list holds it.
+    """
+
+    __slots__ = ('equal', 'contains', 'lists_only')
+
+    def __init__(self, objects, field):
+        self.equal = {}
+        self.contains = {}
+        # Whether every object that has the field holds a list in it
+        self.lists_only = True
+        for obj in objects:
+            value = obj.get(field, _MISSING)
+            if value is _MISSING:
+                continue
+            if isinstance(value, list):
+                for element in value:
+                    try:
+                        self.contains.setdefault(element, []).append(obj)
+                    except TypeError:
+                        pass
+                continue
+            self.lists_only = False
+            try:
+                self.equal.setdefault(value, []).append(obj)
+            except TypeError:
+                pass
+
+
+class _IntervalNode:
+    """
+    Node of a centered interval tree: the intervals containing `center`, sorted by start and by descending end,
+    with the intervals ending before `center` on the `left` and those starting after it on the `right`.
+    """
+
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+    def __init__(self, items):
+        # Items are (start, end, position, obj) sorted by start -> the middle start splits them in half
+        self.center = items[len(items) // 2][0]
+        left, here, right = [], [], []
+        for item in items:
+            if item[1] < self.center:
+                left.append(item)
+            elif item[0] > self.center:
+                right.append(item)
+            else:
+                here.append(item)
+        self.by_start = here
+        self.by_end = sorted(here, key=lambda item: item[1], reverse=True)
+        self.left = _IntervalNode(left) if left else None
+        self.right = _IntervalNode(right) if right else None
+
+
+class _IntervalTable:
+    """
+    The objects of a `state` list that have dates, in a centered interval tree of their parsed dates.
+
+    Finding the objects overlapping a range visits `O(log n)` nodes plus the objects found, however long
+    the intervals are.
+    """
+
+    __slots__ = ('root',)
+
+    def __init__(self, objects, start_field, end_field):
+        dated = []
+        for position, obj in enumerate(objects):
+            interval = _interval(obj, start_field, end_field)
+            if interval is not None:
+                dated.append((interval[0], interval[1], position, obj))
+        dated.sort(key=lambda item: (item[0], item[2]))
+        self.root = _IntervalNode(dated) if dated else None
+
+    def overlapping(self, start, end) -> list:
+        """
+        Returns the `(start, end, position, obj)` items whose interval overlaps the range, in no particular order.
+        """
+        found = []
+        nodes = [self.root] if self.root is not None else []
+        while nodes:
+            node = nodes.pop()
+            if end < node.center:
+                # Every interval here ends after the range -> the ones starting by its end overlap
+                for item in node.by_start:
+                    if item[0] > end:
+                        break
+                    found.append(item)
+                if node.left is not None:
+                    nodes.append(node.left)
+            elif start > node.center:
+                # Every interval here starts before the range -> the ones ending after its start overlap
+                for item in node.by_end:
+                    if item[1] < start:
+                        break
+                    found.append(item)
+                if node.right is not None:
+                    nodes.append(node.right)
+            else:
+                found.extend(node.by_start)
+                nodes.extend(child for child in (node.left, node.right) if child is not None)
+        return found
+
+
+class StateIndex:
+    """
+    Lazily built lookup tables over the lists in a [`state`](api.md#state) dictionary.
+
+    Tables are built the first time a field is looked up, and thrown away when the list they were built
+    from is replaced (like in [`sync`][api.TickTickClient.sync]), changes length, or ends in a different
+    object (like when objects are appended). Changes inside the list are not noticed: code removing objects
+    from a list in place, or changing the fields of its objects, has to call
+    [`invalidate`][index.StateIndex.invalidate]. Until then an object whose field was changed in place is not
+    found by its new value - found objects are checked against the field again, so it is not returned for its
+    old value either.
+    """
+
+    def __init__(self, state: dict):
+        self.state = state
+        self._stamps = {}
+        self._tables = {}
+
+    def _fields(self, search: str) -> dict:
+        """
+        Returns the field tables for the list, throwing them away first if the list has changed.
+        """
+        objects = self.state[search]
+        last = objects[-1] if objects else None
+        stamp = self._stamps.get(search)
+        if stamp is None or stamp[0] is not objects or stamp[1] != len(objects) or stamp[2] is not last:
+            self._stamps[search] = (objects, len(objects), last)
+            self._tables[search] = {}
+        return self._tables[search]
+
+    def table(self, search: str, field: str) -> _FieldTable:
+        """
+        Returns the lookup table for the field of the objects in `state[search]`.
+        """
+        tables = self._fields(search)
+        table = tables.get(field)
+        if table is None:
+            table = tables[field] = _FieldTable(self.state[search], field)
+        return table
+
+    def lookup(self, search: str, field: str, value) -> list:
+        """
+        Returns the objects in `state[search]` whose `field` equals `value`, in `state` order.
+
+        Raises:
+            TypeError: If `value` is not hashable.
+        """
+        candidates = self.table(search, field).equal.get(value, ())
+        return [obj for obj in candidates if obj.get(field, _MISSING) == value]
+
+    def lookup_contains(self, search: str, field: str, element) -> list:
+        """
+        Returns the objects in `state[search]` whose list `field` holds `element`, in `state` order.
+
+        Raises:
+            TypeError: If `element` is not hashable.
+        """
+        candidates = self.table(search, field).contains.get(element, ())
+        return [obj for obj in candidates if element in obj.get(field, ())]
+
+    def first(self, search: str, field: str, value) -> dict:
+        """
+        Returns the first object in `state[search]` whose `field` equals `value`, or an empty dictionary.
+        """
+        for obj in self.table(search, field).equal.get(value, ()):
+            if obj.get(field, _MISSING) == value:
+                return obj
+        return {}
+
+    def between(self, search: str, start, end, start_field: str = 'startDate', end_field: str = 'dueDate') -> list:
+        """
+        Returns the objects in `state[search]` whose dates overlap the range from `start` to `end`, inclusive.
+
+        An object's dates run from `start_field` to `end_field`. Objects with only one of the dates are an
+        instant at that date, and objects with neither are never returned. The objects are sorted by
+        their start date.
+
+        Arguments:
+            search: Key in `state` to search.
+            start (datetime): Start of the range, in UTC with no timezone information attached.
+            end (datetime): End of the range, in UTC with no timezone information attached.
+            start_field: Field holding the start date string.
+            end_field: Field holding the end date string.
+        """
+        key = ('between', start_field, end_field)
+        tables = self._fields(search)
+        table = tables.get(key)
+        if table is None:
+            table = tables[key] = _IntervalTable(self.state[search], start_field, end_field)
+
+        found = []
+        for _, _, _, obj in sorted(table.overlapping(start, end), key=lambda item: (item[0], item[2])):
+            # Checked again, in case the dates were changed in place
+            interval = _interval(obj, start_field, end_field)
+            if interval is not None and interval[0] <= end and interval[1] >= start:
+                found.append(obj)
+        return found
+
+    def invalidate(self, search: str = None) -> None:
+        """
+        Throws away the tables for `state[search]`, or for every list if `search` is not passed.
+        """
+        if search is None:
+            self._stamps.clear()
+            self._tables.clear()
+        else:
+            self._stamps.pop(search, None)
+            self._tables.pop(search, None)
@@ -0,0 +1,249 @@
+"""
+Coalescing, durable queue of writes to replay in batches.
+"""
+
+import collections
+import itertools
+import json
+import os
+import threading
+
+from ticktick.batching import ENDPOINTS, AutoBatch
+from ticktick.helpers.concurrency import BatchRequestError
+from ticktick.helpers.object_id import generate_object_id
+from ticktick.tracking import KEYS
+
+
+class OperationJournal:
+    """
+    Records creates, updates and deletes instead of sending them, collapses the ones that cancel or
+    supersede each other, and replays what is left as batch requests.
+
+    Operations on the same object (id, or name for tags) are coalesced as they are recorded:
+
+    | Recorded              | Pending                               |
+    |-----------------------|---------------------------------------|
+    | update + update       | one update with the fields of both    |
+    | create + update       | one create with the updated fields    |
+    | update + delete       | the delete                            |
+    | create + delete       | nothing                               |
+
+    With a `path`, every operation is appended to that file (as a line of json) before `record` returns,
+    and a journal opened on an existing file picks up the pending operations - so a job that died part way
+    can be resumed by replaying. Replaying rewrites the file after every batch request, dropping the operations
+the server applied - so a replay that dies part way does not send them again.
+
+Operations can be recorded while a replay is sending; they are replayed next time.
+
+    !!! example
+        ```python
+        journal = OperationJournal(client, path='writes.jsonl')
+
+        for row in rows:
+            journal.update('tasks', {'id': row.id, 'projectId': row.project, 'title': row.title})
+            journal.update('tasks', {'id': row.id, 'projectId': row.project, 'priority': row.priority})
+
+        # One update per task - the synced task with both fields changed - sent in batch/task requests with one sync
+        journal.replay()
+        ```
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.journal import OperationJournal
+        ```
+    """
+
+    def __init__(self, client, path: str = None):
+        """
+        Arguments:
+            client (TickTickClient): The client to replay through.
+            path: File to persist the pending operations in. Operations already in it are loaded.
+        """
+        self._client = client
+        self.path = path
+        self._pending = collections.OrderedDict()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._replaying = threading.Lock()
+        self._sending = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._coalesce(entry['search'], entry['action'], entry['obj'])
+
+    def create(self, search: str, obj: dict) -> str:
+        """
+        Records the creation of an object - like a task from [`builder`][managers.tasks.TaskManager.builder].
+
+        Projects and tasks without an id are given one by
+        [generate_object_id][helpers.object_id.generate_object_id], so later operations - and other objects,
+        like the tasks of a new project - can reference them before they are replayed.
+
+        Returns:
+            str: The id of the object, or the name for tags.
+        """
+        key = KEYS.get(search, 'id')
+        if key == 'id' and not obj.get('id'):
+            obj = dict(obj, id=generate_object_id())
+        self.record(search, 'add', obj)
+        return obj.get(key)
+
+    def update(self, search: str, obj: dict) -> None:
+        """
+        Records an update. `obj` can hold just the changed fields, along with the id (and `projectId` for tasks) -
+        when replayed they are applied onto the object in [`state`](api.md#state), as the batch endpoints replace
+        the whole object. Objects that are not in `state` are sent as recorded, so they have to be whole.
+        """
+        self.record(search, 'update', obj)
+
+    def delete(self, search: str, obj: dict) -> None:
+        """
+        Records a deletion. Tasks need their `id` and `projectId`, projects their `id`.
+        """
+        self.record(search, 'delete', obj)
+
+    def record(self, search: str, action: str, obj: dict) -> None:
+        """
+        Coalesces an operation into the pending ones, and appends it to the journal file.
+
+        Arguments:
+            search: Key in [`state`](api.md#state) of the object - `'projects'`, `'tags'` or `'tasks'`.
+            action: `'add'`, `'update'` or `'delete'`.
+            obj: The object dictionary.
+
+        Raises:
+            ValueError: If the operation can not be batched, or follows a delete of the same object.
+        """
+        if search not in ENDPOINTS:
+            raise ValueError(f"'{search}' Can Not Be Batched")
+        if action not in ('add', 'update', 'delete'):
+            raise ValueError(f"Invalid Batch Action '{action}'")
+        if action == 'delete' and search == 'tags':
+            raise ValueError('Tags Can Not Be Deleted In A Batch')
+
+        with self._lock:
+            self._coalesce(search, action, obj)
+            if self.path is not None:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps({'search': search, 'action': action, 'obj': obj}) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    @property
+    def pending(self) -> list:
+        """
+        The pending operations as `(search, action, obj)` tuples, in the order they were first recorded.
+        """
+        with self._lock:
+            return [(search, action, obj) for search, action, obj in self._pending.values()]
+
+    def __len__(self):
+        return len(self._pending)
+
+    def replay(self) -> list:
+        """
+        Sends the pending operations as `batch/project`, `batch/tag` and `batch/task` requests of up to
+        `MAX_BATCH_SIZE` objects, and syncs once. See [AutoBatch][batching.AutoBatch].
+
+        Updates are sent as the object in [`state`](api.md#state) with the recorded fields applied.
+
+        Returns:
+            list: The synced object of every pending operation in order - the passed object for deletes.
+
+        Raises:
+            BatchRequestError: If some operations failed. They stay pending, and the rest are removed.
+        """
+        with self._replaying:
+            with self._lock:
+                pending = list(self._pending.items())
+                self._sending = dict(pending)
+            if not pending:
+                return []
+
+            # Matched by identity, as objects recorded without an id get one only when queued
+            keys = {id(obj): key for key, (_, _, obj) in pending}
+            batch = AutoBatch(self._client, on_sent=lambda sent: self._checkpoint(keys[id(obj)] for obj in sent))
+            futures = []
+            for key, (search, action, obj) in pending:
+                payload = obj
+                if action == 'update':
+                    payload = {**self._client._index.first(search, KEYS[search], obj.get(KEYS[search])), **obj}
+                elif action == 'delete':
+                    payload = {'projectId': obj['projectId'], 'taskId': obj['id']} if search == 'tasks' else obj['id']
+                futures.append(batch.queue(search, action, payload, obj))
+            try:
+                batch.flush()
+            finally:
+                with self._lock:
+                    self._sending = {}
+
+        results = []
+        errors = {}
+        for position, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as error:
+                results.append(None)
+                errors[position] = error
+
+        if errors:
+            raise BatchRequestError(errors, results)
+        return results
+
+    def _coalesce(self, search: str, action: str, obj: dict) -> None:
+        """
+        Merges the operation into the pending ones. Must hold the lock.
+        """
+        value = obj.get(KEYS[search])
+        key = (search, value) if value is not None else (search, None, next(self._counter))
+        previous = self._pending.get(key)
+        if previous is None:
+            self._pending[key] = (search, action, dict(obj))
+            return
+
+        _, previous_action, previous_obj = previous
+        if previous_action == 'delete':
+            raise ValueError(f"'{value}' Was Already Deleted")
+        if action == 'delete':
+            if previous_action == 'add' and key not in self._sending:
+                # Never sent -> nothing to delete
+                del self._pending[key]
+            else:
+                self._pending[key] = (search, 'delete', dict(obj))
+        elif action == 'update':
+            self._pending[key] = (search, previous_action, {**previous_obj, **obj})
+        else:
+            raise ValueError(f"'{value}' Is Already Pending")
+
+    def _checkpoint(self, keys) -> None:
+        """
+        Drops the operations the server applied, and rewrites the journal file.
+
+        Operations recorded onto them since the replay started stay pending - a create as an update, as the
+        object now exists.
+        """
+        with self._lock:
+            for key in keys:
+                sent = self._sending[key]
+                current = self._pending.get(key)
+                if current is sent:
+                    del self._pending[key]
+                elif current is not None and current[1] == 'add':
+                    self._pending[key] = (current[0], 'update', current[2])
+            self._rewrite()
+
+    def _rewrite(self) -> None:
+        """
+        Replaces the journal file with the pending operations. Must hold the lock.
+        """
+        if self.path is None:
+            return
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as f:
+            for search, action, obj in self._pending.values():
+                f.write(json.dumps({'search': search, 'action': action, 'obj': obj}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
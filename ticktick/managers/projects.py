@@ -1,3 +1,5 @@
+import collections
+
 from ticktick.helpers.hex_color import check_hex_color, generate_hex_color
 from ticktick.managers.check_logged_in import logged_in
 
@@ -11,6 +13,45 @@ class ProjectManager:
         self.access_token = self._client.access_token
         self.headers = self._client.HEADERS
 
+    def _ordered_results(self, response: dict, sent: list, search: str) -> list:
+        """
+        Returns the synced objects for the objects sent in a batch request, in the order they were sent.
+
+        Objects with an id are looked up by it. Created objects do not have one, so they are matched to
+        the ids in the response by name - in response order, since names can repeat.
+        """
+        created = collections.defaultdict(collections.deque)
+        for obj_id in response['id2etag']:
+            found = self._client.get_by_id(obj_id, search=search)
+            if found:
+                created[found['name']].append(found)
+
+        items = []
+        for original in sent:
+            if original.get('id'):
+                items.append(self._client.get_by_id(original['id'], search=search))
+            else:
+                matches = created.get(original['name'])
+                items.append(matches.popleft() if matches else {})
+        return items
+
+    def _send_updates(self, url: str, objs: list, search: str) -> dict:
+        """
+        Sends the batch update for the objects and syncs, skipping objects the change tracker
+        knows are unchanged. Returns the response, or an empty response if nothing was sent.
+        """
+        if self._client.tracker is not None:
+            objs = [obj for obj in objs if not self._client.tracker.unchanged(search, obj)]
+        if not objs:
+            return {'id2etag': {}, 'id2error': {}}
+
+        payload = {
+            'update': objs
+        }
+        response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        self._client.sync()
+        return response
+
     def builder(self, name: str, color: str = 'random', project_type: str = 'TASK', folder_id: str = None) -> dict:
         """
         Creates and returns a local project object. Helper method for [create][managers.projects.ProjectManager.create]
@@ -238,6 +279,11 @@ class ProjectManager:
         else:
             raise TypeError(f"Required Positional Argument Must Be A String or List of Project Objects")
 
+        # Queue the projects in an open batch
+        if self._client._batch is not None:
+            futures = [self._client._batch.queue('projects', 'add', project) for project in obj]
+            return futures if batch else futures[0]
+
         url = self._client.BASE_URL + 'batch/project'
         payload = {
             'add': obj
@@ -247,18 +293,7 @@ class ProjectManager:
         if len(obj) == 1:
             return self._client.get_by_id(self._client.parse_id(response), search='projects')
         else:
-            etag = response['id2etag']
-            etag2 = list(etag.keys())  # Get the ids
-            items = [''] * len(obj)  # Create enough spots for the objects
-            for proj_id in etag2:
-                found = self._client.get_by_id(proj_id, search='projects')
-                for original in obj:
-                    if found['name'] == original['name']:
-                        # Get the index of original
-                        index = obj.index(original)
-                        # Place found at the index in return list
-                        items[index] = found
-            return items
+            return self._ordered_results(response, obj, 'projects')
 
     def update(self, obj):
         """
@@ -266,6 +301,9 @@ class ProjectManager:
 
         Make local changes to the project objects that you want to change first, then pass the actual objects to the method.
 
+        When the client tracks changes (see [ChangeTracker][tracking.ChangeTracker]), projects that have
+        not changed since the last sync are not sent.
+
         !!! info
             Every potential update to a project's attributes have not been tested. See [Example `TickTick` Project Dictionary](projects.md#example-ticktick-project-dictionary) for
             a listing of the fields present in a project.
@@ -372,27 +410,19 @@ class ProjectManager:
         else:
             tasks = obj
 
+        # Queue the updates in an open batch
+        if self._client._batch is not None:
+            futures = [self._client._batch.resolved(self._client.get_by_id(project['id'], search='projects'))
+                       if self._client.tracker is not None and self._client.tracker.unchanged('projects', project)
+                       else self._client._batch.queue('projects', 'update', project) for project in tasks]
+            return futures[0] if isinstance(obj, dict) else futures
+
         url = self._client.BASE_URL + 'batch/project'
-        payload = {
-            'update': tasks
-        }
-        response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
+        response = self._send_updates(url, tasks, 'projects')
         if len(tasks) == 1:
-            return self._client.get_by_id(self._client.parse_id(response), search='projects')
+            return self._client.get_by_id(tasks[0]['id'], search='projects')
         else:
-            etag = response['id2etag']
-            etag2 = list(etag.keys())  # Get the ids
-            items = [''] * len(obj)  # Create enough spots for the objects
-            for proj_id in etag2:
-                found = self._client.get_by_id(proj_id, search='projects')
-                for original in obj:
-                    if found['name'] == original['name']:
-                        # Get the index of original
-                        index = obj.index(original)
-                        # Place found at the index in return list
-                        items[index] = found
-            return items
+            return self._ordered_results(response, obj, 'projects')
 
     def delete(self, ids):
         """
@@ -447,17 +477,24 @@ class ProjectManager:
         if not isinstance(ids, str) and not isinstance(ids, list):
             raise TypeError('Ids Must Be A String or List Of Strings')
 
+        single = isinstance(ids, str)
         if isinstance(ids, str):
-            proj = self._client.get_by_fields(id=ids, search='projects')
+            proj = self._client.get_by_id(ids, search='projects')
             if not proj:
                 raise ValueError(f"Project '{ids}' Does Not Exist To Delete")
             ids = [ids]
         else:
             for i in ids:
-                proj = self._client.get_by_fields(id=i, search='projects')
+                proj = self._client.get_by_id(i, search='projects')
                 if not proj:
                     raise ValueError(f"Project '{i}' Does Not Exist To Delete")
 
+        # Queue the deletes in an open batch
+        if self._client._batch is not None:
+            futures = [self._client._batch.queue('projects', 'delete', i,
+                                                 self._client.get_by_id(i, search='projects')) for i in ids]
+            return futures[0] if single else futures
+
         # Delete the task
         url = self._client.BASE_URL + 'batch/project'
         payload = {
@@ -465,12 +502,10 @@ class ProjectManager:
         }
         self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
         # Delete the list
-        deleted_list = []
-        for current_id in ids:
-            tasks = self._client.task.get_from_project(current_id)
-            for task in tasks:
-                self._client.delete_from_local_state(id=task['id'], search='tasks')
-            deleted_list.append(self._client.delete_from_local_state(id=current_id, search='projects'))
+        task_ids = [task_id for current_id in ids
+                    for task_id, in self._client.task.get_from_project(current_id, fields='id')]
+        self._client.delete_many_from_local_state('tasks', ids=task_ids)
+        deleted_list = self._client.delete_many_from_local_state('projects', ids=ids)
 
         if len(deleted_list) == 1:
             return deleted_list[0]
@@ -584,6 +619,7 @@ class ProjectManager:
                     raise ValueError(f"Project '{i}' Does Not Exist To Archive")
                 proj['closed'] = True
                 objs.append(proj)
+        self._client.invalidate_index('projects')
 
         return self.update(objs)
 
@@ -683,18 +719,7 @@ class ProjectManager:
         if len(objs) == 1:
             return self._client.get_by_id(self._client.parse_id(response), search='project_folders')
         else:
-            etag = response['id2etag']
-            etag2 = list(etag.keys())  # Get the ids
-            items = [''] * len(objs)  # Create enough spots for the objects
-            for proj_id in etag2:
-                found = self._client.get_by_id(proj_id, search='project_folders')
-                for original in objs:
-                    if found['name'] == original['name']:
-                        # Get the index of original
-                        index = objs.index(original)
-                        # Place found at the index in return list
-                        items[index] = found
-            return items
+            return self._ordered_results(response, objs, 'project_folders')
 
     def update_folder(self, obj):
         """
@@ -702,6 +727,9 @@ class ProjectManager:
 
         Make the changes you want to the project folder(s) first.
 
+        When the client tracks changes (see [ChangeTracker][tracking.ChangeTracker]), folders that have
+        not changed since the last sync are not sent.
+
         Arguments:
             obj (dict or list):
                 **Single Folder (dict)**: The dictionary object of the folder to update.
@@ -791,26 +819,39 @@ class ProjectManager:
             tasks = obj
 
         url = self._client.BASE_URL + 'batch/projectGroup'
-        payload = {
-            'update': tasks
-        }
-        response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
+        response = self._send_updates(url, tasks, 'project_folders')
         if len(tasks) == 1:
-            return self._client.get_by_id(self._client.parse_id(response), search='project_folders')
+            return self._client.get_by_id(tasks[0]['id'], search='project_folders')
         else:
-            etag = response['id2etag']
-            etag2 = list(etag.keys())  # Get the ids
-            items = [''] * len(tasks)  # Create enough spots for the objects
-            for proj_id in etag2:
-                found = self._client.get_by_id(proj_id, search='project_folders')
-                for original in tasks:
-                    if found['name'] == original['name']:
-                        # Get the index of original
-                        index = tasks.index(original)
-                        # Place found at the index in return list
-                        items[index] = found
-            return items
+            return self._ordered_results(response, tasks, 'project_folders')
+
+    def get_from_folder(self, folder: str) -> list:
+        """
+        Obtains the projects that are contained in the project folder.
+
+        Arguments:
+            folder: ID string of the project folder to get the projects from.
+
+        Returns:
+            list: The project object dictionaries in the folder, or an empty list if no projects are found.
+
+        Raises:
+            ValueError: If the project folder ID does not exist.
+
+        !!! example
+            ```python
+            # Lets assume that we have a folder named 'Hobbies'
+            hobbies = client.get_by_fields(name='Hobbies', search='project_folders')
+            projects = client.project.get_from_folder(hobbies['id'])
+            ```
+
+            ??? success "Result"
+                A list of the project dictionaries in the folder is returned.
+        """
+        if not self._client.get_by_id(folder, search='project_folders'):
+            raise ValueError(f"Project Folder '{folder}' Does Not Exist")
+
+        return self._client._index.lookup('projects', 'groupId', folder)
 
     def delete_folder(self, ids):
         """
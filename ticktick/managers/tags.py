@@ -1,3 +1,4 @@
+from ticktick.helpers.concurrency import BatchRequestError, chunked, run_concurrently
 from ticktick.helpers.hex_color import check_hex_color, generate_hex_color
 from ticktick.managers.check_logged_in import logged_in
 
@@ -43,6 +44,67 @@ class TagsManager:
 
         return self.SORT_DICTIONARY[sort_type]
 
+    def _get(self, label: str) -> dict:
+        """
+        Returns the tag with the label from the tag lookup table, or an empty dictionary if it does not exist.
+        """
+        return self._client._index.first('tags', 'name', label.lower())
+
+    def _paired(self, label, values, name: str) -> list:
+        """
+        Pairs each tag with its value - the same value for every tag, or the value at the same position.
+        """
+        if isinstance(label, str):
+            label = [label]
+        elif not isinstance(label, list):
+            raise TypeError('Label Must Be A String or List Of Strings')
+        if not isinstance(values, list):
+            values = [values] * len(label)
+        elif len(values) != len(label):
+            raise ValueError(f"Must Include One {name} Per Label")
+
+        paired = []
+        for lbl, value in zip(label, values):
+            if not isinstance(lbl, str):
+                raise TypeError(f"'{lbl}' Must Be A String")
+            obj = self._get(lbl)
+            if not obj:
+                raise ValueError(f"Tag '{lbl.lower()}' Does Not Exist To Update")
+            paired.append((obj, value))
+        return paired
+
+    def _update_many(self, objs: list) -> list:
+        """
+        Sends the tag updates in `batch/tag` requests of at most `MAX_BATCH_SIZE` tags, syncs once,
+        and returns the updated tags in order. Tags the change tracker knows are unchanged are not sent.
+        """
+        # Queue the updates in an open batch
+        if self._client._batch is not None:
+            return [self._client._batch.resolved(self._get(obj['name']))
+                    if self._client.tracker is not None and self._client.tracker.unchanged('tags', obj)
+                    else self._client._batch.queue('tags', 'update', obj) for obj in objs]
+
+        url = self._client.BASE_URL + 'batch/tag'
+        changed = objs
+        if self._client.tracker is not None:
+            changed = [obj for obj in objs if not self._client.tracker.unchanged('tags', obj)]
+            if not changed:
+                return [self._get(obj['name']) for obj in objs]
+
+        id2etag = {}
+        try:
+            for chunk in chunked(changed, self._client.MAX_BATCH_SIZE):
+                payload = {
+                    'update': chunk
+                }
+                response = self._client.http_post(url, json=payload, cookies=self._client.cookies,
+                                                  headers=self.headers)
+                id2etag.update(response['id2etag'])
+        finally:
+            self._client.sync()
+        return [self._client.get_by_etag(id2etag[obj['name']], search='tags') if obj['name'] in id2etag
+                else self._get(obj['name']) for obj in objs]
+
     def _check_fields(self,
                       label: str = None,
                       color: str = 'random',
@@ -62,7 +124,7 @@ class TagsManager:
             if not isinstance(label, str):
                 raise TypeError(f"Label Must Be A String")
             # Tag names should not be repeated, so make sure passed name does not exist
-            tag_list = self._client.get_by_fields(search='tags', name=label.lower())  # Name is lowercase version of label
+            tag_list = self._get(label)  # Name is lowercase version of label
             if tag_list:
                 raise ValueError(f"Invalid Tag Name '{label}' -> It Already Exists")
 
@@ -81,7 +143,7 @@ class TagsManager:
             if not isinstance(parent_label, str):
                 raise TypeError(f"Parent Name Must Be A String")
             parent_label = parent_label.lower()
-            parent = self._client.get_by_fields(search='tags', name=parent_label)
+            parent = self._get(parent_label)
             if not parent:
                 raise ValueError(f"Invalid Parent Name '{parent_label}' -> Does Not Exist")
 
@@ -294,6 +356,11 @@ class TagsManager:
         if not batch:
             obj = [obj]
 
+        # Queue the tags in an open batch
+        if self._client._batch is not None:
+            futures = [self._client._batch.queue('tags', 'add', tag) for tag in obj]
+            return futures if batch else futures[0]
+
         url = self._client.BASE_URL + 'batch/tag'
         payload = {'add': obj}
         response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
@@ -316,22 +383,30 @@ class TagsManager:
             else:
                 return items
 
-    def rename(self, old: str, new: str) -> dict:
+    def rename(self, old, new):
         """
-        Renames a tag.
+        Renames a tag. Supports single and batch tag renaming.
+
+        There is no batch rename, so the renames of many tags are sent at the same time (up to
+        `MAX_WORKERS`), followed by a single sync.
 
         Arguments:
-            old: Current label of the tag to be changed.
-            new: Desired new label of the tag.
+            old (str or list): Current label of the tag to be changed, or the labels of the tags in a list.
+            new (str or list): Desired new label of the tag, or the new labels in a list in the same order.
 
         Returns:
-            The tag object with the updated label.
+            dict or list:
+            **Single Tag (dict)**: The tag object with the updated label.
+
+            **Multiple Tags (list)**: The tag objects with the updated labels in a list, in the order of `old`.
 
         Raises:
-            TypeError: If `old` and `new` are not strings.
-            ValueError: If the `old` tag label does not exist.
-            ValueError: If the `new` tag label already exists.
-            RuntimeError: If the renaming was unsuccessful.
+            TypeError: If `old` and `new` are not both strings or both lists of strings.
+            ValueError: If an `old` tag label does not exist, or the lists are not the same length.
+            ValueError: If a `new` tag label already exists or is repeated.
+            RuntimeError: If the renaming was unsuccessful. Raised as a
+                [BatchRequestError][helpers.concurrency.BatchRequestError] holding the error of every failed
+                tag when renaming many tags.
 
         !!! example "Changing a Tag's Label"
 
@@ -359,51 +434,84 @@ class TagsManager:
 
                 ![image](https://user-images.githubusercontent.com/56806733/104661299-19e0dd80-567d-11eb-825f-758d83178295.png)
         """
-        # Check that both old and new are strings
-        if not isinstance(old, str) or not isinstance(new, str):
-            raise TypeError('Old and New Must Be Strings')
-
-        # Make sure the old tag exists
-        old = old.lower()
-        # Check if the tag object exists
-        obj = self._client.get_by_fields(name=old, search='tags')
-        if not obj:
-            raise ValueError(f"Tag '{old}' Does Not Exist To Rename")
-
-        # Make sure the new tag does not exist
-        temp_new = new.lower()
-        # Check if the tag object exists
-        found = self._client.get_by_fields(name=temp_new, search='tags')
-        if found:
-            raise ValueError(f"Name '{new}' Already Exists -> Cannot Duplicate Name")
+        # Check that both old and new are strings, or lists of strings
+        batch = isinstance(old, list)
+        if batch:
+            if not isinstance(new, list):
+                raise TypeError('Old and New Must Be Strings Or Lists Of Strings')
+            if len(old) != len(new):
+                raise ValueError('Old and New Must Be The Same Length')
+            old_labels, new_labels = old, new
+        else:
+            old_labels, new_labels = [old], [new]
+
+        renames = []
+        taken = set()
+        for old_label, new_label in zip(old_labels, new_labels):
+            if not isinstance(old_label, str) or not isinstance(new_label, str):
+                raise TypeError('Old and New Must Be Strings')
+
+            # Make sure the old tag exists
+            obj = self._get(old_label)
+            if not obj:
+                raise ValueError(f"Tag '{old_label.lower()}' Does Not Exist To Rename")
+
+            # Make sure the new tag does not exist
+            temp_new = new_label.lower()
+            if self._get(temp_new) or temp_new in taken:
+                raise ValueError(f"Name '{new_label}' Already Exists -> Cannot Duplicate Name")
+            taken.add(temp_new)
+            renames.append((obj, new_label))
 
         url = self._client.BASE_URL + 'tag/rename'
-        payload = {
-            'name': obj['name'],
-            'newName': new
-        }
-        response = self._client.http_put(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+
+        def rename_tag(rename):
+            obj, new_label = rename
+            payload = {
+                'name': obj['name'],
+                'newName': new_label
+            }
+            return self._client.http_put(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+
+        try:
+            run_concurrently(rename_tag, renames, self._client.MAX_WORKERS)
+        except BatchRequestError as error:
+            self._client.sync()
+            if not batch:
+                raise error.errors[0]
+            raise
         self._client.sync()
+
         # Response from TickTick does not return the new etag of the object, we must find it ourselves
-        new_obj = self._client.get_by_fields(name=temp_new, search='tags')
-        # Return the etag of the updated object
-        return self._client.get_by_etag(new_obj['etag'], search='tags')
+        renamed = [self._get(new_label) for _, new_label in renames]
+        return renamed if batch else renamed[0]
 
-    def color(self, label: str, color: str) -> dict:
+    def color(self, label, color):
         """
-        Change the color of a tag. For batch changing colors, see [update][managers.tags.TagsManager.update].
+        Change the color of a tag. Supports single and batch tag color changes.
+
+        Batch changes are sent in `batch/tag` requests of up to `MAX_BATCH_SIZE` tags, followed by
+        a single sync.
 
         Arguments:
-            label: The label of the tag to be changed.
-            color: The new desired hex color string.
+            label (str or list):
+                **Single Tag (str)**: The label of the tag to be changed.
+
+                **Multiple Tags (list)**: The labels of the tags to be changed in a list.
+            color (str or list): The new desired hex color string - for every tag, or a list with one color
+                per label.
 
         Returns:
-            The updated tag dictionary object.
+            dict or list:
+            **Single Tag (dict)**: The updated tag dictionary object.
+
+            **Multiple Tags (list)**: The updated tag dictionaries in a list, in the order of the labels.
 
         Raises:
-            TypeError: If `label` or `color` are not strings.
-            ValueError: If the tag `label` does not exist.
-            ValueError: If `color` is not a valid hex color string.
+            TypeError: If the labels or colors are not strings.
+            ValueError: If a tag label does not exist.
+            ValueError: If a color is not a valid hex color string, or the number of colors does not
+                match the number of labels.
             RuntimeError: If changing the color was not successful.
 
         !!! example "Changing a Tag's Color"
@@ -427,44 +535,53 @@ class TagsManager:
                 **After**
 
                 ![image](https://user-images.githubusercontent.com/56806733/104661860-55c87280-567e-11eb-93b5-054fa4f1104a.png)
-        """
-        if not isinstance(label, str) or not isinstance(color, str):
-            raise TypeError('Label and Color Must Be Strings')
-
-        # Get the object
-        label = label.lower()
-        obj = self._client.get_by_fields(name=label, search='tags')
-        if not obj:
-            raise ValueError(f"Tag '{label}' Does Not Exist To Update")
 
-        # Check the color
-        if not check_hex_color(color):
-            raise ValueError(f"Hex Color String '{color}' Is Not Valid")
+        !!! example "Changing Many Tags' Colors"
+            ```python
+            # Every tag nested under "Hobbies" is colored red
+            children = [tag['label'] for tag in client.tag.children('Hobbies')]
+            updated = client.tag.color(children, '#d00000')
+            ```
+        """
+        paired = self._paired(label, color, 'Color')
+        for obj, new_color in paired:
+            if not isinstance(new_color, str):
+                raise TypeError('Color Must Be A Hex Color String')
+            if not check_hex_color(new_color):
+                raise ValueError(f"Hex Color String '{new_color}' Is Not Valid")
 
-        obj['color'] = color  # Set the color
+        for obj, new_color in paired:
+            obj['color'] = new_color  # Set the color
+        self._client.invalidate_index('tags')
 
-        url = self._client.BASE_URL + 'batch/tag'
-        payload = {
-            'update': [obj]
-        }
-        response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
-        return self._client.get_by_etag(response['id2etag'][obj['name']])
+        updated = self._update_many([obj for obj, _ in paired])
+        return updated[0] if isinstance(label, str) else updated
 
-    def sorting(self, label: str, sort: int) -> dict:
+    def sorting(self, label, sort):
         """
-        Change the sort type of a tag. For batch changing sort types, see [update][managers.tags.TagsManager.update].
+        Change the sort type of a tag. Supports single and batch tag sort type changes.
+
+        Batch changes are sent in `batch/tag` requests of up to `MAX_BATCH_SIZE` tags, followed by
+        a single sync.
 
         Arguments:
-            label: The label of the tag to be changed.
-            sort: The new sort type specified by an integer 0-3. See [sort dictionary](tags.md#sort-dictionary).
+            label (str or list):
+                **Single Tag (str)**: The label of the tag to be changed.
+
+                **Multiple Tags (list)**: The labels of the tags to be changed in a list.
+            sort (int or list): The new sort type specified by an integer 0-3 - for every tag, or a list with
+                one sort type per label. See [sort dictionary](tags.md#sort-dictionary).
 
         Returns:
-            The updated tag dictionary object.
+            dict or list:
+            **Single Tag (dict)**: The updated tag dictionary object.
+
+            **Multiple Tags (list)**: The updated tag dictionaries in a list, in the order of the labels.
 
         Raises:
-            TypeError: If `label` is not a string or if `sort` is not an int.
-            ValueError: If the tag `label` does not exist.
+            TypeError: If the labels are not strings or if a sort type is not an int.
+            ValueError: If a tag label does not exist, or the number of sort types does not match the
+                number of labels.
             RuntimeError: If the updating was unsuccessful.
 
         !!! example "Changing the Sort Type"
@@ -489,25 +606,19 @@ class TagsManager:
 
                 ![image](https://user-images.githubusercontent.com/56806733/104663663-5531db00-5682-11eb-9440-5673a70840b4.png)
         """
-        if not isinstance(label, str) or not isinstance(sort, int):
-            raise TypeError('Label Must Be A String and Sort Must Be An Int')
+        paired = self._paired(label, sort, 'Sort Type')
+        sorts = []
+        for obj, sort_type in paired:
+            if not isinstance(sort_type, int):
+                raise TypeError('Sort Must Be An Int')
+            sorts.append(self._sort_string_value(sort_type))  # Get the sort string for the value
 
-        # Get the object
-        label = label.lower()
-        obj = self._client.get_by_fields(name=label, search='tags')
-        if not obj:
-            raise ValueError(f"Tag '{label}' Does Not Exist To Update")
-        sort = self._sort_string_value(sort)  # Get the sort string for the value
+        for (obj, _), sort_type in zip(paired, sorts):
+            obj['sortType'] = sort_type  # set the object field
+        self._client.invalidate_index('tags')
 
-        obj['sortType'] = sort  # set the object field
-
-        url = self._client.BASE_URL + 'batch/tag'
-        payload = {
-            'update': [obj]
-        }
-        response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
-        return self._client.get_by_etag(response['id2etag'][obj['name']])
+        updated = self._update_many([obj for obj, _ in paired])
+        return updated[0] if isinstance(label, str) else updated
 
     def nesting(self, child: str, parent: str) -> dict:
         """
@@ -626,7 +737,7 @@ class TagsManager:
 
         # Get the object
         child = child.lower()
-        obj = self._client.get_by_fields(name=child, search='tags')
+        obj = self._get(child)
         if not obj:
             raise ValueError(f"Tag '{child}' Does Not Exist To Update")
 
@@ -661,8 +772,10 @@ class TagsManager:
             else:  # Doesn't want a parent -> Case 2
                 return obj  # We don't have to do anything if no parent and doesn't want a parent
 
+        self._client.invalidate_index('tags')
+
         # Have to find the project
-        pobj = self._client.get_by_fields(name=new_p, search='tags')
+        pobj = self._get(new_p)
         if not pobj:
             raise ValueError(f"Tag '{parent}' Does Not Exist To Set As Parent")
 
@@ -674,10 +787,78 @@ class TagsManager:
         self._client.sync()
         return self._client.get_by_etag(response['id2etag'][obj['name']], search='tags')
 
+    def children(self, label: str, recursive: bool = False) -> list:
+        """
+        Obtains the tags nested under the tag.
+
+        Tags are looked up by name and parent in tables kept for [`state`](api.md#state), so this
+        does not scan every tag.
+
+        Arguments:
+            label: Label of the parent tag.
+            recursive: Also include the children of the children, in depth first order.
+
+        Returns:
+            list: The tag dictionaries nested under the tag, or an empty list if it has none.
+
+        Raises:
+            ValueError: If the tag does not exist.
+
+        !!! example
+            ```python
+            # Lets assume that 'Books' and 'Podcasts' are nested under 'Productivity'
+            children = client.tag.children('Productivity')
+            ```
+
+            ??? success "Result"
+                ```python
+                [{'name': 'books', 'label': 'Books', 'sortOrder': 0, 'sortType': 'project', 'color': '#134397',
+                'parent': 'productivity', 'etag': 'tsoqmv3s'},
+                {'name': 'podcasts', 'label': 'Podcasts', 'sortOrder': 0, 'sortType': 'project', 'color': '#F18181',
+                'parent': 'productivity', 'etag': 'al24ycdx'}]
+                ```
+        """
+        parent = self._get(label)
+        if not parent:
+            raise ValueError(f"Tag '{label}' Does Not Exist")
+
+        found = []
+        seen = {parent['name']}
+
+        def collect(name):
+            for child in self._client._index.lookup('tags', 'parent', name):
+                if child['name'] in seen:  # Guard against a cycle of parents
+                    continue
+                seen.add(child['name'])
+                found.append(child)
+                if recursive:
+                    collect(child['name'])
+
+        collect(parent['name'])
+        return found
+
+    def is_parent(self, label: str) -> bool:
+        """
+        Returns whether any tags are nested under the tag.
+
+        Arguments:
+            label: Label of the tag.
+
+        Raises:
+            ValueError: If the tag does not exist.
+        """
+        tag = self._get(label)
+        if not tag:
+            raise ValueError(f"Tag '{label}' Does Not Exist")
+        return bool(self._client._index.lookup('tags', 'parent', tag['name']))
+
     def update(self, obj):
         """
         Generic update method. Supports single and batch tag update.
 
+        Tags are sent in `batch/tag` requests of up to `MAX_BATCH_SIZE` tags. When the client tracks changes
+        (see [ChangeTracker][tracking.ChangeTracker]), tags that have not changed since the last sync are not sent.
+
         !!! important
             Updating tag properties like `parent` and renaming tags must be completed through
             their respective class methods to work: [nesting][managers.tags.TagsManager.nesting]
@@ -790,24 +971,8 @@ class TagsManager:
         if not batch:
             obj_list = [obj]
 
-        url = self._client.BASE_URL + 'batch/tag'
-        payload = {'update': obj_list}
-        response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
-
-        if not batch:
-            return self._client.get_by_etag(self._client.parse_etag(response), search='tags')
-        else:
-            etag = response['id2etag']
-            etag2 = list(etag.keys())  # Tag names are out of order
-            labels = [x['name'] for x in obj_list]  # Tag names are in order
-            items = [''] * len(obj_list)  # Create enough spots for the objects
-            for tag in etag2:
-                index = labels.index(tag)  # Object of the index is here
-                actual_etag = etag[tag]  # Get the actual etag
-                found = self._client.get_by_etag(actual_etag, search='tags')
-                items[index] = found  # Place at the correct index
-            return items
+        items = self._update_many(obj_list)
+        return items if batch else items[0]
 
     def merge(self, label, merged: str):
         """
@@ -828,7 +993,9 @@ class TagsManager:
         Raises:
             TypeError: If `merged` is not a str or if `label` is not a str or list.
             ValueError: If any of the labels do not exist.
-            RuntimeError: If the merge could not be successfully completed.
+            RuntimeError: If the merge could not be successfully completed. Raised as a
+                [BatchRequestError][helpers.concurrency.BatchRequestError] holding the error of every failed
+                tag when merging many tags.
 
         !!! example "Merging Tags"
             === "Merging Two Tags"
@@ -917,7 +1084,7 @@ class TagsManager:
         # Lowercase merged
         merged = merged.lower()
         # Make sure merged exists
-        kept_obj = self._client.get_by_fields(name=merged, search='tags')
+        kept_obj = self._get(merged)
         if not kept_obj:
             raise ValueError(f"Kept Tag '{merged}' Does Not Exist To Merge")
 
@@ -926,7 +1093,7 @@ class TagsManager:
         if isinstance(label, str):
             string = label.lower()
             # Make sure it exists
-            retrieved = self._client.get_by_fields(name=string, search='tags')
+            retrieved = self._get(string)
             if not retrieved:
                 raise ValueError(f"Tag '{label}' Does Not Exist To Merge")
             merge_queue.append(retrieved)
@@ -937,19 +1104,28 @@ class TagsManager:
                     raise ValueError(f"Item '{item}' Must Be A String")
                 string = item.lower()
                 # Make sure it exists
-                found = self._client.get_by_fields(name=string, search='tags')
+                found = self._get(string)
                 if not found:
                     raise ValueError(f"Tag '{item}' Does Not Exist To Merge")
                 merge_queue.append(found)
 
-        for labels in merge_queue:
-            # Merge
-            url = self._client.BASE_URL + 'tag/merge'
+        url = self._client.BASE_URL + 'tag/merge'
+
+        def merge_tag(labels):
             payload = {
                 'name': labels['name'],
                 'newName': kept_obj['name']
             }
-            self._client.http_put(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+            return self._client.http_put(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+
+        # There is no batch merge -> send the merges at the same time and sync once they all finish
+        try:
+            run_concurrently(merge_tag, merge_queue, self._client.MAX_WORKERS)
+        except BatchRequestError as error:
+            self._client.sync()
+            if isinstance(label, str):
+                raise error.errors[0]
+            raise
         self._client.sync()
 
         return kept_obj
@@ -978,7 +1154,9 @@ class TagsManager:
         Raises:
             TypeError: If `label` is not a string or list.
             ValueError: If a label does not exist.
-            RuntimeError: If the tag could not be deleted successfully.
+            RuntimeError: If the tag could not be deleted successfully. Raised as a
+                [BatchRequestError][helpers.concurrency.BatchRequestError] holding the error of every failed
+                tag when deleting many tags.
 
         !!! example "Tag Deletion"
             === "Single Tag Deletion"
@@ -1047,26 +1225,36 @@ class TagsManager:
             raise TypeError('Label Must Be A String or List Of Strings')
 
         url = self._client.BASE_URL + 'tag'
-        if isinstance(label, str):
+        batch = isinstance(label, list)
+        if not batch:
             label = [label]  # If a singular string we are going to add it to a list
 
-        objects = []
+        tags = []
         for lbl in label:
             if not isinstance(lbl, str):
                 raise TypeError(f"'{lbl}' Must Be A String")
             lbl = lbl.lower()
-            tag_obj = self._client.get_by_fields(name=lbl, search='tags')  # Get the tag object
+            tag_obj = self._get(lbl)  # Get the tag object
             if not tag_obj:
                 raise ValueError(f"Tag '{lbl}' Does Not Exist To Delete")
+            tags.append(tag_obj)
+
+        def delete_tag(tag_obj):
             # We can assume that only one tag has the name
             params = {
                 'name': tag_obj['name']
             }
-            response = self._client.http_delete(url, params=params, cookies=self._client.cookies, headers=self.headers)
-            # Find the tag in the tags list and delete it, then return the deleted object
-            objects.append(self._client.delete_from_local_state(search='tags', etag=tag_obj['etag']))
+            return self._client.http_delete(url, params=params, cookies=self._client.cookies, headers=self.headers)
+
+        # There is no batch delete -> send the deletes at the same time
+        try:
+            run_concurrently(delete_tag, tags, self._client.MAX_WORKERS)
+        except BatchRequestError as error:
+            self._client.sync()
+            if not batch:
+                raise error.errors[0]
+            raise
+        # Delete the tags from the tags list in one pass, then return the deleted objects
+        objects = self._client.delete_many_from_local_state('tags', etags=[tag_obj['etag'] for tag_obj in tags])
         self._client.sync()
-        if len(objects) == 1:
-            return objects[0]
-        else:
-            return objects
+        return objects if batch else objects[0]
@@ -1,8 +1,10 @@
 import datetime
-import pytz
 
-from ticktick.helpers.time_methods import convert_local_time_to_utc, convert_date_to_tick_tick_format
+from ticktick.helpers.time_methods import convert_local_time_to_utc, convert_date_to_tick_tick_format, to_utc
 from ticktick.helpers.constants import DATE_FORMAT
+from ticktick.helpers.concurrency import chunked, run_concurrently
+from ticktick.helpers.object_id import generate_object_id
+from ticktick.helpers.query import projector
 from calendar import monthrange
 
 
@@ -140,6 +142,13 @@ class TaskManager:
                     ![image](https://user-images.githubusercontent.com/56806733/122315454-eece1480-cece-11eb-8394-94a2aec1ba70.png)
         """
 
+        # queue the task in an open batch
+        if self._client._batch is not None:
+            payload = dict(task)
+            if payload.get('projectId') in (None, 'inbox'):
+                payload['projectId'] = self._client.inbox_id
+            return self._client._batch.queue('tasks', 'add', payload)
+
         # generate url
         url = self._generate_create_url()
 
@@ -187,6 +196,9 @@ class TaskManager:
         !!! warning
             Creating tasks with tags is not functional but will be implemented in a future update.
 
+        When the client tracks changes (see [ChangeTracker][tracking.ChangeTracker]), only the fields changed
+        since the last sync are sent, and a task with no changes is returned without sending a request.
+
         Arguments:
             task (dict): Task dictionary to be updated
 
@@ -240,11 +252,24 @@ class TaskManager:
 
         # TODO: Make tags work
 
+        # Only send the changed fields when they are known
+        payload = task
+        if self._client.tracker is not None:
+            changes = self._client.tracker.changes('tasks', task)
+            if changes == {}:
+                return task if self._client._batch is None else self._client._batch.resolved(task)
+            if changes is not None:
+                payload = {'id': task['id'], 'projectId': task['projectId'], **changes}
+
+        # queue the update in an open batch - batch/task replaces the whole task, so it gets all the fields
+        if self._client._batch is not None:
+            return self._client._batch.queue('tasks', 'update', task)
+
         # generate url
         url = self._generate_update_url(task['id'])
 
         # make request
-        response = self._client.http_post(url=url, json=task, headers=self.oauth_headers)
+        response = self._client.http_post(url=url, json=payload, headers=self.oauth_headers)
 
         # sync local state
         self._client.sync()
@@ -260,18 +285,28 @@ class TaskManager:
         COMPLETE_ENDPOINT = f"/open/v1/project/{projectID}/task/{taskID}/complete"
         return self._client.OPEN_API_BASE_URL + COMPLETE_ENDPOINT
 
-    def complete(self, task: dict):
+    def complete(self, task):
         """
-        Marks a task as complete. Pass in the task dictionary to be marked as completed.
+        Marks a task as complete. Pass in the task dictionary to be marked as completed, or a list of
+        task dictionaries to complete many tasks.
+
+        Many tasks are completed with concurrent requests (up to `MAX_WORKERS` at a time) followed by a
+        single sync, so recurring tasks still move on to their next occurrence.
 
         !!! note
             The task should already be created
 
         Arguments:
-            task (dict): The task dictionary object.
+            task (dict or list): The task dictionary object, or a list of task dictionary objects.
 
         Returns:
-            dict: The original passed in task.
+            dict or list: The original passed in task, or a list of the passed in tasks in order.
+
+        Raises:
+            TypeError: If `task` is not a dict or list of dicts.
+            RuntimeError: If a task could not be completed. When completing a list of tasks this is a
+                [BatchRequestError][helpers.concurrency.BatchRequestError] holding the error of every failed task,
+                raised after the local state is synced.
 
         !!! example "Task Completing"
             ```python
@@ -302,20 +337,33 @@ class TaskManager:
                 ![image](https://user-images.githubusercontent.com/56806733/104504069-c4ca9c00-5596-11eb-96c9-5698e19989ea.png)
         """
 
-        # generate url
-        url = self._generate_mark_complete_url(task['projectId'], task['id'])
-
-        # make request
-        response = self._client.http_post(url=url, json=task, headers=self.oauth_headers)
-
-        # sync local state
-        self._client.sync()
-
-        if response == '':
-            return task
-
-        # return response
-        return response
+        batch = isinstance(task, list)
+        tasks = task if batch else [task]
+        for obj in tasks:
+            if not isinstance(obj, dict):
+                raise TypeError('Task Must Be A Dict Or List Of Dicts')
+
+        def complete_task(obj):
+            # generate url
+            url = self._generate_mark_complete_url(obj['projectId'], obj['id'])
+
+            # make request
+            response = self._client.http_post(url=url, json=obj, headers=self.oauth_headers)
+            if response == '':
+                return obj
+            return response
+
+        if not batch:
+            response = complete_task(task)
+            # sync local state
+            self._client.sync()
+            return response
+
+        try:
+            return run_concurrently(complete_task, tasks, self._client.MAX_WORKERS)
+        finally:
+            # sync local state once for every task
+            self._client.sync()
 
     def _generate_delete_url(self):
         """
@@ -444,6 +492,13 @@ class TaskManager:
                 delete_dict = {'projectId': item['projectId'], 'taskId': item['id']}
                 to_delete.append(delete_dict)
 
+        # queue the deletes in an open batch
+        if self._client._batch is not None:
+            tasks = [task] if isinstance(task, dict) else task
+            futures = [self._client._batch.queue('tasks', 'delete', item, obj)
+                       for item, obj in zip(to_delete, tasks)]
+            return futures[0] if isinstance(task, dict) else futures
+
         payload = {'delete': to_delete}
         # make request
         self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
@@ -829,20 +884,18 @@ class TaskManager:
         # Return the tasks in the new list
         return self._client.task.get_from_project(new)
 
-    def get_from_project(self, project: str):
+    def get_from_project(self, project: str, fields=None):
         """
         Obtains the tasks that are contained in the project.
 
         Arguments:
             project: ID string of the project to get the tasks from.
+            fields (str or list): Field name(s) to project the tasks down to. See
+            [projector][helpers.query.projector].
 
         Returns:
-            dict or list:
-            **Single Task In Project (dict)**: The single task object dictionary.
-
-            **Multiple Tasks In Project (list)**: A list of task object dictionaries.
-
-            **No Tasks Found (list)**: Empty list.
+            list: The task object dictionaries in the project, or an empty list if no tasks are found.
+            When `fields` is passed the list holds the projected tuples of the tasks.
 
         Raises:
             ValueError: If the project ID does not exist.
@@ -853,8 +906,7 @@ class TaskManager:
             ```
 
             ??? success "Result"
-                See `Returns` for the different return values based on the amount of tasks present
-                in the project.
+                A list of the tasks in the project is returned.
 
                 ```python
                 [{'id': '5ffe93efb04b35082bbce7af', 'projectId': 'inbox115781412', 'sortOrder': 2199023255552, 'title': 'Go To Library',
@@ -877,16 +929,350 @@ class TaskManager:
         """
         # Make sure the project exists
         if project != self._client.inbox_id:
-            obj = self._client.get_by_fields(id=project, search='projects')
+            obj = self._client.get_by_id(project, search='projects')
             if not obj:
                 raise ValueError(f"List Id '{project}' Does Not Exist")
 
         # Get the list of tasks that share the project id
-        tasks = self._client.get_by_fields(projectId=project, search='tasks')
-        if isinstance(tasks, dict):
-            return [tasks]
-        else:
-            return tasks
+        tasks = self._client._index.lookup('tasks', 'projectId', project)
+        if fields is not None:
+            return list(map(projector(fields), tasks))
+        return tasks
+
+    def between(self, start, end, tz: str = None) -> list:
+        """
+        Obtains the uncompleted tasks in [`state`](api.md#state) that fall between two dates.
+
+        A task falls between the dates when any part of it - from its `startDate` to its `dueDate` - is
+        in the range. Tasks without dates are not returned.
+
+        The tasks are looked up in a sorted index of their parsed dates, which is rebuilt after the
+        tasks in [`state`](api.md#state) change - so repeated calls do not parse or scan every task.
+
+        Arguments:
+            start (datetime): Start of the range, inclusive.
+            end (datetime): End of the range, inclusive.
+            tz: Time zone string of `start` and `end` when they have no timezone information. Defaults to
+                the time zone of the profile.
+
+        Returns:
+            list: The task object dictionaries in the range, sorted by their start date.
+
+        Raises:
+            ValueError: If `end` is before `start`.
+
+        !!! example "Tasks This Week"
+            ```python
+            today = datetime(2021, 1, 11)
+            tasks = client.task.between(today, today + timedelta(days=7))
+            ```
+
+            ??? success "Result"
+                A list of the tasks starting, due, or running during the week is returned.
+        """
+        if tz is None:
+            tz = self._client.time_zone
+        start, end = to_utc(start, tz), to_utc(end, tz)
+        if end < start:
+            raise ValueError('End Date Must Be After Start Date')
+
+        return self._client._index.between('tasks', start, end)
+
+    def get_subtasks(self, task: str, fields=None) -> list:
+        """
+        Obtains the subtasks directly under the task.
+
+        Arguments:
+            task: ID string of the parent task.
+            fields (str or list): Field name(s) to project the subtasks down to. See
+            [projector][helpers.query.projector].
+
+        Returns:
+            list: The subtask object dictionaries, or an empty list if the task has no subtasks.
+            When `fields` is passed the list holds the projected tuples of the subtasks.
+
+        Raises:
+            ValueError: If the task ID does not exist.
+
+        !!! example
+            ```python
+            # Lets assume that we have a task named 'Errands' with the subtasks 'Bank' and 'Groceries'
+            errands = client.get_by_fields(title='Errands', search='tasks')
+            subtasks = client.task.get_subtasks(errands['id'], fields='title')
+            ```
+
+            ??? success "Result"
+                ```python
+                [('Bank',), ('Groceries',)]
+                ```
+        """
+        if not self._client.get_by_id(task, search='tasks'):
+            raise ValueError(f"Task '{task}' Does Not Exist")
+
+        subtasks = self._client._index.lookup('tasks', 'parentId', task)
+        if fields is not None:
+            return list(map(projector(fields), subtasks))
+        return subtasks
+
+    def tree(self, task: str) -> dict:
+        """
+        Obtains the task with all of its subtasks, nested as far down as they go.
+
+        The tree is built from the subtasks of each task in the lookup tables kept for
+        [`state`](api.md#state), so it costs time proportional to the size of the tree.
+
+        Arguments:
+            task: ID string of the task at the root of the tree.
+
+        Returns:
+            dict: A node dictionary `{'task': task_dict, 'children': [child nodes]}` for the task.
+
+        Raises:
+            ValueError: If the task ID does not exist.
+
+        !!! example
+            ```python
+            # Lets assume that we have a task named 'Errands' with the subtask 'Bank', which has the subtask 'Deposit'
+            errands = client.get_by_fields(title='Errands', search='tasks')
+            tree = client.task.tree(errands['id'])
+            ```
+
+            ??? success "Result"
+                ```python
+                {'task': {'id': '...', 'title': 'Errands', ...},
+                 'children': [{'task': {'id': '...', 'title': 'Bank', 'parentId': '...', ...},
+                               'children': [{'task': {'id': '...', 'title': 'Deposit', ...}, 'children': []}]}]}
+                ```
+        """
+        root = self._client.get_by_id(task, search='tasks')
+        if not root:
+            raise ValueError(f"Task '{task}' Does Not Exist")
+
+        seen = {root['id']}
+
+        def build(obj):
+            children = []
+            for child in self._client._index.lookup('tasks', 'parentId', obj['id']):
+                if child['id'] not in seen:  # Guard against a cycle of parents
+                    seen.add(child['id'])
+                    children.append(build(child))
+            return {'task': obj, 'children': children}
+
+        return build(root)
+
+    @staticmethod
+    def _walk(node: dict):
+        """
+        Yields the task dictionaries of a tree node, parents before their children.
+        """
+        pending = [node]
+        while pending:
+            current = pending.pop()
+            yield current['task']
+            pending.extend(reversed(current['children']))
+
+    def _relocate(self, task, project, parent):
+        """
+        Moves the trees rooted at the tasks into the project (or keeps each in its own project when
+        `project` is `None`), under the parent task or to the top level when `parent` is `None`, using
+        one `batch/taskProject` and one `batch/taskParent` request.
+        """
+        batch = isinstance(task, list)
+        roots = task if batch else [task]
+        for root in roots:
+            if not isinstance(root, str):
+                raise TypeError('Task Must Be An ID String Or List Of ID Strings')
+        trees = [self.tree(root) for root in roots]
+
+        moves = []
+        parents = []
+        for node in trees:
+            target = project if project is not None else node['task']['projectId']
+            for obj in self._walk(node):
+                if parent is not None and obj['id'] == parent:
+                    raise ValueError(f"Task '{parent}' Can Not Be Nested Under Its Own Subtask")
+                if obj['projectId'] != target:
+                    moves.append({
+                        'fromProjectId': obj['projectId'],
+                        'taskId': obj['id'],
+                        'toProjectId': target
+                    })
+                if obj is node['task']:
+                    if parent is not None:
+                        parents.append({'parentId': parent, 'projectId': target, 'taskId': obj['id']})
+                    elif obj.get('parentId'):
+                        parents.append({'oldParentId': obj['parentId'], 'projectId': target, 'taskId': obj['id']})
+                elif obj['projectId'] != target:
+                    # Subtasks moved to another project are nested under their parent again
+                    parents.append({'parentId': obj['parentId'], 'projectId': target, 'taskId': obj['id']})
+
+        if moves:
+            url = self._client.BASE_URL + 'batch/taskProject'
+            self._client.http_post(url, json=moves, cookies=self._client.cookies, headers=self.headers)
+        if parents:
+            url = self._client.BASE_URL + 'batch/taskParent'
+            self._client.http_post(url, json=parents, cookies=self._client.cookies, headers=self.headers)
+        if moves or parents:
+            self._client.sync()
+
+        trees = [self.tree(root) for root in roots]
+        return trees if batch else trees[0]
+
+    def create_tree(self, tree, project: str = None):
+        """
+        Creates tasks with all of their subtasks, nested as far down as they go.
+
+        Every task is given an id locally (see [generate_object_id][helpers.object_id.generate_object_id]),
+        so the whole tree is created with `batch/task` requests of up to `MAX_BATCH_SIZE` tasks and nested
+        with `batch/taskParent` requests, without waiting for the server to assign ids in between. The local
+        state is synced once.
+
+        Arguments:
+            tree (dict or list): A node dictionary `{'task': task_dict, 'children': [child nodes]}` - the shape
+                returned by [tree][managers.tasks.TaskManager.tree] - or a list of them. Task dictionaries can
+                come from [`builder`][managers.tasks.TaskManager.builder] and are not modified.
+            project: ID string of the project for every task. Defaults to the `projectId` of each root task,
+                or the inbox. Subtasks are always created in the project of their root.
+
+        Returns:
+            dict or list: The created tree - see [tree][managers.tasks.TaskManager.tree] - or a list of the
+            created trees.
+
+        Raises:
+            TypeError: If `tree` is not a node dictionary or list of them.
+            RuntimeError: If a task could not be created.
+
+        !!! example
+            ```python
+            trip = client.task.create_tree({
+                'task': client.task.builder('Trip'),
+                'children': [{'task': client.task.builder('Pack'),
+                              'children': [{'task': client.task.builder('Socks'), 'children': []}]},
+                             {'task': client.task.builder('Book Hotel'), 'children': []}]
+            })
+            ```
+        """
+        batch = isinstance(tree, list)
+        roots = tree if batch else [tree]
+
+        tasks = []
+        parents = []
+        root_ids = []
+
+        def check(node):
+            if not isinstance(node, dict) or not isinstance(node.get('task'), dict):
+                raise TypeError('Tree Must Be A Node Dictionary Or List Of Node Dictionaries')
+
+        def add(node, target, parent):
+            check(node)
+            obj = dict(node['task'])
+            obj['id'] = obj.get('id') or generate_object_id()
+            obj['projectId'] = target
+            tasks.append(obj)
+            if parent is not None:
+                parents.append({'parentId': parent, 'projectId': target, 'taskId': obj['id']})
+            for child in node.get('children', ()):
+                add(child, target, obj['id'])
+            return obj['id']
+
+        for root in roots:
+            check(root)
+            target = project or root['task'].get('projectId') or self._client.inbox_id
+            if target == 'inbox':
+                target = self._client.inbox_id
+            root_ids.append(add(root, target, None))
+
+        errors = {}
+        try:
+            url = self._client.BASE_URL + 'batch/task'
+            for chunk in chunked(tasks, self._client.MAX_BATCH_SIZE):
+                response = self._client.http_post(url, json={'add': chunk}, cookies=self._client.cookies,
+                                                  headers=self.headers)
+                errors.update(response.get('id2error') or {})
+            # Links to tasks that could not be created would fail
+            parents = [link for link in parents if link['parentId'] not in errors and link['taskId'] not in errors]
+            url = self._client.BASE_URL + 'batch/taskParent'
+            for chunk in chunked(parents, self._client.MAX_BATCH_SIZE):
+                self._client.http_post(url, json=chunk, cookies=self._client.cookies, headers=self.headers)
+        finally:
+            self._client.sync()
+        if errors:
+            raise RuntimeError(f"Could Not Create Tasks: {errors}")
+
+        trees = [self.tree(root_id) for root_id in root_ids]
+        return trees if batch else trees[0]
+
+    def move_tree(self, task, new: str):
+        """
+        Moves tasks with all of their subtasks to another project.
+
+        The tasks become top level tasks in the new project, and their subtasks keep their nesting.
+        Every task of the trees is moved with one `batch/taskProject` request, the nesting is set with
+        one `batch/taskParent` request, and the local state is synced once.
+
+        Arguments:
+            task (str or list): ID string of the task at the root of the tree, or a list of ID strings.
+            new: ID string of the project to move the trees to.
+
+        Returns:
+            dict or list: The moved tree - see [tree][managers.tasks.TaskManager.tree] - or a list of the
+            moved trees.
+
+        Raises:
+            TypeError: If `task` is not an ID string or list of ID strings.
+            ValueError: If a task or the project does not exist.
+            RuntimeError: If the move was unsuccessful.
+
+        !!! example
+            ```python
+            # Move the 'Errands' outline to the 'Weekend' project
+            errands = client.get_by_fields(title='Errands', search='tasks')
+            weekend = client.get_by_fields(name='Weekend', search='projects')
+            tree = client.task.move_tree(errands['id'], weekend['id'])
+            ```
+        """
+        if not isinstance(new, str):
+            raise TypeError('new should be a string')
+        if new != self._client.inbox_id and not self._client.get_by_id(new, search='projects'):
+            raise ValueError('The ID for the new project does not exist')
+
+        return self._relocate(task, new, None)
+
+    def reparent(self, task, parent):
+        """
+        Nests tasks with all of their subtasks under another task.
+
+        Trees in a different project than `parent` are moved to its project first. Pass `None` as
+        `parent` to make the tasks top level tasks in their project. Every change is sent with at most one
+        `batch/taskProject` and one `batch/taskParent` request, and the local state is synced once.
+
+        Arguments:
+            task (str or list): ID string of the task at the root of the tree, or a list of ID strings.
+            parent (str): ID string of the new parent task, or `None`.
+
+        Returns:
+            dict or list: The tree of the parent - see [tree][managers.tasks.TaskManager.tree] - or the
+            reparented tree (or list of trees) when `parent` is `None`.
+
+        Raises:
+            TypeError: If `task` is not an ID string or list of ID strings.
+            ValueError: If a task or the parent does not exist, or the parent is in one of the trees.
+            RuntimeError: If the change was unsuccessful.
+
+        !!! example
+            ```python
+            # Nest the 'Bank' and 'Groceries' outlines under 'Errands'
+            tree = client.task.reparent([bank['id'], groceries['id']], errands['id'])
+            ```
+        """
+        if parent is None:
+            return self._relocate(task, None, None)
+
+        parent_obj = self._client.get_by_id(parent, search='tasks')
+        if not parent_obj:
+            raise ValueError(f"Parent Task '{parent}' Does Not Exist")
+        self._relocate(task, parent_obj['projectId'], parent)
+        return self.tree(parent)
 
     def get_completed(self, start, end=None, full: bool = True, tz: str = None) -> list:
         """
@@ -987,6 +1373,8 @@ class TaskManager:
                 tasks = client.task.get_completed(start, end, full=False)
                 ```
         """
+        import pytz
+
         url = self._client.BASE_URL + 'project/all/completed'
 
         if tz is None:
@@ -1,5 +1,3 @@
-import requests
-import webbrowser
 import time
 import logging
 import ast
@@ -7,21 +5,24 @@ import os
 
 from urllib.parse import urlparse, urlencode, parse_qsl
 from ticktick.cache import CacheHandler
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
 log = logging.getLogger(__name__)
 
 
-def requests_retry_session(retries=3,
-                           backoff_factor=1,
-                           status_forcelist=(405, 500, 502, 504),
-                           session=None,
-                           allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE'])):
+def retry_adapter(retries=3,
+                  backoff_factor=1,
+                  status_forcelist=(405, 500, 502, 504),
+                  allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+                  pool_connections=10,
+                  pool_maxsize=10):
     """
-    Method for http retries
+    Creates an http adapter with retries. The adapter owns the connection pool, so mounting
+    the same adapter on several sessions lets them share connections.
     """
-    session = session or requests.session()
+    # Imported here so that importing the package stays cheap
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
     retry = Retry(
         total=retries,
         read=retries,
@@ -30,7 +31,26 @@ def requests_retry_session(retries=3,
         status_forcelist=status_forcelist,
         allowed_methods=allowed_methods
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    return HTTPAdapter(max_retries=retry, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+
+def requests_retry_session(retries=3,
+                           backoff_factor=1,
+                           status_forcelist=(405, 500, 502, 504),
+                           session=None,
+                           allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+                           adapter=None):
+    """
+    Method for http retries
+    """
+    import requests
+
+    session = session or requests.session()
+    if adapter is None:
+        adapter = retry_adapter(retries=retries,
+                                backoff_factor=backoff_factor,
+                                status_forcelist=status_forcelist,
+                                allowed_methods=allowed_methods)
     session.mount('http://', adapter)
     session.mount('https://', adapter)
     return session
@@ -161,6 +181,8 @@ class OAuth2:
                  "authorization you will be redirected to the redirect url that you provided with extra parameters "
                  "provided in the url. Paste the url that you "
                  "were redirected to into the console")
+        import webbrowser
+
         url = self._get_auth_url()
         webbrowser.open(url)
 
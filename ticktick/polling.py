@@ -0,0 +1,318 @@
+"""
+Polling many accounts, spending requests on the accounts that change.
+"""
+
+import functools
+import heapq
+import itertools
+import threading
+import time
+
+from ticktick.autosync import AdaptiveInterval, sync_changes
+
+
+class TokenBucket:
+    """
+    Rate limiter allowing `rate` requests per second on average, with bursts of up to `capacity`.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.polling import TokenBucket
+        ```
+    """
+
+    def __init__(self, rate: float, capacity: float = None, clock=time.monotonic):
+        if rate <= 0:
+            raise ValueError('Rate Must Be Positive')
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self) -> bool:
+        """
+        Takes a token if one is available, and returns whether it did.
+        """
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """
+        Returns the seconds until a token is available.
+        """
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+
+class _Account:
+    """
+    Polling schedule of one account.
+    """
+
+    __slots__ = ('interval', 'due', 'rate', 'polls', 'failures', 'polling')
+
+    def __init__(self, interval: AdaptiveInterval, due: float):
+        self.interval = interval
+        self.due = due
+        self.rate = 0.0
+        self.polls = 0
+        self.failures = 0
+        self.polling = False
+
+
+class PollingScheduler:
+    """
+    Syncs the accounts of a [ClientPool][pool.ClientPool], polling each account as often as it changes.
+
+    Every account has its own [adaptive interval][autosync.AdaptiveInterval]: it is halved when a sync finds
+    changes and doubled when it does not, so busy accounts are polled often and idle accounts back off
+    exponentially up to `maximum`. The wait is further divided by one plus the observed change rate of the
+    account, so an account that starts changing a lot is polled again soon rather than just twice as soon.
+    Failed syncs back off the same way. A [token bucket][polling.TokenBucket]
+    caps the syncs sent per second across every account, so adding accounts never raises the request rate
+    above `max_rate`.
+
+    Syncs run on the pool workers with a [state swap][api.TickTickClient.sync], so readers of each
+    client are never blocked. Adding an account sets `swap_on_sync` on its client, so its other syncs swap too.
+
+    !!! example
+        ```python
+        pool = ClientPool(max_workers=8)
+        ...  # Add the accounts
+
+        scheduler = PollingScheduler(pool, minimum=30, maximum=1800, max_rate=2,
+                                     on_change=lambda key, events: print(key, len(events)))
+        scheduler.start()
+        ```
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.polling import PollingScheduler
+        ```
+    """
+
+    def __init__(self, pool, minimum: float = 30, maximum: float = 1800, max_rate: float = 2.0,
+                 burst: float = None, on_change=None, on_error=None, clock=time.monotonic):
+        """
+        Arguments:
+            pool (ClientPool): The pool holding the accounts.
+            minimum: Shortest time between syncs of an account in seconds.
+            maximum: Longest time between syncs of an account in seconds.
+            max_rate: Most syncs sent per second across every account.
+            burst: Most syncs sent at once after an idle period. Defaults to `max_rate`, at least 1.
+            on_change (callable): Called with the account key and the [change events][events.ChangeEvent]
+                of every sync that found changes.
+            on_error (callable): Called with the account key and the exception of every failed sync.
+            clock (callable): Monotonic time in seconds.
+
+        Raises:
+            ValueError: If the interval bounds or rate are not valid.
+        """
+        AdaptiveInterval(minimum, maximum)  # Check the bounds
+        self._pool = pool
+        self.minimum = minimum
+        self.maximum = maximum
+        self.on_change = on_change
+        self.on_error = on_error
+        self._clock = clock
+        self._bucket = TokenBucket(max_rate, burst, clock=clock)
+        self._accounts = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, key, delay: float = 0) -> None:
+        """
+        Starts polling the account, first after `delay` seconds.
+
+        Raises:
+            KeyError: If `key` is not in the pool or is already being polled.
+        """
+        if key not in self._pool:
+            raise KeyError(f"Account '{key}' Is Not In The Pool")
+        with self._lock:
+            if key in self._accounts:
+                raise KeyError(f"Account '{key}' Is Already Being Polled")
+            interval = AdaptiveInterval(self.minimum, self.maximum, initial=self.minimum)
+            self._accounts[key] = _Account(interval, self._clock() + delay)
+            self._pool[key].swap_on_sync = True
+            self._schedule(key)
+        self._wakeup.set()
+
+    def remove(self, key) -> None:
+        """
+        Stops polling the account.
+
+        Raises:
+            KeyError: If the account is not being polled.
+        """
+        with self._lock:
+            del self._accounts[key]
+
+    def stats(self, key) -> dict:
+        """
+        Returns the polling statistics of the account: the current adaptive `interval` in seconds, the observed
+        change `rate` (moving average of the changed objects per sync) that shortens it, and the number of `polls`
+        and consecutive `failures`.
+        """
+        account = self._accounts[key]
+        return {'interval': account.interval.current, 'rate': account.rate,
+                'polls': account.polls, 'failures': account.failures}
+
+    def poll(self) -> list:
+        """
+        Submits a sync for every account that is due, as long as the rate cap allows.
+
+        Accounts that are no longer in the pool (or whose pool was closed) stop being polled, and the error
+        is passed to `on_error`.
+
+        Returns:
+            list: The futures of the submitted syncs.
+        """
+        futures = []
+        now = self._clock()
+        while True:
+            with self._lock:
+                key = self._next_due(now)
+                if key is None or not self._bucket.take():
+                    if key is not None:
+                        self._schedule(key)  # Put it back until a token is available
+                    break
+                self._accounts[key].polling = True
+            try:
+                future = self._pool.submit(key, self._sync, key)
+            except (KeyError, RuntimeError) as error:
+                with self._lock:
+                    self._accounts.pop(key, None)
+                if self.on_error is not None:
+                    self.on_error(key, error)
+                continue
+            future.add_done_callback(functools.partial(self._cancelled, key))
+            futures.append(future)
+        return futures
+
+    def next_wakeup(self) -> float:
+        """
+        Returns the seconds until an account is due and the rate cap allows a sync.
+        """
+        with self._lock:
+            while self._heap and self._stale(self._heap[0]):
+                heapq.heappop(self._heap)
+            if not self._heap:
+                return self.maximum
+            due = max(0.0, self._heap[0][0] - self._clock())
+        return max(due, self._bucket.wait_time())
+
+    def start(self) -> 'PollingScheduler':
+        """
+        Starts polling from a daemon thread.
+
+        Raises:
+            RuntimeError: If the scheduler is already running.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            raise RuntimeError('Polling Scheduler Is Already Running')
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='ticktick-polling', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None) -> None:
+        """
+        Stops polling. Syncs already submitted to the pool still finish.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.poll()
+            self._wakeup.wait(self.next_wakeup())
+            self._wakeup.clear()
+
+    def _sync(self, client, key):
+        """
+        Syncs the account on a pool worker, and schedules its next sync from what changed.
+        """
+        error = None
+        events = []
+        try:
+            events = sync_changes(client)
+        except Exception as e:
+            error = e
+
+        with self._lock:
+            account = self._accounts.get(key)
+            if account is not None:
+                account.polling = False
+                account.polls += 1
+                account.failures = account.failures + 1 if error is not None else 0
+                # Moving average of the changed objects per sync
+                account.rate = 0.7 * account.rate + 0.3 * len(events)
+                account.interval.update(bool(events))
+                account.due = self._clock() + max(self.minimum, account.interval.current / (1 + account.rate))
+                self._schedule(key)
+        self._wakeup.set()
+
+        if error is not None:
+            if self.on_error is not None:
+                self.on_error(key, error)
+        elif events and self.on_change is not None:
+            self.on_change(key, events)
+        return events
+
+    def _cancelled(self, key, future) -> None:
+        """
+        Puts the account back in the schedule if its sync was cancelled before it ran - like by `pool.remove`.
+        """
+        if not future.cancelled():
+            return
+        with self._lock:
+            account = self._accounts.get(key)
+            if account is not None:
+                account.polling = False
+                self._schedule(key)
+        self._wakeup.set()
+
+    def _schedule(self, key) -> None:
+        """
+        Queues the account at its due time. Must hold the lock.
+        """
+        heapq.heappush(self._heap, (self._accounts[key].due, next(self._counter), key))
+
+    def _stale(self, entry) -> bool:
+        """
+        Whether a heap entry belongs to a removed, polling, or rescheduled account. Must hold the lock.
+        """
+        due, _, key = entry
+        account = self._accounts.get(key)
+        return account is None or account.polling or account.due != due
+
+    def _next_due(self, now: float):
+        """
+        Pops the next account due by `now`, or returns `None`. Must hold the lock.
+        """
+        while self._heap:
+            entry = self._heap[0]
+            if self._stale(entry):
+                heapq.heappop(self._heap)
+            elif entry[0] <= now:
+                heapq.heappop(self._heap)
+                return entry[2]
+            else:
+                return None
+        return None
@@ -0,0 +1,259 @@
+import threading
+import requests
+
+from collections import deque
+from concurrent.futures import Future
+from ticktick.oauth2 import retry_adapter, requests_retry_session
+
+
+class ClientPool:
+    """
+    Manages many [`TickTickClient`][api.TickTickClient] instances - one per account - over a single
+    shared HTTP connection pool.
+
+    Every account keeps its own session, so cookies and tokens are never mixed between accounts, but all
+    of the sessions are mounted on the same adapter so connections to `api.ticktick.com` are reused.
+
+    Work is submitted per account and run by a bounded number of worker threads. Accounts are served
+    round-robin and at most one call runs for an account at a time, so a busy account cannot starve the others.
+
+    !!! example
+        ```python
+        pool = ClientPool(max_workers=4)
+
+        for name, (username, password) in accounts.items():
+            oauth = OAuth2(client_id, client_secret, redirect_uri, session=pool.session(),
+                           cache_path=f'.token-{name}')
+            pool.add(name, username, password, oauth)
+
+        # Sync every account, 4 at a time
+        responses = pool.map(lambda client: client.sync())
+        ```
+    """
+
+    def __init__(self, max_workers: int = 8, pool_maxsize: int = None) -> None:
+        """
+        Arguments:
+            max_workers: Maximum number of calls running at the same time across all accounts.
+            pool_maxsize: Maximum number of connections kept open to a single host. Defaults to `max_workers`.
+
+        Raises:
+            ValueError: If `max_workers` is less than 1.
+        """
+        if max_workers < 1:
+            raise ValueError('max_workers Must Be At Least 1')
+
+        self.max_workers = max_workers
+        # Single adapter -> single connection pool shared by every account session
+        self._adapter = retry_adapter(pool_maxsize=pool_maxsize or max_workers)
+
+        self._clients = {}
+        self._pending = {}
+        self._ready = deque()
+        self._running = set()
+        self._threads = []
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def session(self):
+        """
+        Returns a new requests session mounted on the shared connection pool. Pass it to
+        [`OAuth2`][oauth2.OAuth2] so the account's requests go through the pool.
+        """
+        return requests_retry_session(session=requests.session(), adapter=self._adapter)
+
+    def add(self, key, username: str, password: str, oauth):
+        """
+        Logs in to an account and adds its client to the pool.
+
+        Arguments:
+            key: Hashable name for the account.
+            username: TickTick Username
+            password: TickTick Password
+            oauth: OAuth2 manager for the account.
+
+        Returns:
+            TickTickClient: The client for the account.
+
+        Raises:
+            KeyError: If `key` is already in the pool.
+            RunTimeError: If the login was not successful.
+        """
+        from ticktick.api import TickTickClient
+
+        if key in self._clients:
+            raise KeyError(f"'{key}' Is Already In The Pool")
+        requests_retry_session(session=oauth.session, adapter=self._adapter)
+        return self.register(key, TickTickClient(username, password, oauth))
+
+    def register(self, key, client):
+        """
+        Adds an already logged in client to the pool. The client's session is mounted on the
+        shared connection pool.
+
+        Arguments:
+            key: Hashable name for the account.
+            client (TickTickClient): The client for the account.
+
+        Returns:
+            TickTickClient: The registered client.
+
+        Raises:
+            KeyError: If `key` is already in the pool.
+        """
+        with self._condition:
+            if key in self._clients:
+                raise KeyError(f"'{key}' Is Already In The Pool")
+            requests_retry_session(session=client._session, adapter=self._adapter)
+            self._clients[key] = client
+            self._pending[key] = deque()
+        return client
+
+    def remove(self, key):
+        """
+        Removes an account from the pool. Calls that have not started yet are cancelled.
+
+        Arguments:
+            key: Name of the account.
+
+        Returns:
+            TickTickClient: The removed client.
+
+        Raises:
+            KeyError: If `key` is not in the pool.
+        """
+        with self._condition:
+            client = self._clients.pop(key)
+            for future, _, _, _ in self._pending.pop(key):
+                future.cancel()
+            if key in self._ready:
+                self._ready.remove(key)
+        return client
+
+    def __getitem__(self, key):
+        return self._clients[key]
+
+    def __contains__(self, key):
+        return key in self._clients
+
+    def __iter__(self):
+        return iter(list(self._clients))
+
+    def __len__(self):
+        return len(self._clients)
+
+    def submit(self, key, func, *args, **kwargs) -> Future:
+        """
+        Schedules `func(client, *args, **kwargs)` to run for the account.
+
+        Arguments:
+            key: Name of the account.
+            func: Callable that receives the account's client as the first argument.
+            *args: Extra positional arguments for `func`.
+            **kwargs: Extra keyword arguments for `func`.
+
+        Returns:
+            A `concurrent.futures.Future` for the result of the call.
+
+        Raises:
+            KeyError: If `key` is not in the pool.
+            RuntimeError: If the pool has been closed.
+        """
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Pool Is Closed')
+            self._pending[key].append((future, func, args, kwargs))
+            if key not in self._running and key not in self._ready:
+                self._ready.append(key)
+            self._start_worker()
+            self._condition.notify()
+        return future
+
+    def map(self, func, keys=None) -> dict:
+        """
+        Runs `func(client)` for every account (or just `keys`) and waits for the results.
+
+        Arguments:
+            func: Callable that receives a client as the first argument.
+            keys: Names of the accounts to run for. Defaults to every account in the pool.
+
+        Returns:
+            A dictionary of account name to result, in the order of `keys`.
+
+        Raises:
+            Exception: The first exception raised by a call, after every call has finished.
+        """
+        if keys is None:
+            keys = list(self._clients)
+        futures = [(key, self.submit(key, func)) for key in keys]
+        results = {}
+        error = None
+        for key, future in futures:
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
+        return results
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stops the worker threads once the submitted calls are finished.
+
+        Arguments:
+            wait: Whether to block until the worker threads have exited.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _start_worker(self) -> None:
+        """
+        Starts another worker thread if there is queued work and room under `max_workers`. Must hold the lock.
+        """
+        busy = len(self._running)
+        idle = len(self._threads) - busy
+        if idle < len(self._ready) and len(self._threads) < self.max_workers:
+            thread = threading.Thread(target=self._worker, daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _worker(self) -> None:
+        """
+        Runs queued calls, taking accounts from the ready queue in round-robin order.
+        """
+        while True:
+            with self._condition:
+                while not self._ready and not self._closed:
+                    self._condition.wait()
+                if not self._ready:
+                    return
+                key = self._ready.popleft()
+                future, func, args, kwargs = self._pending[key].popleft()
+                client = self._clients[key]
+                self._running.add(key)
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(func(client, *args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+
+            with self._condition:
+                self._running.discard(key)
+                # Go to the back of the line so the other accounts get a turn first
+                if self._pending.get(key):
+                    self._ready.append(key)
+                    self._condition.notify()
@@ -0,0 +1,239 @@
+"""
+Creating whole workspaces from a declarative spec in as few requests as possible.
+"""
+
+from ticktick.helpers.concurrency import chunked
+from ticktick.helpers.hex_color import check_hex_color, generate_hex_color
+from ticktick.helpers.object_id import generate_object_id
+from ticktick.managers.tags import TagsManager
+from ticktick.tracking import KEYS
+
+# Keys a spec can have at each level
+SPEC_KEYS = {'folders', 'projects', 'tags', 'tasks'}
+FOLDER_KEYS = {'name', 'projects'}
+PROJECT_KEYS = {'name', 'color', 'kind', 'tasks'}
+TAG_KEYS = {'label', 'color', 'sort', 'children'}
+
+
+def _check(obj, keys, name: str, required: str) -> None:
+    """
+    Checks a spec entry is a dictionary with a string `required` field and only the allowed keys - any
+    keys when `keys` is `None`.
+    """
+    if not isinstance(obj, dict):
+        raise TypeError(f"{name} Must Be A Dict")
+    if not isinstance(obj.get(required), str):
+        raise TypeError(f"{name} '{required}' Must Be A String")
+    unknown = set(obj) - keys if keys is not None else ()
+    if unknown:
+        raise ValueError(f"Unknown {name} Fields {sorted(unknown)}")
+
+
+def _color(color) -> str:
+    if color is None or color == 'random':
+        return generate_hex_color()
+    if not check_hex_color(color):
+        raise ValueError('Invalid Hex Color String')
+    return color
+
+
+class ProvisioningPlan:
+    """
+    The requests creating everything in a spec, in dependency order: folders, then tags (parents before
+    children), then projects, then the moves of reused projects, then tasks, then the nesting of subtasks -
+    followed by a single sync.
+
+    Every folder, project and task is given an id locally (see
+    [generate_object_id][helpers.object_id.generate_object_id]), so nothing waits on an id from the server
+    and each step is one batch request of up to `MAX_BATCH_SIZE` objects. Folders, projects and tags that
+    already exist with the same name (ignoring case, like TickTick does) are reused instead of created, and
+    reused projects are moved into the folder the spec puts them in.
+
+    A spec is a dictionary of any of these lists:
+
+    - `folders`: `{'name': str, 'projects': [projects]}`
+    - `projects`: `{'name': str, 'color': str, 'kind': 'TASK' or 'NOTE', 'tasks': [tasks]}` - outside any folder.
+    - `tags`: `{'label': str, 'color': str, 'sort': int, 'children': [tags]}`
+    - `tasks`: Task dictionaries - like from [`builder`][managers.tasks.TaskManager.builder] - with an optional
+        `subtasks` list of tasks. Tasks outside a project go to the inbox.
+
+    !!! example
+        ```python
+        spec = {
+            'tags': [{'label': 'Team', 'children': [{'label': 'Blocked', 'color': '#E03131'}]}],
+            'folders': [{'name': 'Engineering', 'projects': [
+                {'name': 'Sprint', 'tasks': [
+                    {'title': 'Plan', 'tags': ['team'], 'subtasks': [{'title': 'Estimate'}]},
+                    {'title': 'Retro'}]}]}]
+        }
+
+        plan = client.provision(spec, execute=False)
+        len(plan)  # Requests it will send
+        created = plan.execute()
+        ```
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.provision import ProvisioningPlan
+        ```
+    """
+
+    def __init__(self, client, spec: dict):
+        """
+        Arguments:
+            client (TickTickClient): The client to create the objects with.
+            spec: What to create - see above.
+
+        Raises:
+            TypeError: If a part of the spec has the wrong type.
+            ValueError: If the spec has unknown fields, invalid values, or repeats a name.
+        """
+        if not isinstance(spec, dict):
+            raise TypeError('Spec Must Be A Dict')
+        unknown = set(spec) - SPEC_KEYS
+        if unknown:
+            raise ValueError(f"Unknown Spec Fields {sorted(unknown)}")
+
+        self._client = client
+        self._folders = []
+        self._tag_levels = []
+        self._projects = []
+        self._moves = []
+        self._tasks = []
+        self._parents = []
+        self._names = set()
+        # Existing folders and projects by lowercase name
+        self._existing = {}
+        for search in ('project_folders', 'projects'):
+            self._existing[search] = {}
+            for obj in client.state[search]:
+                if isinstance(obj.get('name'), str):
+                    self._existing[search].setdefault(obj['name'].lower(), obj)
+        # Objects of the spec in order, as (search, key) - created or reused
+        self.objects = []
+
+        for tag in spec.get('tags', ()):
+            self._add_tag(tag, None, 0)
+        for folder in spec.get('folders', ()):
+            _check(folder, FOLDER_KEYS, 'Folder', 'name')
+            folder_id = self._reuse('project_folders', folder['name']).get('id')
+            if folder_id is None:
+                folder_id = generate_object_id()
+                self._folders.append({'id': folder_id, 'name': folder['name'], 'listType': 'group'})
+            self.objects.append(('project_folders', folder_id))
+            for project in folder.get('projects', ()):
+                self._add_project(project, folder_id)
+        for project in spec.get('projects', ()):
+            self._add_project(project, None)
+        for task in spec.get('tasks', ()):
+            self._add_task(task, client.inbox_id, None)
+
+    @property
+    def requests(self) -> list:
+        """
+        The `(endpoint, payload)` of every request to send, in order.
+        """
+        size = self._client.MAX_BATCH_SIZE
+        requests = [('batch/projectGroup', {'add': chunk}) for chunk in chunked(self._folders, size)]
+        for level in self._tag_levels:
+            requests.extend(('batch/tag', {'add': chunk}) for chunk in chunked(level, size))
+        requests.extend(('batch/project', {'add': chunk}) for chunk in chunked(self._projects, size))
+        requests.extend(('batch/project', {'update': chunk}) for chunk in chunked(self._moves, size))
+        requests.extend(('batch/task', {'add': chunk}) for chunk in chunked(self._tasks, size))
+        requests.extend(('batch/taskParent', chunk) for chunk in chunked(self._parents, size))
+        return requests
+
+    def __len__(self):
+        return len(self.requests)
+
+    def execute(self) -> dict:
+        """
+        Sends the requests and syncs once.
+
+        Returns:
+            dict: Key in [`state`](api.md#state) (`'project_folders'`, `'tags'`, `'projects'` and `'tasks'`) to
+            the synced objects of the spec in spec order - created and reused.
+
+        Raises:
+            RuntimeError: If a request failed or an object could not be created. Requests already sent are
+                not undone, and the local state is synced either way.
+        """
+        errors = {}
+        try:
+            for endpoint, payload in self.requests:
+                if endpoint == 'batch/taskParent':
+                    # Links to tasks that could not be created would fail
+                    payload = [link for link in payload
+                               if link['parentId'] not in errors and link['taskId'] not in errors]
+                    if not payload:
+                        continue
+                response = self._client.http_post(self._client.BASE_URL + endpoint, json=payload,
+                                                  cookies=self._client.cookies, headers=self._client.HEADERS)
+                if isinstance(response, dict):
+                    errors.update(response.get('id2error') or {})
+        finally:
+            self._client.sync()
+        if errors:
+            raise RuntimeError(f"Could Not Create Objects: {errors}")
+
+        results = {'project_folders': [], 'tags': [], 'projects': [], 'tasks': []}
+        for search, key in self.objects:
+            results[search].append(self._client._index.first(search, KEYS[search], key))
+        return results
+
+    def _reuse(self, search: str, name: str) -> dict:
+        """
+        Returns the existing object with the name ignoring case, or an empty dictionary. Names can not repeat
+        within the spec.
+        """
+        if (search, name.lower()) in self._names:
+            raise ValueError(f"'{name}' Is Repeated In The Spec")
+        self._names.add((search, name.lower()))
+        if search == 'tags':
+            return self._client._index.first('tags', 'name', name.lower())
+        return self._existing[search].get(name.lower(), {})
+
+    def _add_tag(self, tag: dict, parent, depth: int) -> None:
+        _check(tag, TAG_KEYS, 'Tag', 'label')
+        name = self._reuse('tags', tag['label']).get('name')
+        if name is None:
+            name = tag['label'].lower()
+            sort = tag.get('sort', 0)
+            if sort not in TagsManager.SORT_DICTIONARY:
+                raise ValueError(f"Sort Number '{sort}' Is Invalid -> Must Be 0, 1, 2 or 3")
+            while len(self._tag_levels) <= depth:
+                self._tag_levels.append([])
+            self._tag_levels[depth].append({'label': tag['label'], 'name': name, 'color': _color(tag.get('color')),
+                                            'parent': parent, 'sortType': TagsManager.SORT_DICTIONARY[sort]})
+        self.objects.append(('tags', name))
+        for child in tag.get('children', ()):
+            self._add_tag(child, name, depth + 1)
+
+    def _add_project(self, project: dict, folder_id) -> None:
+        _check(project, PROJECT_KEYS, 'Project', 'name')
+        existing = self._reuse('projects', project['name'])
+        project_id = existing.get('id')
+        if project_id is not None and (existing.get('groupId') or None) != folder_id:
+            self._moves.append(dict(existing, groupId=folder_id))
+        if project_id is None:
+            kind = project.get('kind', 'TASK')
+            if kind not in ('TASK', 'NOTE'):
+                raise ValueError(f"Invalid Project Type '{kind}' -> Should be 'TASK' or 'NOTE'")
+            project_id = generate_object_id()
+            self._projects.append({'id': project_id, 'name': project['name'], 'color': _color(project.get('color')),
+                                   'kind': kind, 'groupId': folder_id})
+        self.objects.append(('projects', project_id))
+        for task in project.get('tasks', ()):
+            self._add_task(task, project_id, None)
+
+    def _add_task(self, task: dict, project_id: str, parent) -> None:
+        _check(task, None, 'Task', 'title')
+        obj = {key: value for key, value in task.items() if key != 'subtasks'}
+        obj['id'] = obj.get('id') or generate_object_id()
+        obj['projectId'] = project_id
+        self._tasks.append(obj)
+        self.objects.append(('tasks', obj['id']))
+        if parent is not None:
+            self._parents.append({'parentId': parent, 'projectId': project_id, 'taskId': obj['id']})
+        for subtask in task.get('subtasks', ()):
+            self._add_task(subtask, project_id, obj['id'])
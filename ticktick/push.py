@@ -0,0 +1,169 @@
+"""
+Syncing the local `state` when the server pushes a change notification.
+"""
+
+import threading
+
+from ticktick.autosync import AdaptiveInterval, sync_changes
+
+PUSH_URL = 'wss://wssp.ticktick.com/web'
+
+# Messages that keep the connection alive without announcing a change
+HEARTBEATS = frozenset({'', 'hello', 'ping', 'pong'})
+
+
+def websocket_connect(url: str, headers: dict, cookie: str):
+    """
+    Opens a websocket with the optional [websocket-client](https://pypi.org/project/websocket-client/) package.
+
+    Raises:
+        ImportError: If `websocket-client` is not installed.
+    """
+    try:
+        import websocket
+    except ImportError:
+        raise ImportError("Push Sync Requires The 'websocket-client' Package - "
+                          "Install It With `pip install ticktick-py[push]`") from None
+    return websocket.create_connection(url, header=headers, cookie=cookie, origin='https://ticktick.com')
+
+
+class PushListener:
+    """
+    Listens on the web client websocket and syncs the client only when the server announces a change, so an
+    idle account sends no sync requests at all.
+
+    Notifications are coalesced: ones that arrive while a sync is running lead to a single follow up sync.
+    The client also syncs after every (re)connect to pick up changes made while disconnected. Lost
+    connections are retried with exponential backoff between `reconnect.minimum` and `reconnect.maximum`
+    seconds.
+
+    Start it through [`start_push_sync`][api.TickTickClient.start_push_sync].
+
+    Arguments:
+        client (TickTickClient): The client to sync.
+        url: The websocket url.
+        connect (callable): Opens the connection - called with `url`, the headers dictionary and the cookie
+            string, and returns an object with `recv()` and `close()`. Defaults to
+            [websocket_connect][push.websocket_connect]; pass a stand-in to test against a local server.
+        on_change (callable): Called with the [change events][events.ChangeEvent] of every sync that
+            found changes.
+        on_error (callable): Called with the exception when connecting, receiving or syncing fails.
+        reconnect (AdaptiveInterval): Time to wait before reconnecting.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.push import PushListener
+        ```
+    """
+
+    def __init__(self, client, url: str = PUSH_URL, connect=None, on_change=None, on_error=None,
+                 reconnect: AdaptiveInterval = None):
+        self._client = client
+        self.url = url
+        self._connect = connect if connect is not None else websocket_connect
+        self.on_change = on_change
+        self.on_error = on_error
+        self.reconnect = reconnect if reconnect is not None else AdaptiveInterval(1, 300, initial=1)
+        self._changed = threading.Event()
+        self._stopped = threading.Event()
+        self._connection = None
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the listener is running.
+        """
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self) -> 'PushListener':
+        """
+        Starts listening in the background.
+
+        Raises:
+            RuntimeError: If the listener is already running.
+        """
+        if self.running:
+            raise RuntimeError('Push Listener Is Already Running')
+        # Syncs run from the background -> every sync has to swap, see TickTickClient.sync
+        self._client.swap_on_sync = True
+        self._stopped.clear()
+        self._threads = [threading.Thread(target=self._listen, name='ticktick-push', daemon=True),
+                         threading.Thread(target=self._sync, name='ticktick-push-sync', daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = None) -> None:
+        """
+        Stops listening, waiting up to `timeout` seconds for a sync in progress to finish.
+        """
+        self._stopped.set()
+        self._changed.set()
+        self._close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+
+    def _listen(self):
+        """
+        Keeps a connection open and flags every change notification.
+        """
+        while not self._stopped.is_set():
+            try:
+                self._connection = self._connect(self.url, dict(self._client.HEADERS),
+                                                 f't={self._client.access_token}')
+                self.reconnect.current = self.reconnect.minimum
+                # Catch up on the changes made while disconnected
+                self._changed.set()
+                while not self._stopped.is_set():
+                    message = self._connection.recv()
+                    if message is None:
+                        raise RuntimeError('Push Connection Closed')
+                    if isinstance(message, bytes):
+                        message = message.decode('utf-8', 'replace')
+                    if message.strip().lower() not in HEARTBEATS:
+                        self._changed.set()
+            except Exception as error:
+                if self._stopped.is_set():
+                    return
+                self._report(error)
+            finally:
+                self._close()
+            self._stopped.wait(self.reconnect.current)
+            self.reconnect.update(False)
+
+    def _sync(self):
+        """
+        Syncs once for every batch of notifications.
+        """
+        while True:
+            self._changed.wait()
+            if self._stopped.is_set():
+                return
+            self._changed.clear()
+            try:
+                events = sync_changes(self._client)
+            except Exception as error:
+                self._report(error)
+                continue
+            if events and self.on_change is not None:
+                self.on_change(events)
+
+    def _close(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def _report(self, error):
+        if self.on_error is not None:
+            self.on_error(error)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
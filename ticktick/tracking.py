@@ -0,0 +1,94 @@
+"""
+Change tracking for the objects in the local `state`.
+"""
+
+import json
+
+_MISSING = object()
+
+# Field identifying the objects of each state list
+KEYS = {
+    'projects': 'id',
+    'project_folders': 'id',
+    'tags': 'name',
+    'tasks': 'id'
+}
+
+
+def fingerprint(value):
+    """
+    Returns a comparable fingerprint of a field value - the value itself for scalars, and canonical
+    json for dictionaries and lists so nested changes are noticed.
+    """
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
+
+
+class ChangeTracker:
+    """
+    Remembers the fields of every object as of the last [`sync`][api.TickTickClient.sync], so updates can
+    send only the fields that were changed locally.
+
+    Enable it by creating the client with `track_changes=True`.
+
+    ??? info "Import Help"
+        ```python
+        from ticktick.tracking import ChangeTracker
+        ```
+
+    !!! example
+        ```python
+        client = TickTickClient(username, password, oauth, track_changes=True)
+
+        task = client.get_by_fields(title='Dentist', search='tasks')
+        task['priority'] = 5
+        client.tracker.changes('tasks', task)
+        ```
+
+        ??? success "Result"
+            ```python
+            {'priority': 5}
+            ```
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+
+    def snapshot(self, state: dict) -> None:
+        """
+        Records the fields of every object in `state`, replacing the previous snapshot.
+        """
+        snapshots = {}
+        for search, key in KEYS.items():
+            for obj in state.get(search, ()):
+                snapshots[(search, obj.get(key))] = {field: fingerprint(value) for field, value in obj.items()}
+        self._snapshots = snapshots
+
+    def changes(self, search: str, obj: dict):
+        """
+        Returns the fields of the object that changed since the last snapshot.
+
+        Arguments:
+            search: Key in [`state`](api.md#state) the object belongs to.
+            obj: The object dictionary.
+
+        Returns:
+            dict or None: The changed fields and their new values - empty if nothing changed. `None` when the
+            changes are unknown: the object was not in the snapshot, its `etag` differs from the snapshot
+            (it is a stale or newer copy), or a field was removed.
+        """
+        snapshot = self._snapshots.get((search, obj.get(KEYS.get(search, 'id'))))
+        if snapshot is None or snapshot.get('etag') != fingerprint(obj.get('etag')):
+            return None
+        if any(field not in obj for field in snapshot):
+            return None
+
+        return {field: value for field, value in obj.items()
+                if snapshot.get(field, _MISSING) != fingerprint(value)}
+
+    def unchanged(self, search: str, obj: dict) -> bool:
+        """
+        Returns whether the object is known to be unchanged since the last snapshot.
+        """
+        return self.changes(search, obj) == {}